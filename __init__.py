@@ -8,6 +8,7 @@ sys.path.append(os.path.abspath(os.path.dirname(__file__) + "/libs/site/packages
 
 from topologic import Vertex, Face, CellComplex, Graph
 from topologist.helpers import create_stl_list
+import topologist
 from molior import Molior
 import molior.ifc
 
@@ -64,55 +65,60 @@ class ObjectHomemaker(bpy.types.Operator):
         # Each remaining mesh becomes a separate building
         # FIXME should all end-up in the same IfcProject
         for mesh in meshes:
-            vertices = [Vertex.ByCoordinates(*v.co) for v in mesh.data.vertices]
-            faces_ptr = create_stl_list(Face)
-
-            for polygon in mesh.data.polygons:
-                if polygon.area < 0.00001:
-                    continue
-                stylename = "default"
-                if len(mesh.material_slots) > 0:
-                    stylename = mesh.material_slots[
-                        polygon.material_index
-                    ].material.name
-                if stylename == "Material":
+            with topologist.session():
+                vertices = [Vertex.ByCoordinates(*v.co) for v in mesh.data.vertices]
+                faces_ptr = create_stl_list(Face)
+
+                for polygon in mesh.data.polygons:
+                    if polygon.area < 0.00001:
+                        continue
                     stylename = "default"
-                face_ptr = Face.ByVertices([vertices[v] for v in polygon.vertices])
-                face_ptr.Set("stylename", stylename)
-                faces_ptr.push_back(face_ptr)
-            mesh.hide_viewport = True
-
-            # Generate a Topologic CellComplex
-            cc = CellComplex.ByFaces(faces_ptr, 0.0001)
-            # Copy styles from Faces to the CellComplex
-            cc.ApplyDictionary(faces_ptr)
-            # Assign Cell usages from widgets
-            cc.AllocateCells(widgets)
-            # Collect unique elevations and assign storey numbers
-            elevations = cc.Elevations()
-            # Generate a cirulation Graph
-            circulation = Graph.Adjacency(cc)
-            circulation.Circulation(cc)
-            # print(circulation.Dot(cc))
-
-            # generate an IFC object
-            ifc = molior.ifc.init(mesh.name, elevations)
-
-            # Traces are 2D paths that define walls, extrusions and rooms
-            # Hulls are 3D shells that define pitched roofs and soffits
-            traces, hulls, normals = cc.GetTraces()
-
-            # TODO enable user defined location for share_dir
-            molior_object = Molior(
-                file=ifc,
-                circulation=circulation,
-                elevations=elevations,
-                traces=traces,
-                hulls=hulls,
-                normals=normals,
-                cellcomplex=cc,
-            )
-            molior_object.execute()
+                    if len(mesh.material_slots) > 0:
+                        stylename = mesh.material_slots[
+                            polygon.material_index
+                        ].material.name
+                    if stylename == "Material":
+                        stylename = "default"
+                    face_ptr = Face.ByVertices([vertices[v] for v in polygon.vertices])
+                    face_ptr.Set("stylename", stylename)
+                    faces_ptr.push_back(face_ptr)
+                mesh.hide_viewport = True
+
+                # Generate a Topologic CellComplex
+                cc = CellComplex.ByFaces(faces_ptr, 0.0001)
+                # Index adjacency for subsequent queries
+                cc.Snapshot()
+                # Copy styles from Faces to the CellComplex
+                cc.ApplyDictionary(faces_ptr)
+                # Assign Cell usages from widgets
+                cc.AllocateCells(widgets)
+                # Collect unique elevations and assign storey numbers
+                elevations = cc.Elevations()
+                # Fix orientation of faces inside the cellcomplex
+                cc.BadNormals()
+                # Generate a cirulation Graph
+                circulation = Graph.Adjacency(cc)
+                circulation.Circulation(cc)
+                # print(circulation.Dot(cc))
+
+                # generate an IFC object
+                ifc = molior.ifc.init(mesh.name, elevations)
+
+                # Traces are 2D paths that define walls, extrusions and rooms
+                # Hulls are 3D shells that define pitched roofs and soffits
+                traces, hulls, normals = cc.GetTraces()
+
+                # TODO enable user defined location for share_dir
+                molior_object = Molior(
+                    file=ifc,
+                    circulation=circulation,
+                    elevations=elevations,
+                    traces=traces,
+                    hulls=hulls,
+                    normals=normals,
+                    cellcomplex=cc,
+                )
+                molior_object.execute()
 
             # FIXME shouldn't have to write and import an IFC file
             ifc_tmp = tempfile.NamedTemporaryFile(
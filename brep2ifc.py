@@ -15,6 +15,8 @@ sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
 from topologic import Graph, Topology, Vertex, Face, CellComplex, TopologyUtility
 from topologist.helpers import create_stl_list
+import topologist
+import topologist.checkpoint as checkpoint
 from molior import Molior
 import molior.ifc
 
@@ -28,42 +30,60 @@ origin = Vertex.ByCoordinates(0.0, 0.0, 0.0)
 # print("BREP scale from feet to metres", datetime.datetime.now())
 topology_scaled = TopologyUtility.Scale(topology, origin, 1.0, 1.0, 1.0)
 
-faces_stl = create_stl_list(Face)
-topology_scaled.Faces(faces_stl)
-print(str(len(faces_stl)), "faces", datetime.datetime.now())
+with topologist.session():
+    faces_stl = create_stl_list(Face)
+    topology_scaled.Faces(faces_stl)
+    print(str(len(faces_stl)), "faces", datetime.datetime.now())
 
-cc = CellComplex.ByFaces(faces_stl, 0.0001)
-print("CellComplex created", datetime.datetime.now())
+    # reuse the CellComplex from a previous run with the same faces
+    # reuse the CellComplex from a previous run with the same geometry
+    key = checkpoint.faces_key(faces_stl, 0.0001)
+    cc = checkpoint.load_checkpoint(key)
+    if cc == None:
+        cc = CellComplex.ByFaces(faces_stl, 0.0001)
+        checkpoint.save_checkpoint(cc, key)
+        print("CellComplex created", datetime.datetime.now())
+    else:
+        print("CellComplex loaded from checkpoint", datetime.datetime.now())
 
-# Copy styles from Faces to the CellComplex
-# cc.ApplyDictionary(faces_ptr)
-# Assign Cell usages from widgets
-cc.AllocateCells([])
-# Collect unique elevations and assign storey numbers
-elevations = cc.Elevations()
-print(str(len(elevations)), "Elevations", datetime.datetime.now())
-# Generate a cirulation Graph
-circulation = Graph.Adjacency(cc)
-circulation.Circulation(cc)
-print("Circulation Graph generated", datetime.datetime.now())
+    # Index adjacency for subsequent queries
+    cc.Snapshot()
+    # attributes depend on the input Faces and widgets, not only the geometry
+    widgets = []
+    key_attributes = checkpoint.attributes_key(key, faces_stl, widgets)
+    if not checkpoint.load_attributes(cc, key_attributes):
+        # Copy styles from Faces to the CellComplex
+        # cc.ApplyDictionary(faces_ptr)
+        # Assign Cell usages from widgets
+        cc.AllocateCells(widgets)
+        # Fix orientation of faces inside the cellcomplex
+        cc.BadNormals()
+        checkpoint.save_attributes(cc, key_attributes)
+    # Collect unique elevations and assign storey numbers
+    elevations = cc.Elevations()
+    print(str(len(elevations)), "Elevations", datetime.datetime.now())
+    # Generate a cirulation Graph
+    circulation = Graph.Adjacency(cc)
+    circulation.Circulation(cc)
+    print("Circulation Graph generated", datetime.datetime.now())
 
-# generate an IFC object
-ifc = molior.ifc.init("brep2ifc building", elevations)
+    # generate an IFC object
+    ifc = molior.ifc.init("brep2ifc building", elevations)
 
-# Traces are 2D paths that define walls, extrusions and rooms
-traces, hulls, normals = cc.GetTraces()
-print("Traces calculated", datetime.datetime.now())
+    # Traces are 2D paths that define walls, extrusions and rooms
+    traces, hulls, normals = cc.GetTraces()
+    print("Traces calculated", datetime.datetime.now())
 
-molior_object = Molior(
-    file=ifc,
-    circulation=circulation,
-    elevations=elevations,
-    traces=traces,
-    hulls=hulls,
-    normals=normals,
-    cellcomplex=cc,
-)
-molior_object.execute()
+    molior_object = Molior(
+        file=ifc,
+        circulation=circulation,
+        elevations=elevations,
+        traces=traces,
+        hulls=hulls,
+        normals=normals,
+        cellcomplex=cc,
+    )
+    molior_object.execute()
 print("IFC model created", datetime.datetime.now())
 
 ifc.write(sys.argv[2])
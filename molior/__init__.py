@@ -41,9 +41,9 @@ from molior.wall import Wall
 from molior.repeat import Repeat
 
 from molior.style import Style
+from molior.ifc import get_registry
 from molior.geometry import subtract_3d, x_product_3d
-from topologic import Edge, Face
-from topologist.helpers import create_stl_list, string_to_coor_2d
+from topologist.helpers import el, key_to_coor_2d
 
 run = ifcopenshell.api.run
 
@@ -59,6 +59,8 @@ class Molior:
         self.elevations = {}
         self.circulation = None
         self.cellcomplex = None
+        # a molior.intermediate.Intermediate replaces traces, hulls etc.
+        self.intermediate = None
         self.share_dir = "share"
         self.Extrusion = Extrusion
         self.Floor = Floor
@@ -69,6 +71,12 @@ class Molior:
         self.Repeat = Repeat
         for arg in args:
             self.__dict__[arg] = args[arg]
+        if self.intermediate:
+            self.traces = self.intermediate.traces
+            self.hulls = self.intermediate.hulls
+            self.normals = self.intermediate.normals
+            self.elevations = self.intermediate.elevations
+            self.circulation = self.intermediate.circulation
         Molior.style = Style({"share_dir": self.share_dir})
 
     def execute(self):
@@ -100,294 +108,135 @@ class Molior:
 
         # use the topologic model to connect stuff
         if self.cellcomplex:
-            for item in self.file.by_type("IfcGeometricRepresentationSubContext"):
-                if item.ContextIdentifier == "Reference":
-                    reference_context = item
+            self.ConnectStructure(self.cellcomplex.StructuralEdges())
+        elif self.intermediate:
+            self.ConnectStructure(self.intermediate.edges)
 
-            # lookup tables to connect members to face indices
-            surface_lookup = {}
-            curve_list = []
-            space_lookup = {}
-            for member in self.file.by_type("IfcStructuralSurfaceMember"):
-                pset_topology = ifcopenshell.util.element.get_psets(member).get(
-                    "EPset_Topology"
-                )
-                if pset_topology:
-                    surface_lookup[pset_topology["FaceIndex"]] = member
-            for member in self.file.by_type("IfcStructuralCurveMember"):
-                pset_topology = ifcopenshell.util.element.get_psets(member).get(
-                    "EPset_Topology"
-                )
-                if pset_topology:
-                    curve_list.append([pset_topology["FaceIndex"], member])
-            for space in self.file.by_type("IfcSpace"):
-                pset_topology = ifcopenshell.util.element.get_psets(space).get(
-                    "EPset_Topology"
-                )
-                if pset_topology:
-                    space_lookup[pset_topology["CellIndex"]] = space
+    def ConnectStructure(self, edges):
+        """Connect structural members and spaces, given [start, end, [face
+        indices]] for each edge in the topologic model"""
+        registry = get_registry(self.file)
+        reference_context = registry.contexts.get("Reference")
+
+        # lookup tables to connect members to face indices
+        surface_lookup = {}
+        # face index -> el() of an end -> [[position, member, IfcEdge]]
+        curve_lookup = {}
+        space_lookup = {}
+        for member in self.file.by_type("IfcStructuralSurfaceMember"):
+            pset_topology = ifcopenshell.util.element.get_psets(member).get(
+                "EPset_Topology"
+            )
+            if pset_topology:
+                surface_lookup[pset_topology["FaceIndex"]] = member
+        position = 0
+        for member in self.file.by_type("IfcStructuralCurveMember"):
+            pset_topology = ifcopenshell.util.element.get_psets(member).get(
+                "EPset_Topology"
+            )
+            if pset_topology:
+                curve_edge = member.Representation.Representations[0].Items[0]
+                by_elevation = curve_lookup.setdefault(pset_topology["FaceIndex"], {})
+                for coor in set(
+                    [
+                        el(curve_edge.EdgeStart.VertexGeometry.Coordinates[2]),
+                        el(curve_edge.EdgeEnd.VertexGeometry.Coordinates[2]),
+                    ]
+                ):
+                    by_elevation.setdefault(coor, []).append(
+                        [position, member, curve_edge]
+                    )
+                position += 1
+        for space in self.file.by_type("IfcSpace"):
+            pset_topology = ifcopenshell.util.element.get_psets(space).get(
+                "EPset_Topology"
+            )
+            if pset_topology:
+                space_lookup[pset_topology["CellIndex"]] = space
+
+        for start, end, indices in edges:
+            horizontal = abs(start[2] - end[2]) < 0.0001
+            # members connected along this edge, in order of discovery
+            members = []
+            footings = []
+            # [curve member, vertex coordinates, connection name]
+            columns = []
+            for index in indices:
+                # connect this surface member to this curve connection
+                if index and index in surface_lookup:
+                    members.append(surface_lookup[index])
+                # only horizontal connections have curve members
+                if not horizontal or not index in curve_lookup:
+                    continue
+                connection_elevation = start[2]
+                # curve members with an end within 1mm of this elevation
+                candidates = {}
+                for coor in [
+                    el(connection_elevation - 0.001),
+                    el(connection_elevation),
+                    el(connection_elevation + 0.001),
+                ]:
+                    for item in curve_lookup[index].get(coor, []):
+                        candidates[item[0]] = item
+                for position in sorted(candidates):
+                    curve_member = candidates[position][1]
+                    curve_edge = candidates[position][2]
+                    start_coor = curve_edge.EdgeStart.VertexGeometry.Coordinates
+                    end_coor = curve_edge.EdgeEnd.VertexGeometry.Coordinates
+                    start_here = abs(start_coor[2] - connection_elevation) < 0.001
+                    end_here = abs(end_coor[2] - connection_elevation) < 0.001
+                    # horizontal curve member coincides with this horizontal connection
+                    if start_here and end_here:
+                        members.append(curve_member)
+                        # footings can have XYZ fixity
+                        # FIXME need better way to identify footing
+                        if curve_member.Name == "ground beam":
+                            footings.append(curve_member)
+                    # start point of non-horizontal curve member coincides with this horizontal connection
+                    elif start_here:
+                        columns.append(
+                            [curve_member, start_coor, "Column base connection"]
+                        )
+                    # end point of non-horizontal curve member coincides with this horizontal connection
+                    elif end_here:
+                        columns.append(
+                            [curve_member, end_coor, "Column head connection"]
+                        )
 
-            # iterate all the edges in the topologic model
-            edges_stl = create_stl_list(Edge)
-            self.cellcomplex.Edges(edges_stl)
-            point_list = []
-            for edge in list(edges_stl):
-                v_start = edge.StartVertex()
-                v_end = edge.EndVertex()
-                start = [v_start.X(), v_start.Y(), v_start.Z()]
-                end = [v_end.X(), v_end.Y(), v_end.Z()]
+            # a curve connection is only useful between two or more members
+            if len(members) > 1:
+                self.CurveConnection(reference_context, start, end, members, footings)
 
-                # create an ifc curve connection for this topologic edge
-                curve_connection = run(
+            # attach column point connections to beams/footings/slabs/walls
+            for curve_member, coor, name in columns:
+                connection_point = run(
                     "root.create_entity",
                     self.file,
-                    ifc_class="IfcStructuralCurveConnection",
-                    name="My Connection",
+                    ifc_class="IfcStructuralPointConnection",
+                    name=name,
                 )
-                run(
-                    "structural.assign_structural_analysis_model",
-                    self.file,
-                    product=curve_connection,
-                    structural_analysis_model=self.file.by_type(
-                        "IfcStructuralAnalysisModel"
-                    )[0],
-                )
-                if abs(start[2] - end[2]) < 0.0001:
-                    curve_connection.Axis = self.file.createIfcDirection(
-                        [0.0, 0.0, 1.0]
-                    )
-                    curve_connection.Name = "Horizontal connection"
-                elif (
-                    abs(start[0] - end[0]) < 0.0001 and abs(start[1] - end[1]) < 0.0001
-                ):
-                    curve_connection.Axis = self.file.createIfcDirection(
-                        [0.0, 1.0, 0.0]
-                    )
-                    curve_connection.Name = "Vertical connection"
-                else:
-                    vec_1 = subtract_3d(end, start)
-                    vec_2 = [vec_1[1], 0.0 - vec_1[0], 0.0]
-                    curve_connection.Axis = self.file.createIfcDirection(
-                        x_product_3d(vec_1, vec_2)
-                    )
-                    curve_connection.Name = "Inclined connection"
                 run(
                     "geometry.assign_representation",
                     self.file,
-                    product=curve_connection,
+                    product=connection_point,
                     representation=self.file.createIfcTopologyRepresentation(
                         reference_context,
                         "Reference",
-                        "Edge",
+                        "Vertex",
                         [
-                            self.file.createIfcEdge(
-                                self.file.createIfcVertexPoint(
-                                    self.file.createIfcCartesianPoint(start)
-                                ),
-                                self.file.createIfcVertexPoint(
-                                    self.file.createIfcCartesianPoint(end)
-                                ),
-                            )
+                            self.file.createIfcVertexPoint(
+                                self.file.createIfcCartesianPoint(coor)
+                            ),
                         ],
                     ),
                 )
-
-                # loop though all the faces connected to this edge
-                faces_stl = create_stl_list(Face)
-                edge.Faces(faces_stl)
-                for face in list(faces_stl):
-                    index = face.Get("index")
-                    # connect this surface member to this curve connection
-                    if index and index in surface_lookup:
-                        surface_member = surface_lookup[index]
-                        run(
-                            "structural.add_structural_member_connection",
-                            self.file,
-                            relating_structural_member=surface_member,
-                            related_structural_connection=curve_connection,
-                        )
-                    # there is a curve member with this face index
-                    for item in curve_list:
-                        curve_index = item[0]
-                        curve_member = item[1]
-                        if not curve_index == index:
-                            continue
-                        # if index in curve_list:
-                        if curve_connection.Name == "Horizontal connection":
-                            connection_elevation = start[2]
-                            curve_edge = curve_member.Representation.Representations[
-                                0
-                            ].Items[0]
-                            # horizontal curve member coincides with this horizontal connection
-                            if (
-                                abs(
-                                    curve_edge.EdgeStart.VertexGeometry.Coordinates[2]
-                                    - connection_elevation
-                                )
-                                < 0.001
-                                and abs(
-                                    curve_edge.EdgeEnd.VertexGeometry.Coordinates[2]
-                                    - connection_elevation
-                                )
-                                < 0.001
-                            ):
-                                run(
-                                    "structural.add_structural_member_connection",
-                                    self.file,
-                                    relating_structural_member=curve_member,
-                                    related_structural_connection=curve_connection,
-                                )
-                                # footings can have XYZ fixity, do it
-                                # FIXME need better way to identify footing
-                                if curve_member.Name == "ground beam":
-                                    run(
-                                        "structural.add_structural_boundary_condition",
-                                        self.file,
-                                        name="foundation",
-                                        connection=curve_connection,
-                                    )
-                                    run(
-                                        "structural.edit_structural_boundary_condition",
-                                        self.file,
-                                        condition=curve_connection.AppliedCondition,
-                                        attributes={
-                                            "TranslationalStiffnessByLengthX": {
-                                                "type": "IfcBoolean",
-                                                "value": True,
-                                            },
-                                            "TranslationalStiffnessByLengthY": {
-                                                "type": "IfcBoolean",
-                                                "value": True,
-                                            },
-                                            "TranslationalStiffnessByLengthZ": {
-                                                "type": "IfcBoolean",
-                                                "value": True,
-                                            },
-                                            "RotationalStiffnessByLengthX": {
-                                                "type": "IfcBoolean",
-                                                "value": False,
-                                            },
-                                            "RotationalStiffnessByLengthY": {
-                                                "type": "IfcBoolean",
-                                                "value": False,
-                                            },
-                                            "RotationalStiffnessByLengthZ": {
-                                                "type": "IfcBoolean",
-                                                "value": False,
-                                            },
-                                        },
-                                    )
-
-                            # start point of non-horizontal curve member coincides with this horizontal connection
-                            elif (
-                                abs(
-                                    curve_edge.EdgeStart.VertexGeometry.Coordinates[2]
-                                    - connection_elevation
-                                )
-                                < 0.001
-                                and abs(
-                                    curve_edge.EdgeEnd.VertexGeometry.Coordinates[2]
-                                    - connection_elevation
-                                )
-                                > 0.001
-                            ):
-                                connection_base = run(
-                                    "root.create_entity",
-                                    self.file,
-                                    ifc_class="IfcStructuralPointConnection",
-                                    name="Column base connection",
-                                )
-                                run(
-                                    "geometry.assign_representation",
-                                    self.file,
-                                    product=connection_base,
-                                    representation=self.file.createIfcTopologyRepresentation(
-                                        reference_context,
-                                        "Reference",
-                                        "Vertex",
-                                        [
-                                            self.file.createIfcVertexPoint(
-                                                self.file.createIfcCartesianPoint(
-                                                    curve_edge.EdgeStart.VertexGeometry.Coordinates
-                                                )
-                                            ),
-                                        ],
-                                    ),
-                                )
-                                run(
-                                    "structural.assign_structural_analysis_model",
-                                    self.file,
-                                    product=connection_base,
-                                    structural_analysis_model=self.file.by_type(
-                                        "IfcStructuralAnalysisModel"
-                                    )[0],
-                                )
-                                run(
-                                    "structural.add_structural_member_connection",
-                                    self.file,
-                                    relating_structural_member=curve_member,
-                                    related_structural_connection=connection_base,
-                                )
-                                point_list.append([connection_base, curve_connection])
-
-                            # end point of non-horizontal curve member coincides with this horizontal connection
-                            elif (
-                                abs(
-                                    curve_edge.EdgeStart.VertexGeometry.Coordinates[2]
-                                    - connection_elevation
-                                )
-                                > 0.001
-                                and abs(
-                                    curve_edge.EdgeEnd.VertexGeometry.Coordinates[2]
-                                    - connection_elevation
-                                )
-                                < 0.001
-                            ):
-                                connection_head = run(
-                                    "root.create_entity",
-                                    self.file,
-                                    ifc_class="IfcStructuralPointConnection",
-                                    name="Column head connection",
-                                )
-                                run(
-                                    "geometry.assign_representation",
-                                    self.file,
-                                    product=connection_head,
-                                    representation=self.file.createIfcTopologyRepresentation(
-                                        reference_context,
-                                        "Reference",
-                                        "Vertex",
-                                        [
-                                            self.file.createIfcVertexPoint(
-                                                self.file.createIfcCartesianPoint(
-                                                    curve_edge.EdgeEnd.VertexGeometry.Coordinates
-                                                )
-                                            ),
-                                        ],
-                                    ),
-                                )
-                                run(
-                                    "structural.assign_structural_analysis_model",
-                                    self.file,
-                                    product=connection_head,
-                                    structural_analysis_model=self.file.by_type(
-                                        "IfcStructuralAnalysisModel"
-                                    )[0],
-                                )
-                                run(
-                                    "structural.add_structural_member_connection",
-                                    self.file,
-                                    relating_structural_member=curve_member,
-                                    related_structural_connection=connection_head,
-                                )
-                                point_list.append([connection_head, curve_connection])
-
-            # attach column point connections to beams/footings/slabs/walls
-            for item in point_list:
-                connection_point = item[0]
-                connection_curve = item[1]
-                for rel in connection_curve.ConnectsStructuralMembers:
-                    member = rel.RelatingStructuralMember
+                run(
+                    "structural.assign_structural_analysis_model",
+                    self.file,
+                    product=connection_point,
+                    structural_analysis_model=registry.structural_analysis_model,
+                )
+                for member in [curve_member] + members:
                     run(
                         "structural.add_structural_member_connection",
                         self.file,
@@ -395,23 +244,106 @@ class Molior:
                         related_structural_connection=connection_point,
                     )
 
-            # delete unused curve connections
-            for curve_connection in self.file.by_type("IfcStructuralCurveConnection"):
-                if len(curve_connection.ConnectsStructuralMembers) < 2:
-                    for relation in curve_connection.ConnectsStructuralMembers:
-                        run(
-                            "structural.remove_structural_connection_condition",
-                            self.file,
-                            relation=relation,
-                        )
-                    run("root.remove_product", self.file, product=curve_connection)
+        # attach spaces to space boundaries
+        for boundary in self.file.by_type("IfcRelSpaceBoundary2ndLevel"):
+            if boundary.Description:
+                items = boundary.Description.split()
+                if len(items) == 2 and items[0] == "CellIndex":
+                    boundary.RelatingSpace = space_lookup[items[1]]
 
-            # attach spaces to space boundaries
-            for boundary in self.file.by_type("IfcRelSpaceBoundary2ndLevel"):
-                if boundary.Description:
-                    items = boundary.Description.split()
-                    if len(items) == 2 and items[0] == "CellIndex":
-                        boundary.RelatingSpace = space_lookup[items[1]]
+    def CurveConnection(self, reference_context, start, end, members, footings):
+        """Create an ifc curve connection for a topologic edge"""
+        curve_connection = run(
+            "root.create_entity",
+            self.file,
+            ifc_class="IfcStructuralCurveConnection",
+            name="My Connection",
+        )
+        run(
+            "structural.assign_structural_analysis_model",
+            self.file,
+            product=curve_connection,
+            structural_analysis_model=get_registry(self.file).structural_analysis_model,
+        )
+        if abs(start[2] - end[2]) < 0.0001:
+            curve_connection.Axis = self.file.createIfcDirection([0.0, 0.0, 1.0])
+            curve_connection.Name = "Horizontal connection"
+        elif abs(start[0] - end[0]) < 0.0001 and abs(start[1] - end[1]) < 0.0001:
+            curve_connection.Axis = self.file.createIfcDirection([0.0, 1.0, 0.0])
+            curve_connection.Name = "Vertical connection"
+        else:
+            vec_1 = subtract_3d(end, start)
+            vec_2 = [vec_1[1], 0.0 - vec_1[0], 0.0]
+            curve_connection.Axis = self.file.createIfcDirection(
+                x_product_3d(vec_1, vec_2)
+            )
+            curve_connection.Name = "Inclined connection"
+        run(
+            "geometry.assign_representation",
+            self.file,
+            product=curve_connection,
+            representation=self.file.createIfcTopologyRepresentation(
+                reference_context,
+                "Reference",
+                "Edge",
+                [
+                    self.file.createIfcEdge(
+                        self.file.createIfcVertexPoint(
+                            self.file.createIfcCartesianPoint(start)
+                        ),
+                        self.file.createIfcVertexPoint(
+                            self.file.createIfcCartesianPoint(end)
+                        ),
+                    )
+                ],
+            ),
+        )
+        for member in members:
+            run(
+                "structural.add_structural_member_connection",
+                self.file,
+                relating_structural_member=member,
+                related_structural_connection=curve_connection,
+            )
+        for footing in footings:
+            run(
+                "structural.add_structural_boundary_condition",
+                self.file,
+                name="foundation",
+                connection=curve_connection,
+            )
+            run(
+                "structural.edit_structural_boundary_condition",
+                self.file,
+                condition=curve_connection.AppliedCondition,
+                attributes={
+                    "TranslationalStiffnessByLengthX": {
+                        "type": "IfcBoolean",
+                        "value": True,
+                    },
+                    "TranslationalStiffnessByLengthY": {
+                        "type": "IfcBoolean",
+                        "value": True,
+                    },
+                    "TranslationalStiffnessByLengthZ": {
+                        "type": "IfcBoolean",
+                        "value": True,
+                    },
+                    "RotationalStiffnessByLengthX": {
+                        "type": "IfcBoolean",
+                        "value": False,
+                    },
+                    "RotationalStiffnessByLengthY": {
+                        "type": "IfcBoolean",
+                        "value": False,
+                    },
+                    "RotationalStiffnessByLengthZ": {
+                        "type": "IfcBoolean",
+                        "value": False,
+                    },
+                },
+            )
+        return curve_connection
 
     def GetTraceIfc(
         self,
@@ -433,7 +365,7 @@ class Molior:
                     closed = 1
                 path = []
                 for node in chain.nodes():
-                    path.append(string_to_coor_2d(node))
+                    path.append(key_to_coor_2d(node))
                 normal_set = "bottom"
                 if re.search("^top-", condition):
                     normal_set = "top"
@@ -11,7 +11,8 @@ from molior.geometry import (
     subtract_2d,
     line_intersection,
 )
-from molior.ifc import get_material_by_name
+from molior.ifc import get_material_by_name, get_registry
+from topologist.helpers import coor_to_key
 
 run = ifcopenshell.api.run
 
@@ -41,12 +42,9 @@ class BaseClass:
 
     def get_element_type(self):
         """Retrieve or create an Ifc Type definition for this Molior object"""
-        for item in self.file.by_type("IfcGeometricRepresentationSubContext"):
-            if item.ContextIdentifier == "Body":
-                body_context = item
-        element_types = {}
-        for element_type in self.file.by_type(self.ifc_class):
-            element_types[element_type.Name] = element_type
+        registry = get_registry(self.file)
+        body_context = registry.contexts.get("Body")
+        element_types = registry.types_by_name(self.ifc_class)
         if self.name in element_types:
             myelement_type = element_types[self.name]
         else:
@@ -62,8 +60,9 @@ class BaseClass:
                 "project.assign_declaration",
                 self.file,
                 definition=myelement_type,
-                relating_context=self.file.by_type("IfcProject")[0],
+                relating_context=registry.project,
             )
+            registry.add_type(myelement_type)
             run(
                 "material.assign_material",
                 self.file,
@@ -178,11 +177,11 @@ class TraceClass(BaseClass):
         # deal with ends of open paths
         if not self.closed and index in (len(self.path) - 1, 0):
             coor = self.corner_coor(index)
-            string = str(coor[0]) + "__" + str(coor[1]) + "__" + str(self.elevation)
+            key = coor_to_key([coor[0], coor[1], self.elevation])
             normal_map = self.normals[self.normal_set]
-            if self.condition == "external" and string in normal_map:
+            if self.condition == "external" and key in normal_map:
                 # we have a stashed normal for this corner
-                line_mitre = points_2line(coor, add_2d(coor, normal_map[string]))
+                line_mitre = points_2line(coor, add_2d(coor, normal_map[key]))
                 if index == len(self.path) - 1:
                     return line_intersection(line_a, line_mitre)
                 if index == 0:
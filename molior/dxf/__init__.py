@@ -0,0 +1,167 @@
+"""Parsed geometry from DXF asset files
+
+Windows, doors, columns and extrusion profiles are defined as DXF files in the
+style folders, the same files are used by every building.  read() parses a DXF
+file once, returning an Asset with polyface meshes as numpy vertex and index
+arrays, and 2D polylines as closed profiles.
+
+Assets are kept in memory, least recently used are discarded after 'maxsize'
+files, and saved in ${cache_dir} as .npz files, least recently used are deleted
+after 'maxfiles'.  Both are keyed by the path, modification time and size of
+the DXF file, so an edited DXF is parsed again.  Set 'cache_dir' to None to skip
+the cache files.
+
+"""
+
+import collections
+import hashlib
+import os
+import numpy
+import ezdxf
+import topologist.helpers as helpers
+
+# increment when the cache file format changes
+VERSION = 1
+
+cache_dir = helpers.cache_dir("dxf")
+maxsize = 128
+maxfiles = 1024
+
+# (path, mtime, size) -> Asset, least recently used first
+memory = collections.OrderedDict()
+
+
+class Asset:
+    """Geometry from a DXF file"""
+
+    def __init__(self):
+        # [[N,3] float64 vertices, [int32 vertex indices for each face]]
+        self.meshes = []
+        # [N,2] float64 closed polylines, first and last points are the same
+        self.profiles = []
+
+
+def parse(path_dxf):
+    """An Asset from a DXF file"""
+    asset = Asset()
+    doc = ezdxf.readfile(path_dxf)
+    model = doc.modelspace()
+    for entity in model:
+        if entity.get_mode() == "AcDbPolyFaceMesh":
+            if len(list(entity.faces())) == 0:
+                continue
+            vertices, faces = entity.indexed_faces()
+            asset.meshes.append(
+                [
+                    numpy.array(
+                        [list(vertex.dxf.location) for vertex in vertices],
+                        dtype=numpy.float64,
+                    ).reshape(-1, 3),
+                    [numpy.array(face.indices, dtype=numpy.int32) for face in faces],
+                ]
+            )
+        elif entity.get_mode() == "AcDb2dPolyline":
+            profile = list(entity.points())
+            if not profile[-1] == profile[0]:
+                # a closed polyline has first and last points coincident
+                profile.append(profile[0])
+            asset.profiles.append(
+                numpy.array(
+                    [[point[0], point[1]] for point in profile], dtype=numpy.float64
+                ).reshape(-1, 2)
+            )
+    return asset
+
+
+def offsets(lengths):
+    """[0, a, a+b, a+b+c, ...] for a list of lengths"""
+    return numpy.concatenate([[0], numpy.cumsum(lengths, dtype=numpy.int64)])
+
+
+def save(asset, path):
+    """Write an Asset as an .npz file"""
+    faces = [face for vertices, mesh_faces in asset.meshes for face in mesh_faces]
+
+    def write(fh):
+        numpy.savez(
+            fh,
+            version=numpy.array(VERSION, dtype=numpy.int32),
+            vertices=numpy.concatenate(
+                [numpy.empty((0, 3))] + [mesh[0] for mesh in asset.meshes]
+            ),
+            vertex_offsets=offsets([len(mesh[0]) for mesh in asset.meshes]),
+            indices=numpy.concatenate(
+                [numpy.empty(0, dtype=numpy.int32)] + faces
+            ).astype(numpy.int32),
+            index_offsets=offsets([len(face) for face in faces]),
+            face_offsets=offsets([len(mesh[1]) for mesh in asset.meshes]),
+            points=numpy.concatenate([numpy.empty((0, 2))] + asset.profiles),
+            point_offsets=offsets([len(profile) for profile in asset.profiles]),
+        )
+
+    helpers.write_replace(path, write)
+
+
+def load(path):
+    """An Asset from an .npz file written by save(), or None"""
+    with numpy.load(path, allow_pickle=False) as data:
+        if not int(data["version"]) == VERSION:
+            return None
+        arrays = {name: data[name] for name in data.files}
+    asset = Asset()
+    index_offsets = arrays["index_offsets"]
+    faces = [
+        arrays["indices"][index_offsets[index] : index_offsets[index + 1]]
+        for index in range(len(index_offsets) - 1)
+    ]
+    vertex_offsets = arrays["vertex_offsets"]
+    face_offsets = arrays["face_offsets"]
+    for index in range(len(vertex_offsets) - 1):
+        asset.meshes.append(
+            [
+                arrays["vertices"][vertex_offsets[index] : vertex_offsets[index + 1]],
+                faces[face_offsets[index] : face_offsets[index + 1]],
+            ]
+        )
+    point_offsets = arrays["point_offsets"]
+    for index in range(len(point_offsets) - 1):
+        asset.profiles.append(
+            arrays["points"][point_offsets[index] : point_offsets[index + 1]]
+        )
+    return asset
+
+
+def read(path_dxf):
+    """An Asset for a DXF file, from memory, a cache file, or parsed"""
+    path_dxf = os.path.abspath(path_dxf)
+    stat = os.stat(path_dxf)
+    key = (path_dxf, stat.st_mtime_ns, stat.st_size)
+    if key in memory:
+        memory.move_to_end(key)
+        return memory[key]
+
+    asset = None
+    if not cache_dir == None:
+        path_npz = os.path.join(
+            cache_dir,
+            hashlib.sha256(repr(key).encode()).hexdigest() + ".npz",
+        )
+        try:
+            asset = load(path_npz)
+            # keep recently used files
+            os.utime(path_npz)
+        except (OSError, ValueError, KeyError):
+            asset = None
+    if asset == None:
+        asset = parse(path_dxf)
+        if not cache_dir == None:
+            try:
+                save(asset, path_npz)
+                helpers.cache_evict(cache_dir, maxfiles)
+            except OSError:
+                pass
+
+    memory[key] = asset
+    while len(memory) > maxsize:
+        memory.popitem(last=False)
+    return asset
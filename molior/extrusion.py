@@ -7,6 +7,7 @@ from molior.ifc import (
     assign_storey_byindex,
     assign_extrusion_fromDXF,
     get_material_by_name,
+    get_registry,
 )
 
 run = ifcopenshell.api.run
@@ -31,11 +32,9 @@ class Extrusion(TraceClass):
 
     def execute(self):
         """Generate some ifc"""
-        for item in self.file.by_type("IfcGeometricRepresentationSubContext"):
-            if item.ContextIdentifier == "Reference":
-                reference_context = item
-            if item.ContextIdentifier == "Body":
-                body_context = item
+        registry = get_registry(self.file)
+        reference_context = registry.contexts.get("Reference")
+        body_context = registry.contexts.get("Body")
         style = molior.Molior.style
         entity = run(
             "root.create_entity",
@@ -69,9 +68,7 @@ class Extrusion(TraceClass):
                     "structural.assign_structural_analysis_model",
                     self.file,
                     product=structural_member,
-                    structural_analysis_model=self.file.by_type(
-                        "IfcStructuralAnalysisModel"
-                    )[0],
+                    structural_analysis_model=registry.structural_analysis_model,
                 )
                 run(
                     "geometry.assign_representation",
@@ -1,9 +1,7 @@
 import ifcopenshell.api
 
-from topologic import Vertex, Face, Cell
-from topologist.helpers import create_stl_list
-
 from molior.baseclass import TraceClass
+from topologist.helpers import TYPE_CELL
 from molior.geometry import matrix_align, map_to_2d
 from molior.ifc import (
     createExtrudedAreaSolid,
@@ -11,6 +9,7 @@ from molior.ifc import (
     createFaceSurface,
     assign_storey_byindex,
     get_material_by_name,
+    get_registry,
 )
 
 run = ifcopenshell.api.run
@@ -37,11 +36,9 @@ class Floor(TraceClass):
 
     def execute(self):
         """Generate some ifc"""
-        for item in self.file.by_type("IfcGeometricRepresentationSubContext"):
-            if item.ContextIdentifier == "Reference":
-                reference_context = item
-            if item.ContextIdentifier == "Body":
-                body_context = item
+        registry = get_registry(self.file)
+        reference_context = registry.contexts.get("Reference")
+        body_context = registry.contexts.get("Body")
         entity = run(
             "root.create_entity",
             self.file,
@@ -58,25 +55,21 @@ class Floor(TraceClass):
         )
         self.add_psets(myelement_type)
 
-        string_coor_start = next(iter(self.chain.graph))
-        cell = self.chain.graph[string_coor_start][1][3]
-        if cell.__class__ == Cell:
+        coor_start = next(iter(self.chain.graph))
+        cell = self.chain.graph[coor_start][1][3]
+        # a Topologic Cell, or its stand-in from molior.intermediate
+        if not cell == None and cell.GetType() == TYPE_CELL:
             topology_index = cell.Get("index")
             self.add_pset(entity, "EPset_Topology", {"CellIndex": str(topology_index)})
-            faces_bottom = create_stl_list(Face)
-            cell.FacesBottom(faces_bottom)
-            faces_bottom_indices = [
-                str(face.Get("index")) for face in list(faces_bottom)
-            ]
+            faces_bottom = cell.FacesBottomList()
+            faces_bottom_indices = [str(face.Get("index")) for face in faces_bottom]
             self.add_pset(
                 entity,
                 "EPset_Topology",
                 {"FaceIndices": " ".join(faces_bottom_indices)},
             )
-            for face in list(faces_bottom):
-                vertices_perimeter = create_stl_list(Vertex)
-                face.VerticesPerimeter(vertices_perimeter)
-                vertices = [[v.X(), v.Y(), v.Z()] for v in vertices_perimeter]
+            for face in faces_bottom:
+                vertices = [[v.X(), v.Y(), v.Z()] for v in face.VerticesPerimeterList()]
                 normal = face.Normal()
                 # need this for boundaries
                 nodes_2d, matrix, normal_x = map_to_2d(vertices, normal)
@@ -97,9 +90,7 @@ class Floor(TraceClass):
                     "structural.assign_structural_analysis_model",
                     self.file,
                     product=structural_surface,
-                    structural_analysis_model=self.file.by_type(
-                        "IfcStructuralAnalysisModel"
-                    )[0],
+                    structural_analysis_model=registry.structural_analysis_model,
                 )
                 run(
                     "geometry.assign_representation",
@@ -2,11 +2,17 @@
 
 A collection of code for commonly used IFC related tasks
 
+Entities that molior looks up repeatedly (contexts, storeys, materials, types,
+profile sets and the structural analysis model) are indexed by a Registry
+attached to the ifc 'file' object, see get_registry().  The Registry is kept
+up to date as molior creates entities, entities created by other code after
+the Registry is first used won't be found.
+
 """
 
 import os
-import ezdxf
 import ifcopenshell.api
+import molior.dxf
 from molior.geometry import (
     matrix_align,
     add_2d,
@@ -19,6 +25,58 @@ from molior.geometry import (
 run = ifcopenshell.api.run
 
 
+class Registry:
+    """Lookup tables for an ifc 'file' object, to avoid by_type() scans"""
+
+    def __init__(self, ifc):
+        self.file = ifc
+        # ContextIdentifier -> IfcGeometricRepresentationSubContext
+        self.contexts = {}
+        for item in ifc.by_type("IfcGeometricRepresentationSubContext"):
+            self.contexts[item.ContextIdentifier] = item
+        # Name -> entity
+        self.storeys = {}
+        for storey in ifc.by_type("IfcBuildingStorey"):
+            self.storeys[storey.Name] = storey
+        self.materials = {}
+        for material in ifc.by_type("IfcMaterial"):
+            self.materials[material.Name] = material
+        self.materialprofilesets = {}
+        for materialprofileset in ifc.by_type("IfcMaterialProfileSet"):
+            self.materialprofilesets[materialprofileset.Name] = materialprofileset
+        # ifc class -> Name -> entity, filled on demand
+        self.types = {}
+        self.project = None
+        self.structural_analysis_model = None
+        projects = ifc.by_type("IfcProject")
+        if projects:
+            self.project = projects[0]
+        models = ifc.by_type("IfcStructuralAnalysisModel")
+        if models:
+            self.structural_analysis_model = models[0]
+
+    def types_by_name(self, ifc_class):
+        """Name -> entity for an IfcTypeObject class, including subclasses"""
+        if not ifc_class in self.types:
+            self.types[ifc_class] = {}
+            for element_type in self.file.by_type(ifc_class):
+                self.types[ifc_class][element_type.Name] = element_type
+        return self.types[ifc_class]
+
+    def add_type(self, element_type):
+        """Record a new IfcTypeObject"""
+        for ifc_class in self.types:
+            if element_type.is_a(ifc_class):
+                self.types[ifc_class][element_type.Name] = element_type
+
+
+def get_registry(self):
+    """The Registry for an ifc 'file' object, created on first use"""
+    if not "molior_registry" in self.__dict__:
+        self.molior_registry = Registry(self)
+    return self.molior_registry
+
+
 def init(building_name, elevations):
     """Creates and sets up an ifc 'file' object"""
     ifc = run("project.create_file")
@@ -85,6 +143,7 @@ def createBuilding(self, site, building_name, elevations):
         mystorey.Description = "Storey " + mystorey.Name
         mystorey.LongName = mystorey.Description
         mystorey.CompositionType = "ELEMENT"
+        get_registry(self).storeys[mystorey.Name] = mystorey
         run("aggregate.assign_object", self, product=mystorey, relating_object=building)
         run(
             "geometry.edit_object_placement",
@@ -208,9 +267,7 @@ def assign_extrusion_fromDXF(
     identifier = stylename + "/" + os.path.split(path_dxf)[-1]
 
     # let's see if there is an existing MaterialProfileSet recorded
-    materialprofilesets = {}
-    for materialprofileset in self.by_type("IfcMaterialProfileSet"):
-        materialprofilesets[materialprofileset.Name] = materialprofileset
+    materialprofilesets = get_registry(self).materialprofilesets
 
     if identifier in materialprofilesets:
         # profile(s) already defined, use them
@@ -220,29 +277,22 @@ def assign_extrusion_fromDXF(
         ]
     else:
         # profile(s) not defined, load from the DXF
-        doc = ezdxf.readfile(path_dxf)
-        model = doc.modelspace()
         closedprofiledefs = []
-        for entity in model:
-            if entity.get_mode() == "AcDb2dPolyline":
-                profile = list(entity.points())
-                if not profile[-1] == profile[0]:
-                    # a closed polyline has first and last points coincident
-                    profile.append(profile[0])
-                closedprofiledefs.append(
-                    self.createIfcArbitraryClosedProfileDef(
-                        "AREA",
-                        None,
-                        self.createIfcPolyline(
-                            [
-                                self.createIfcCartesianPoint([point[1], point[0]])
-                                for point in profile
-                            ]
-                        ),
+        for profile in molior.dxf.read(path_dxf).profiles:
+            closedprofiledefs.append(
+                self.createIfcArbitraryClosedProfileDef(
+                    "AREA",
+                    None,
+                    self.createIfcPolyline(
+                        [
+                            self.createIfcCartesianPoint([point[1], point[0]])
+                            for point in profile.tolist()
+                        ]
                     ),
-                )
+                ),
+            )
         # record profile(s) in a MaterialProfileSet so we can find them again
-        self.createIfcMaterialProfileSet(
+        materialprofilesets[identifier] = self.createIfcMaterialProfileSet(
             identifier,
             None,
             [
@@ -291,23 +341,12 @@ def assign_extrusion_fromDXF(
 
 def createTessellations_fromDXF(self, path_dxf):
     """Create Tessellations given a DXF filepath"""
-    doc = ezdxf.readfile(path_dxf)
-    model = doc.modelspace()
-    tessellations = []
-    for entity in model:
-        if entity.get_mode() == "AcDbPolyFaceMesh":
-            if len(list(entity.faces())) == 0:
-                continue
-            vertices, faces = entity.indexed_faces()
-
-            tessellations.append(
-                createTessellation_fromMesh(
-                    self,
-                    [vertex.dxf.location for vertex in vertices],
-                    [face.indices for face in faces],
-                )
-            )
-    return tessellations
+    return [
+        createTessellation_fromMesh(
+            self, vertices.tolist(), [face.tolist() for face in faces]
+        )
+        for vertices, faces in molior.dxf.read(path_dxf).meshes
+    ]
 
 
 def createTessellation_fromMesh(self, vertices, faces):
@@ -323,9 +362,7 @@ def createTessellation_fromMesh(self, vertices, faces):
 def assign_storey_byindex(self, entity, index):
     """Assign object to a storey by index"""
     # FIXME will fail if there are not enough storeys defined or they are unordered"""
-    storeys = {}
-    for storey in self.by_type("IfcBuildingStorey"):
-        storeys[storey.Name] = storey
+    storeys = get_registry(self).storeys
     run(
         "aggregate.assign_object",
         self,
@@ -339,9 +376,8 @@ def assign_representation_fromDXF(self, body_context, element, stylename, path_d
     identifier = stylename + "/" + os.path.split(path_dxf)[-1]
 
     # let's see if there is an existing TypeProduct defined
-    typeproducts = {}
-    for typeproduct in self.by_type("IfcTypeProduct"):
-        typeproducts[typeproduct.Name] = typeproduct
+    registry = get_registry(self)
+    typeproducts = registry.types_by_name("IfcTypeProduct")
 
     if identifier in typeproducts:
         # The TypeProduct knows what MappedRepresentations to use
@@ -366,15 +402,17 @@ def assign_representation_fromDXF(self, body_context, element, stylename, path_d
         )
 
         # create a mapped item that can be reused
+        typeproduct = run(
+            "root.create_entity",
+            self,
+            ifc_class="IfcTypeProduct",
+            name=identifier,
+        )
+        registry.add_type(typeproduct)
         run(
             "geometry.assign_representation",
             self,
-            product=run(
-                "root.create_entity",
-                self,
-                ifc_class="IfcTypeProduct",
-                name=identifier,
-            ),
+            product=typeproduct,
             representation=brep,
         )
 
@@ -390,14 +428,13 @@ def assign_representation_fromDXF(self, body_context, element, stylename, path_d
 
 def get_material_by_name(self, body_context, material_name):
     """Retrieve an IfcMaterial by name, creating it if necessary"""
-    materials = {}
-    for material in self.by_type("IfcMaterial"):
-        materials[material.Name] = material
+    materials = get_registry(self).materials
     if material_name in materials:
         mymaterial = materials[material_name]
     else:
         # we need to create a new material
         mymaterial = run("material.add_material", self, name=material_name)
+        materials[material_name] = mymaterial
         run(
             "style.assign_material_style",
             self,
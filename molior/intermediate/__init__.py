@@ -0,0 +1,468 @@
+"""A serialisable intermediate representation of traces, hulls and normals
+
+CellComplex.GetTraces() returns traces and hulls that refer to live
+Topologic Vertices, Faces and Cells, so they can't be cached, or passed
+to another process, or used after the CellComplex is gone.  write()
+saves everything Molior needs in a versioned numpy .npz file: chain
+topology and coordinate keys as integer arrays, and the few properties
+of each Face and Cell that Molior queries.  read() returns an
+Intermediate with the same traces, hulls and normals structure, where
+the Faces and Cells are replaced with lightweight records implementing
+the same methods.  Pass the CellComplex to write() to also save the Edges
+needed for connecting structural members.
+
+    molior.intermediate.write("building.npz", traces, hulls, normals, elevations)
+    molior_object = Molior(file=ifc, intermediate=molior.intermediate.read("building.npz"))
+
+"""
+
+import json
+import numpy
+import topologist.ugraph as ugraph
+import topologist.ushell as ushell
+from topologist.helpers import (
+    topology_key,
+    key_to_coor,
+    TYPE_VERTEX,
+    TYPE_EDGE,
+    TYPE_FACE,
+    TYPE_CELL,
+)
+
+# increment when the file format changes
+VERSION = 2
+
+
+class Vertex:
+    """A stand-in for a Topologic Vertex"""
+
+    def __init__(self, coor):
+        self.coor = [float(value) for value in coor]
+
+    def X(self):
+        return self.coor[0]
+
+    def Y(self):
+        return self.coor[1]
+
+    def Z(self):
+        return self.coor[2]
+
+    def Coordinates(self):
+        return list(self.coor)
+
+    def GetType(self):
+        return TYPE_VERTEX
+
+
+class Edge:
+    """A stand-in for a Topologic Edge"""
+
+    def __init__(self, start, end):
+        self.start = Vertex(start)
+        self.end = Vertex(end)
+
+    def StartVertex(self):
+        return self.start
+
+    def EndVertex(self):
+        return self.end
+
+    def GetType(self):
+        return TYPE_EDGE
+
+
+class Face:
+    """A stand-in for a Topologic Face, with the properties Molior uses"""
+
+    def __init__(self, record):
+        self.record = record
+        # Cells are resolved after all records have been created
+        self.cells = [None, None]
+
+    def Get(self, key):
+        return self.record["attributes"].get(key)
+
+    def DumpDictionary(self):
+        return dict(self.record["attributes"])
+
+    def Normal(self):
+        return list(self.record["normal"])
+
+    def VerticesPerimeterList(self):
+        return [Vertex(coor) for coor in self.record["perimeter"]]
+
+    def EdgesCropList(self):
+        return [Edge(*edge) for edge in self.record["crop"]]
+
+    def CellsOrdered(self):
+        return list(self.cells)
+
+    def IsInternal(self):
+        return self.record["internal"]
+
+    def IsExternal(self):
+        return self.record["external"]
+
+    def GraphVertex(self, graph):
+        """Something if this Face is in the circulation graph, otherwise None"""
+        if graph == None or self.Get("index") == None:
+            return None
+        return graph.Index().vertex("Face", self.Get("index"))
+
+    def GetType(self):
+        return TYPE_FACE
+
+
+class Cell:
+    """A stand-in for a Topologic Cell, with the properties Molior uses"""
+
+    def __init__(self, record):
+        self.record = record
+        # Faces are resolved after all records have been created
+        self.faces_bottom = []
+
+    def Get(self, key):
+        return self.record["attributes"].get(key)
+
+    def DumpDictionary(self):
+        return dict(self.record["attributes"])
+
+    def Usage(self):
+        return self.record["usage"]
+
+    def IsOutside(self):
+        return self.record["outside"]
+
+    def Crinkliness(self):
+        return self.record["crinkliness"]
+
+    def FacesBottomList(self):
+        return list(self.faces_bottom)
+
+    def FacesInclinedList(self):
+        """only the number of inclined Faces is recorded"""
+        return [None] * self.record["inclined"]
+
+    def MeshArrays(self):
+        vertices, faces = self.record["mesh"]
+        return (
+            numpy.array(vertices, dtype=numpy.float64),
+            [numpy.array(face, dtype=numpy.int32) for face in faces],
+        )
+
+    def GraphVertex(self, graph):
+        if graph == None or self.Get("index") == None:
+            return None
+        return graph.Index().vertex("Cell", self.Get("index"))
+
+    def GetType(self):
+        return TYPE_CELL
+
+
+class GraphIndex:
+    """A stand-in for the circulation Graph, only knows which Faces and
+    Cells have a Vertex"""
+
+    def __init__(self, keys):
+        self.vertices = {}
+        for key in keys:
+            self.vertices[tuple(key)] = True
+
+    def Index(self):
+        return self
+
+    def vertex(self, myclass, index):
+        return self.vertices.get((myclass, index))
+
+
+class Intermediate:
+    """traces, hulls, normals and elevations, as returned by read()"""
+
+    def __init__(self):
+        self.traces = {}
+        self.hulls = {}
+        self.normals = {}
+        self.elevations = {}
+        self.circulation = None
+        # [start, end, [Face indices]] for connecting structural members
+        self.edges = []
+        self.faces = []
+        self.cells = []
+
+
+class Collector:
+    """Allocates ids to the Faces and Cells referenced by traces and hulls"""
+
+    def __init__(self):
+        self.faces = []
+        self.cells = []
+        # topology_key() -> id
+        self.ids = {}
+
+    def id(self, entity):
+        """id of a Face or Cell, -1 for anything else"""
+        if entity == None:
+            return -1
+        entity_type = entity.GetType()
+        if not entity_type == TYPE_FACE and not entity_type == TYPE_CELL:
+            return -1
+        key = topology_key(entity)
+        if not key in self.ids:
+            if entity_type == TYPE_FACE:
+                self.ids[key] = len(self.faces)
+                self.faces.append(entity)
+            else:
+                self.ids[key] = len(self.cells)
+                self.cells.append(entity)
+        return self.ids[key]
+
+    def records(self):
+        """Properties of all Faces and Cells, including those they refer to"""
+        faces = []
+        cells = []
+        while len(faces) < len(self.faces) or len(cells) < len(self.cells):
+            while len(faces) < len(self.faces):
+                face = self.faces[len(faces)]
+                faces.append(
+                    {
+                        "attributes": face.DumpDictionary(),
+                        "normal": list(face.Normal()),
+                        "perimeter": [
+                            [vertex.X(), vertex.Y(), vertex.Z()]
+                            for vertex in face.VerticesPerimeterList()
+                        ],
+                        "crop": [
+                            [
+                                [
+                                    edge.StartVertex().X(),
+                                    edge.StartVertex().Y(),
+                                    edge.StartVertex().Z(),
+                                ],
+                                [
+                                    edge.EndVertex().X(),
+                                    edge.EndVertex().Y(),
+                                    edge.EndVertex().Z(),
+                                ],
+                            ]
+                            for edge in face.EdgesCropList()
+                        ],
+                        "cells": [self.id(cell) for cell in face.CellsOrdered()],
+                        "internal": bool(face.IsInternal()),
+                        "external": bool(face.IsExternal()),
+                    }
+                )
+            while len(cells) < len(self.cells):
+                cell = self.cells[len(cells)]
+                inclined = len(cell.FacesInclinedList())
+                mesh = None
+                if inclined:
+                    vertices, mesh_faces = cell.MeshArrays()
+                    mesh = [vertices.tolist(), [face.tolist() for face in mesh_faces]]
+                cells.append(
+                    {
+                        "attributes": cell.DumpDictionary(),
+                        "usage": cell.Usage(),
+                        "outside": bool(cell.IsOutside()),
+                        "crinkliness": float(cell.Crinkliness()),
+                        "faces_bottom": [
+                            self.id(face) for face in cell.FacesBottomList()
+                        ],
+                        "inclined": inclined,
+                        "mesh": mesh,
+                    }
+                )
+        return faces, cells
+
+
+def write(path, traces, hulls, normals, elevations, circulation=None, cellcomplex=None):
+    """Save the results of CellComplex.GetTraces() and Elevations(), and
+    optionally which Faces and Cells are in a circulation Graph, and the
+    CellComplex.StructuralEdges()"""
+    collector = Collector()
+    nodes = {}
+
+    def node_id(key):
+        if not key in nodes:
+            nodes[key] = len(nodes)
+        return nodes[key]
+
+    # each chain is a run of edges: start node, end node, Face, Cell, Cell
+    chain_labels = []
+    chain_ranges = []
+    trace_edges = []
+    for label in traces:
+        for elevation in traces[label]:
+            for height in traces[label][elevation]:
+                for stylename in traces[label][elevation][height]:
+                    for chain in traces[label][elevation][height][stylename]:
+                        chain_labels.append([label, elevation, height, stylename])
+                        chain_ranges.append([len(trace_edges), len(chain.graph)])
+                        for start in chain.graph:
+                            end, data = chain.graph[start]
+                            trace_edges.append(
+                                [
+                                    node_id(start),
+                                    node_id(end),
+                                    collector.id(data[2]),
+                                    collector.id(data[3]),
+                                    collector.id(data[4]),
+                                ]
+                            )
+
+    # each hull face is a run of nodes, with a normal, Face, Cell and Cell
+    hull_labels = []
+    hull_ids = []
+    hull_nodes = []
+    hull_offsets = [0]
+    hull_normals = []
+    hull_data = []
+    for label in hulls:
+        for stylename in hulls[label]:
+            for hull in hulls[label][stylename]:
+                for face in hull.faces:
+                    hull_ids.append(len(hull_labels))
+                    hull_nodes.extend([node_id(key) for key in face[0]])
+                    hull_offsets.append(len(hull_nodes))
+                    hull_normals.append(list(face[1]))
+                    hull_data.append([collector.id(entity) for entity in face[2]])
+                hull_labels.append([label, stylename])
+
+    normal_labels = list(normals)
+    normal_ids = []
+    normal_keys = []
+    normal_vectors = []
+    for label_id in range(len(normal_labels)):
+        for key in normals[normal_labels[label_id]]:
+            normal_ids.append(label_id)
+            normal_keys.append(list(key))
+            normal_vectors.append(list(normals[normal_labels[label_id]][key]))
+
+    circulation_keys = []
+    if circulation:
+        circulation_keys = [list(key) for key in circulation.Index().vertices]
+
+    edges = []
+    if cellcomplex:
+        edges = cellcomplex.StructuralEdges()
+
+    faces, cells = collector.records()
+    header = {
+        "version": VERSION,
+        "chains": chain_labels,
+        "hulls": hull_labels,
+        "normals": normal_labels,
+        "elevations": [[elevation, elevations[elevation]] for elevation in elevations],
+        "circulation": circulation_keys,
+        "edges": edges,
+        "faces": faces,
+        "cells": cells,
+    }
+    numpy.savez_compressed(
+        path,
+        version=numpy.array(VERSION, dtype=numpy.int32),
+        header=numpy.array(json.dumps(header)),
+        nodes=numpy.array(list(nodes), dtype=numpy.int64).reshape(-1, 3),
+        chain_ranges=numpy.array(chain_ranges, dtype=numpy.int32).reshape(-1, 2),
+        trace_edges=numpy.array(trace_edges, dtype=numpy.int32).reshape(-1, 5),
+        hull_ids=numpy.array(hull_ids, dtype=numpy.int32),
+        hull_nodes=numpy.array(hull_nodes, dtype=numpy.int32),
+        hull_offsets=numpy.array(hull_offsets, dtype=numpy.int32),
+        hull_normals=numpy.array(hull_normals, dtype=numpy.float64).reshape(-1, 3),
+        hull_data=numpy.array(hull_data, dtype=numpy.int32).reshape(-1, 3),
+        normal_ids=numpy.array(normal_ids, dtype=numpy.int32),
+        normal_keys=numpy.array(normal_keys, dtype=numpy.int64).reshape(-1, 3),
+        normal_vectors=numpy.array(normal_vectors, dtype=numpy.float64).reshape(-1, 3),
+    )
+
+
+def read(path):
+    """An Intermediate from a file created by write()"""
+    with numpy.load(path, allow_pickle=False) as data:
+        if not int(data["version"]) == VERSION:
+            raise ValueError("unsupported intermediate version " + str(data["version"]))
+        header = json.loads(str(data["header"]))
+        arrays = {name: data[name] for name in data.files}
+
+    result = Intermediate()
+    result.faces = [Face(record) for record in header["faces"]]
+    result.cells = [Cell(record) for record in header["cells"]]
+
+    def entity(entities, index):
+        if index < 0:
+            return None
+        return entities[index]
+
+    for face in result.faces:
+        face.cells = [entity(result.cells, index) for index in face.record["cells"]]
+    for cell in result.cells:
+        cell.faces_bottom = [
+            entity(result.faces, index) for index in cell.record["faces_bottom"]
+        ]
+
+    nodes = [tuple(key) for key in arrays["nodes"].tolist()]
+    vertices = [Vertex(key_to_coor(key)) for key in nodes]
+
+    trace_edges = arrays["trace_edges"].tolist()
+    for chain_label, chain_range in zip(
+        header["chains"], arrays["chain_ranges"].tolist()
+    ):
+        label, elevation, height, stylename = chain_label
+        chain = ugraph.graph()
+        for edge in trace_edges[chain_range[0] : chain_range[0] + chain_range[1]]:
+            chain.add_edge(
+                {
+                    nodes[edge[0]]: [
+                        nodes[edge[1]],
+                        [
+                            vertices[edge[0]],
+                            vertices[edge[1]],
+                            entity(result.faces, edge[2]),
+                            entity(result.cells, edge[3]),
+                            entity(result.cells, edge[4]),
+                        ],
+                    ]
+                }
+            )
+        result.traces.setdefault(label, {}).setdefault(elevation, {}).setdefault(
+            height, {}
+        ).setdefault(stylename, []).append(chain)
+
+    shells = [ushell.shell() for hull_label in header["hulls"]]
+    hull_nodes = arrays["hull_nodes"].tolist()
+    hull_offsets = arrays["hull_offsets"].tolist()
+    hull_normals = arrays["hull_normals"].tolist()
+    hull_data = arrays["hull_data"].tolist()
+    for index, hull_id in enumerate(arrays["hull_ids"].tolist()):
+        shells[hull_id].add_face(
+            [
+                key_to_coor(nodes[node])
+                for node in hull_nodes[hull_offsets[index] : hull_offsets[index + 1]]
+            ],
+            hull_normals[index],
+            [
+                entity(result.faces, hull_data[index][0]),
+                entity(result.cells, hull_data[index][1]),
+                entity(result.cells, hull_data[index][2]),
+            ],
+        )
+    for hull_label, hull in zip(header["hulls"], shells):
+        result.hulls.setdefault(hull_label[0], {}).setdefault(hull_label[1], []).append(
+            hull
+        )
+
+    for label in header["normals"]:
+        result.normals[label] = {}
+    for label_id, key, vector in zip(
+        arrays["normal_ids"].tolist(),
+        arrays["normal_keys"].tolist(),
+        arrays["normal_vectors"].tolist(),
+    ):
+        result.normals[header["normals"][label_id]][tuple(key)] = vector
+
+    for elevation, level in header["elevations"]:
+        result.elevations[elevation] = level
+    result.edges = header["edges"]
+    if header["circulation"]:
+        result.circulation = GraphIndex(header["circulation"])
+    return result
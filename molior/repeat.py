@@ -7,6 +7,7 @@ from molior.ifc import (
     assign_representation_fromDXF,
     assign_storey_byindex,
     get_material_by_name,
+    get_registry,
 )
 from molior.extrusion import Extrusion
 
@@ -41,11 +42,9 @@ class Repeat(TraceClass):
 
     def execute(self):
         """Generate some ifc"""
-        for item in self.file.by_type("IfcGeometricRepresentationSubContext"):
-            if item.ContextIdentifier == "Reference":
-                reference_context = item
-            if item.ContextIdentifier == "Body":
-                body_context = item
+        registry = get_registry(self.file)
+        reference_context = registry.contexts.get("Reference")
+        body_context = registry.contexts.get("Body")
         style = molior.Molior.style
         myconfig = style.get(self.style)
         if self.asset in self.style_assets:
@@ -181,9 +180,7 @@ class Repeat(TraceClass):
                             "structural.assign_structural_analysis_model",
                             self.file,
                             product=structural_member,
-                            structural_analysis_model=self.file.by_type(
-                                "IfcStructuralAnalysisModel"
-                            )[0],
+                            structural_analysis_model=registry.structural_analysis_model,
                         )
                         run(
                             "geometry.assign_representation",
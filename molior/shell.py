@@ -1,6 +1,6 @@
 import ifcopenshell.api
 
-from topologist.helpers import string_to_coor
+from topologist.helpers import key_to_coor
 from molior.baseclass import BaseClass
 from molior.geometry import map_to_2d
 from molior.ifc import (
@@ -9,6 +9,7 @@ from molior.ifc import (
     createFaceSurface,
     assign_storey_byindex,
     get_material_by_name,
+    get_registry,
 )
 
 run = ifcopenshell.api.run
@@ -34,11 +35,9 @@ class Shell(BaseClass):
 
     def execute(self):
         """Generate some ifc"""
-        for item in self.file.by_type("IfcGeometricRepresentationSubContext"):
-            if item.ContextIdentifier == "Reference":
-                reference_context = item
-            if item.ContextIdentifier == "Body":
-                body_context = item
+        registry = get_registry(self.file)
+        reference_context = registry.contexts.get("Reference")
+        body_context = registry.contexts.get("Body")
         aggregate = run(
             "root.create_entity",
             self.file,
@@ -48,7 +47,7 @@ class Shell(BaseClass):
         # FIXME this puts roofs in the ground floor
         assign_storey_byindex(self.file, aggregate, 0)
         for face in self.hull.faces:
-            vertices = [[*string_to_coor(node_str)] for node_str in face[0]]
+            vertices = [[*key_to_coor(node_key)] for node_key in face[0]]
             normal = face[1]
             nodes_2d, matrix, normal_x = map_to_2d(vertices, normal)
             # need this for structure
@@ -68,9 +67,7 @@ class Shell(BaseClass):
                 "structural.assign_structural_analysis_model",
                 self.file,
                 product=structural_surface,
-                structural_analysis_model=self.file.by_type(
-                    "IfcStructuralAnalysisModel"
-                )[0],
+                structural_analysis_model=registry.structural_analysis_model,
             )
             run(
                 "geometry.assign_representation",
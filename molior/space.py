@@ -1,14 +1,13 @@
 import ifcopenshell.api
 import numpy
 
-from topologic import Face
-from topologist.helpers import create_stl_list
 from molior.baseclass import TraceClass
 from molior.geometry import matrix_align
 from molior.ifc import (
     createExtrudedAreaSolid,
     createTessellation_fromMesh,
     assign_storey_byindex,
+    get_registry,
 )
 
 run = ifcopenshell.api.run
@@ -33,12 +32,11 @@ class Space(TraceClass):
 
     def execute(self):
         """Generate some ifc"""
-        for item in self.file.by_type("IfcGeometricRepresentationSubContext"):
-            if item.ContextIdentifier == "Body":
-                body_context = item
+        registry = get_registry(self.file)
+        body_context = registry.contexts.get("Body")
         # the cell is the first cell attached to any edge in the chain
-        string_coor_start = next(iter(self.chain.graph))
-        cell = self.chain.graph[string_coor_start][1][3]
+        coor_start = next(iter(self.chain.graph))
+        cell = self.chain.graph[coor_start][1][3]
 
         entity = run(
             "root.create_entity",
@@ -71,14 +69,12 @@ class Space(TraceClass):
         representationtype = "SweptSolid"
 
         # clip if original cell has non-horizontal ceiling
-        faces_stl = create_stl_list(Face)
-        cell.FacesInclined(faces_stl)
-        if len(faces_stl) > 0:
-            vertices, faces = cell.Mesh()
-            vertices = [
-                [v[0], v[1], v[2] - self.elevation - self.floor] for v in vertices
-            ]
-            tessellation = createTessellation_fromMesh(self.file, vertices, faces)
+        if len(cell.FacesInclinedList()) > 0:
+            vertices, faces = cell.MeshArrays()
+            vertices[:, 2] -= self.elevation + self.floor
+            tessellation = createTessellation_fromMesh(
+                self.file, vertices.tolist(), [face.tolist() for face in faces]
+            )
             representation = self.file.createIfcBooleanResult(
                 "INTERSECTION", representation, tessellation
             )
@@ -15,9 +15,61 @@ allows inheritance to be defined entirely by rearrangement of the configuration
 data.  This also means that there may only be one folder called 'thin' in the
 folder tree, all others will be ignored.
 
+Flattened styles are resolved once per stylename and shared, so the result of
+get() is a read-only view: dictionaries are MappingProxyType and lists are
+tuples.  Copy any part that needs to be modified.
+
+Parsing all the YAML is slow, so the parsed data and file paths are shared by
+every Style with the same share_dir in this process, and saved in a cache file
+in ${cache_dir}.  Both are checked by every new Style, and used only while the
+modification times and sizes of the folders and YAML files in ${share_dir} are
+unchanged.  Other files are only recorded by path, so adding, removing or
+renaming them changes the modification time of a folder, there is no need to
+stat them.
+
 """
 
-import os, yaml, copy
+import os, yaml, copy, hashlib, marshal
+from types import MappingProxyType
+from topologist.helpers import cache_dir, write_replace
+
+# increment when the cache file format changes
+VERSION = 1
+
+# the C YAML parser is much faster, but is optional
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# share_dir -> [signature, Style], shared by all Style objects in this process
+compiled = {}
+
+
+def frozen(item):
+    """A read-only view of nested dictionaries and lists"""
+    if isinstance(item, dict):
+        return MappingProxyType({key: frozen(value) for key, value in item.items()})
+    if isinstance(item, list):
+        return tuple([frozen(value) for value in item])
+    return item
+
+
+def signature(share_dir):
+    """A hash of the modification times and sizes of the folders and YAML files
+    in share_dir"""
+    digest = hashlib.sha256(("style " + str(VERSION)).encode())
+    for root, dirs, files in os.walk(share_dir):
+        dirs.sort()
+        paths = [root]
+        for name in sorted(files):
+            if name.endswith(".yml"):
+                paths.append(os.path.join(root, name))
+        for path in paths:
+            stat = os.stat(path)
+            digest.update(
+                repr(
+                    [os.path.relpath(path, share_dir), stat.st_mtime_ns, stat.st_size]
+                ).encode()
+            )
+    return digest.hexdigest()
 
 
 class Style:
@@ -25,10 +77,16 @@ class Style:
         """Read all the data in ${share_dir} and sub-folders, collect names of
         non-YAML files. Default location is a folder called 'share' installed with this
         module, or pass an absolute path in the 'share_dir' parameter to indicate a
-        different collection of styles."""
+        different collection of styles.  Set 'cache_dir' to None to skip the cache
+        file."""
         self.share_dir = "share"
+        self.cache_dir = cache_dir("styles")
         self.data = {}
         self.files = {}
+        # stylename -> flattened data, read-only views and file paths
+        self.flattened = {}
+        self.views = {}
+        self.resolved_files = {}
         for arg in args:
             self.__dict__[arg] = args[arg]
 
@@ -38,7 +96,25 @@ class Style:
             )
         self.share_dir = os.path.normpath(self.share_dir)
         # share_dir should now be an absolute path
-        # slurp all the yaml data under share_dir
+        key = signature(self.share_dir)
+        if self.share_dir in compiled and compiled[self.share_dir][0] == key:
+            self.share(compiled[self.share_dir][1])
+            return
+        if not self.load_cache(key):
+            self.read_share_dir()
+            self.save_cache(key)
+        compiled[self.share_dir] = [key, self]
+
+    def share(self, shared):
+        """use the data, files and flattened styles of another Style"""
+        self.data = shared.data
+        self.files = shared.files
+        self.flattened = shared.flattened
+        self.views = shared.views
+        self.resolved_files = shared.resolved_files
+
+    def read_share_dir(self):
+        """slurp all the yaml data under share_dir"""
         for root, dirs, files in os.walk(self.share_dir):
             for name in files:
                 prefix, ext = os.path.splitext(name)
@@ -52,7 +128,7 @@ class Style:
 
                 if ext == ".yml":
                     fh = open(os.path.join(root, name), "rb")
-                    data = yaml.safe_load(fh.read())
+                    data = yaml.load(fh.read(), Loader=Loader)
                     fh.close()
 
                     if not stylename in self.data:
@@ -64,29 +140,81 @@ class Style:
                         self.files[stylename] = {}
                     self.files[stylename][name] = os.path.join(root, name)
 
+    def cache_path(self):
+        """cache file for this share_dir"""
+        name = hashlib.sha256(self.share_dir.encode()).hexdigest()
+        return os.path.join(self.cache_dir, name + ".marshal")
+
+    def load_cache(self, key):
+        """use data and files from the cache file if the signature matches"""
+        if self.cache_dir == None:
+            return False
+        try:
+            with open(self.cache_path(), "rb") as fh:
+                cached = marshal.load(fh)
+        except (OSError, EOFError, ValueError, TypeError):
+            return False
+        if not cached.__class__ == dict:
+            return False
+        if not cached.get("version") == VERSION or not cached.get("signature") == key:
+            return False
+        self.data = cached["data"]
+        self.files = cached["files"]
+        return True
+
+    def save_cache(self, key):
+        """write data and files to the cache file, failure is not an error"""
+        if self.cache_dir == None:
+            return
+        cached = {
+            "version": VERSION,
+            "signature": key,
+            "data": self.data,
+            "files": self.files,
+        }
+        try:
+            write_replace(self.cache_path(), lambda fh: marshal.dump(cached, fh))
+        except (OSError, ValueError):
+            pass
+
+    def flatten(self, stylename):
+        """a flattened style definition, ancestors are flattened first"""
+        if not stylename in self.data:
+            stylename = "default"
+        if not stylename in self.flattened:
+            mydata = self.data[stylename]
+            if len(mydata["ancestors"]) == 0:
+                result = copy.deepcopy(mydata)
+            else:
+                result = copy.deepcopy(self.flatten(mydata["ancestors"][0]))
+                for key in result:
+                    if not key == "ancestors":
+                        if key in mydata:
+                            result[key].update(copy.deepcopy(mydata[key]))
+            self.flattened[stylename] = result
+        return self.flattened[stylename]
+
     def get(self, stylename):
-        """retrieves a flattened style definition with ancestors filling in the gaps"""
+        """retrieves a flattened style definition with ancestors filling in the gaps,
+        the result is shared and read-only"""
         if not stylename in self.data:
             return self.get("default")
-        mydata = copy.deepcopy(self.data[stylename])
-        if len(mydata["ancestors"]) == 0:
-            return mydata
-        ancestor = self.get(mydata["ancestors"][0])
-        for key in ancestor:
-            if not key == "ancestors":
-                if key in mydata:
-                    ancestor[key].update(mydata[key])
-        return ancestor
+        if not stylename in self.views:
+            self.views[stylename] = frozen(self.flatten(stylename))
+        return self.views[stylename]
+
+    def files_all(self, stylename):
+        """filename -> path for all files available to a style"""
+        if not stylename in self.files:
+            return self.files_all("default")
+        if not stylename in self.resolved_files:
+            result = {}
+            if len(self.data[stylename]["ancestors"]) > 0:
+                result.update(self.files_all(self.data[stylename]["ancestors"][0]))
+            result.update(self.files[stylename])
+            self.resolved_files[stylename] = result
+        return self.resolved_files[stylename]
 
     def get_file(self, stylename, filename):
         """retrieves a file path for a filename with ancestors filling in the gaps"""
-        if not stylename in self.files:
-            return self.get_file("default", filename)
-        if len(self.data[stylename]["ancestors"]) == 0:
-            if filename in self.files[stylename]:
-                return self.files[stylename][filename]
-            return None
-        if filename in self.files[stylename]:
-            return self.files[stylename][filename]
-        else:
-            return self.get_file(self.data[stylename]["ancestors"][0], filename)
+        return self.files_all(stylename).get(filename)
@@ -1,8 +1,7 @@
 import ifcopenshell.api
 import numpy
 
-from topologic import Vertex, Edge
-from topologist.helpers import create_stl_list, el
+from topologist.helpers import el
 import molior
 from molior.baseclass import TraceClass
 from molior.geometry import (
@@ -23,6 +22,7 @@ from molior.ifc import (
     assign_storey_byindex,
     get_material_by_name,
     createCurveBoundedPlane,
+    get_registry,
 )
 
 run = ifcopenshell.api.run
@@ -53,13 +53,10 @@ class Wall(TraceClass):
 
     def execute(self):
         """Generate some ifc"""
-        for item in self.file.by_type("IfcGeometricRepresentationSubContext"):
-            if item.ContextIdentifier == "Reference":
-                reference_context = item
-            if item.ContextIdentifier == "Body":
-                body_context = item
-            if item.ContextIdentifier == "Axis":
-                axis_context = item
+        registry = get_registry(self.file)
+        reference_context = registry.contexts.get("Reference")
+        body_context = registry.contexts.get("Body")
+        axis_context = registry.contexts.get("Axis")
         self.init_openings()
         style = molior.Molior.style
         segments = self.segments()
@@ -142,10 +139,9 @@ class Wall(TraceClass):
             self.add_topology_pset(mywall, face, back_cell, front_cell)
 
             # structure
-            vertices_stl = create_stl_list(Vertex)
-            self.chain.graph[segment[0]][1][2].VerticesPerimeter(vertices_stl)
             vertices = [
-                [vertex.X(), vertex.Y(), vertex.Z()] for vertex in list(vertices_stl)
+                [vertex.X(), vertex.Y(), vertex.Z()]
+                for vertex in self.chain.graph[segment[0]][1][2].VerticesPerimeterList()
             ]
             normal = self.chain.graph[segment[0]][1][2].Normal()
             face_surface = createFaceSurface(self.file, vertices, normal)
@@ -163,9 +159,7 @@ class Wall(TraceClass):
                 "structural.assign_structural_analysis_model",
                 self.file,
                 product=structural_surface,
-                structural_analysis_model=self.file.by_type(
-                    "IfcStructuralAnalysisModel"
-                )[0],
+                structural_analysis_model=registry.structural_analysis_model,
             )
             run(
                 "geometry.assign_representation",
@@ -218,9 +212,7 @@ class Wall(TraceClass):
                 boundaries.append(boundary)
 
             # clip the top of the wall if face isn't rectangular
-            edges_result = create_stl_list(Edge)
-            face.EdgesCrop(edges_result)
-            for edge in edges_result:
+            for edge in face.EdgesCropList():
                 start_coor = transform(
                     matrix_reverse, list(edge.StartVertex().Coordinates())
                 )
@@ -479,8 +471,8 @@ class Wall(TraceClass):
             for segment in range(len(self.openings)):
                 edge = self.chain.graph[edges[segment][0]]
                 # edge = {
-                #     string_coor_start: [
-                #         string_coor_end,
+                #     coor_start: [
+                #         coor_end,
                 #         [Vertex_start, Vertex_end, Face, Cell_left, Cell_right],
                 #     ]
                 # }
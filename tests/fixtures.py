@@ -0,0 +1,54 @@
+"""Geometry shared by several tests"""
+
+import os
+import sys
+
+from topologic import Vertex, Face, CellComplex
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from topologist.helpers import create_stl_list
+
+
+def diagonal_cube_faces():
+    """14 faces forming a cube sliced on the diagonal, with a second storey: two
+    triangular cells on the ground floor and a square cell above"""
+    points = [
+        [0.0, 0.0, 0.0],
+        [10.0, 0.0, 0.0],
+        [10.0, 10.0, 0.0],
+        [0.0, 10.0, 0.0],
+        [0.0, 0.0, 10.0],
+        [10.0, 0.0, 10.0],
+        [10.0, 10.0, 10.0],
+        [0.0, 10.0, 10.0],
+        [0.0, 0.0, 20.0],
+        [10.0, 0.0, 20.0],
+        [10.0, 10.0, 20.0],
+        [0.0, 10.0, 20.0],
+    ]
+    vertices = [Vertex.ByCoordinates(*point) for point in points]
+    faces_by_vertex_id = [
+        [0, 1, 2],
+        [0, 2, 3],
+        [1, 2, 6, 5],
+        [2, 3, 7, 6],
+        [0, 4, 7, 3],
+        [0, 1, 5, 4],
+        [4, 5, 6],
+        [4, 6, 7],
+        [0, 2, 6, 4],
+        [4, 5, 9, 8],
+        [5, 6, 10, 9],
+        [6, 7, 11, 10],
+        [7, 4, 8, 11],
+        [8, 9, 10, 11],
+    ]
+    faces_ptr = create_stl_list(Face)
+    for face_by_id in faces_by_vertex_id:
+        faces_ptr.push_back(Face.ByVertices([vertices[i] for i in face_by_id]))
+    return faces_ptr
+
+
+def diagonal_cube():
+    """A new CellComplex of the diagonal_cube_faces() each time"""
+    return CellComplex.ByFaces(diagonal_cube_faces(), 0.0001)
@@ -3,11 +3,13 @@
 import os
 import sys
 import unittest
+import cppyy
 
 from topologic import Vertex, Edge, Face, Cell, CellComplex, Graph
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from topologist.helpers import create_stl_list
+import topologist.graph
 
 
 class Tests(unittest.TestCase):
@@ -169,6 +171,45 @@ class Tests(unittest.TestCase):
         dot = graph.Dot(self.cc)
         self.assertTrue(dot.__class__ == str)
 
+    def test_index(self):
+        graph = Graph.Adjacency(self.cc)
+        index = graph.Index()
+        # built once
+        self.assertTrue(graph.Index() is index)
+        self.assertEqual(len(index.vertices), 6)
+        for cell in graph.Cells(self.cc):
+            vertex = index.vertex("Cell", cell.Get("index"))
+            self.assertTrue(vertex.IsSame(cell.GraphVertex(graph)))
+            self.assertTrue(
+                cell.IsSame(index.entity(self.cc, "Cell", cell.Get("index")))
+            )
+        self.assertEqual(index.vertex("Cell", "999"), None)
+        # removing vertices replaces the index
+        graph.Circulation(self.cc)
+        self.assertFalse(graph.Index() is index)
+        self.assertEqual(len(graph.Index().vertices), 4)
+        # the index goes away with the graph
+        key = cppyy.addressof(graph)
+        self.assertTrue(key in topologist.graph.indexes)
+        del graph
+        self.assertFalse(key in topologist.graph.indexes)
+
+    def test_allocate(self):
+        widgets = [
+            ["Kitchen", Vertex.ByCoordinates(8.0, 2.0, 5.0)],
+            ["Bedroom", Vertex.ByCoordinates(5.0, 5.0, 15.0)],
+            ["Toilet", Vertex.ByCoordinates(5.0, 5.0, 16.0)],
+            ["Nowhere", Vertex.ByCoordinates(50.0, 50.0, 50.0)],
+        ]
+        usages = self.cc.AllocateCells(widgets)
+        # first widget wins, one cell without a widget
+        self.assertEqual(sorted(usages.values()), ["bedroom", "kitchen", "outside"])
+        cells = self.cc.CellsList()
+        for index in usages:
+            self.assertEqual(cells[index].Usage(), usages[index])
+            if usages[index] == "kitchen":
+                self.assertTrue(cells[index].Centroid().Z() < 10.0)
+
 
 if __name__ == "__main__":
     unittest.main()
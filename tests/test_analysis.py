@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+
+import numpy
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import topologist
+import topologist.attributes as attributes
+from topologist.analysis import Metrics
+from fixtures import diagonal_cube
+
+
+class Tests(unittest.TestCase):
+    """14 faces and three cells formed by a cube sliced on the diagonal"""
+
+    def setUp(self):
+        self.cc = diagonal_cube()
+        self.cc.Snapshot()
+
+    def tearDown(self):
+        topologist.reset()
+
+    def test_distances(self):
+        for cell in self.cc.CellsList():
+            if cell.Elevation() == 10.0:
+                cell.Set("usage", "bedroom")
+            else:
+                cell.Set("usage", "kitchen")
+        circulation = self.cc.Circulation()
+        metrics = Metrics(circulation)
+        matrix = metrics.distances()
+        self.assertEqual(matrix.shape, (3, 3))
+        self.assertEqual(matrix.dtype, numpy.int32)
+        self.assertEqual(numpy.diagonal(matrix).tolist(), [0, 0, 0])
+        self.assertTrue((matrix == matrix.T).all())
+        # bedroom upstairs isn't reachable without a stair
+        self.assertEqual((matrix == -1).sum(), 4)
+        self.assertEqual(metrics.usage_distance("kitchen", "kitchen"), 0)
+        self.assertEqual(metrics.usage_distance("kitchen", "bedroom"), None)
+        self.assertEqual(metrics.usage_distance("kitchen", "toilet"), None)
+        # cached until the circulation changes
+        self.assertTrue(metrics.distances() is matrix)
+        circulation.add_passage(0, 1, None)
+        circulation.add_passage(1, 2, None)
+        self.assertFalse(metrics.distances() is matrix)
+        self.assertEqual((metrics.distances() == -1).sum(), 0)
+        self.assertTrue(metrics.usage_distance("kitchen", "bedroom") > 0)
+
+    def test_usages(self):
+        """changing a usage can close a passage"""
+        for cell in self.cc.CellsList():
+            cell.Set("usage", "kitchen")
+        metrics = Metrics(self.cc.Circulation())
+        matrix = metrics.distances()
+        # the two lower rooms are connected through the diagonal wall
+        self.assertEqual((matrix == 1).sum(), 2)
+        self.assertEqual(metrics.usage_distance("kitchen", "kitchen"), 0)
+
+        # a bedroom only opens onto a stair or circulation
+        lower = [cell for cell in self.cc.CellsList() if cell.Elevation() == 0.0]
+        lower[0].Set("usage", "bedroom")
+        matrix = metrics.distances()
+        self.assertEqual((matrix == 1).sum(), 0)
+        self.assertEqual(metrics.usage_distance("kitchen", "bedroom"), None)
+        # setting the same usage again is not a change
+        usage_version = attributes.usage_version
+        lower[0].Set("usage", "bedroom")
+        self.assertEqual(attributes.usage_version, usage_version)
+        self.assertTrue(metrics.distances() is matrix)
+
+        lower[1].Set("usage", "circulation")
+        self.assertEqual((metrics.distances() == 1).sum(), 2)
+        self.assertEqual(metrics.usage_distance("circulation", "bedroom"), 1)
+
+    def test_integration(self):
+        for cell in self.cc.CellsList():
+            cell.Set("usage", "stair")
+        metrics = Metrics(self.cc.Circulation())
+        # the upper room is next to both lower rooms, which are next to each other
+        self.assertEqual((metrics.distances() == 1).sum(), 6)
+        self.assertEqual(metrics.mean_depth().tolist(), [1.0, 1.0, 1.0])
+        self.assertTrue(numpy.isinf(metrics.integration()).all())
+        self.assertEqual(metrics.usage_distances([["stair", "stair"]]), [0])
+        # usage lookup follows changes to the Cells
+        self.cc.CellsList()[0].Set("usage", "toilet")
+        self.assertEqual(metrics.usage_distance("stair", "toilet"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cppyy
+from cppyy.gbl.std import string
+from topologic import Vertex, Edge, StringAttribute
+import topologist
+import topologist.attributes as attributes
+
+
+class Tests(unittest.TestCase):
+    def test_strings(self):
+        """values are strings, as they would be in a Topologic Dictionary"""
+        vertex = Vertex.ByCoordinates(0, 0, 0)
+        vertex.Set("index", 3)
+        vertex.Set("badnormal", True)
+        vertex.Set("usage", "kitchen")
+        self.assertEqual(vertex.Get("index"), "3")
+        self.assertEqual(vertex.Get("badnormal"), "True")
+        self.assertEqual(vertex.Get("usage"), "kitchen")
+        self.assertEqual(vertex.Get("what"), None)
+        self.assertEqual(
+            vertex.DumpDictionary(),
+            {"index": "3", "badnormal": "True", "usage": "kitchen"},
+        )
+
+    def test_proxies(self):
+        """different python objects for the same Vertex share attributes"""
+        edge = Edge.ByStartVertexEndVertex(
+            Vertex.ByCoordinates(0, 0, 0), Vertex.ByCoordinates(1, 0, 0)
+        )
+        edge.StartVertex().Set("usage", "stair")
+        self.assertEqual(edge.StartVertex().Get("usage"), "stair")
+        self.assertEqual(edge.EndVertex().Get("usage"), None)
+
+    def test_load(self):
+        """existing Topologic Dictionary values are strings"""
+        vertex = Vertex.ByCoordinates(2, 0, 0)
+        dictionary = vertex.GetDictionary()
+        dictionary.Add(string("usage"), StringAttribute("bedroom"))
+        vertex.SetDictionary(dictionary)
+        self.assertEqual(vertex.Get("usage"), "bedroom")
+
+    def test_flush(self):
+        vertex = Vertex.ByCoordinates(3, 0, 0)
+        vertex.Set("index", 7)
+        self.assertFalse(vertex.GetDictionary().ContainsKey(string("index")))
+        attributes.flush()
+        dictionary = vertex.GetDictionary()
+        self.assertTrue(dictionary.ContainsKey(string("index")))
+        value = dictionary.ValueAtKey(string("index"))
+        self.assertEqual(str(cppyy.bind_object(value.Value(), "std::string")), "7")
+        self.assertEqual(vertex.Get("index"), "7")
+
+    def test_session(self):
+        """attributes are flushed and forgotten when a session ends"""
+        with topologist.session():
+            vertex = Vertex.ByCoordinates(4, 0, 0)
+            vertex.Set("usage", "stair")
+            self.assertEqual(len(attributes.cache), 1)
+        self.assertEqual(len(attributes.cache), 0)
+        self.assertTrue(vertex.GetDictionary().ContainsKey(string("usage")))
+        self.assertEqual(vertex.Get("usage"), "stair")
+
+
+if __name__ == "__main__":
+    unittest.main()
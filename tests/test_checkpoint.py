@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+from topologic import Vertex, CellComplex
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import topologist
+import topologist.checkpoint as checkpoint
+from fixtures import diagonal_cube_faces
+
+
+class Tests(unittest.TestCase):
+    """14 faces and three cells formed by a cube sliced on the diagonal"""
+
+    def setUp(self):
+        self.faces_ptr = diagonal_cube_faces()
+        self.cc = CellComplex.ByFaces(self.faces_ptr, 0.0001)
+        self.cc.Snapshot()
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        topologist.reset()
+        shutil.rmtree(self.path)
+
+    def test_key(self):
+        key = checkpoint.faces_key(self.faces_ptr, 0.0001)
+        self.assertEqual(key, checkpoint.faces_key(self.faces_ptr, 0.0001))
+        self.assertFalse(key == checkpoint.faces_key(self.faces_ptr, 0.001))
+        self.assertEqual(checkpoint.load_checkpoint(key, self.path), None)
+
+        # input attributes and widgets only change the derived attributes
+        key_attributes = checkpoint.attributes_key(key, self.faces_ptr)
+        widgets = [["Kitchen", Vertex.ByCoordinates(8.0, 2.0, 5.0)]]
+        self.assertFalse(
+            key_attributes == checkpoint.attributes_key(key, self.faces_ptr, widgets)
+        )
+        list(self.faces_ptr)[0].Set("stylename", "brick")
+        self.assertEqual(key, checkpoint.faces_key(self.faces_ptr, 0.0001))
+        self.assertFalse(
+            key_attributes == checkpoint.attributes_key(key, self.faces_ptr)
+        )
+        self.assertFalse(checkpoint.load_attributes(self.cc, key_attributes, self.path))
+
+    def test_round_trip(self):
+        for cell in self.cc.CellsList():
+            if cell.Elevation() == 10.0:
+                cell.Set("usage", "bedroom")
+        for face in self.cc.FacesList():
+            if face.IsVertical():
+                face.Set("stylename", "brick")
+        self.cc.BadNormals()
+        key = checkpoint.faces_key(self.faces_ptr, 0.0001)
+        key_attributes = checkpoint.attributes_key(key, self.faces_ptr)
+        checkpoint.save_checkpoint(self.cc, key, self.path)
+        checkpoint.save_attributes(self.cc, key_attributes, self.path)
+
+        # as if in a new session
+        topologist.reset()
+        cc = checkpoint.load_checkpoint(key, self.path)
+        self.assertEqual(cc.__class__, CellComplex)
+        self.assertEqual(len(cc.FacesList()), 14)
+        self.assertEqual(len(cc.CellsList()), 3)
+        self.assertEqual(
+            sorted([face.Signature() for face in cc.FacesList()]),
+            sorted([face.Signature() for face in self.cc.FacesList()]),
+        )
+        # the BREP has no attributes
+        for face in cc.FacesList():
+            self.assertEqual(face.Get("stylename"), None)
+
+        self.assertTrue(checkpoint.load_attributes(cc, key_attributes, self.path))
+        for cell in cc.CellsList():
+            if cell.Elevation() == 10.0:
+                self.assertEqual(cell.Usage(), "bedroom")
+            else:
+                self.assertEqual(cell.Usage(), "living")
+        for face in cc.FacesList():
+            if face.IsVertical():
+                self.assertEqual(face.Get("stylename"), "brick")
+            else:
+                self.assertEqual(face.Get("stylename"), None)
+
+    def test_evict(self):
+        maxsize = checkpoint.maxsize
+        checkpoint.maxsize = 1
+        try:
+            key = checkpoint.faces_key(self.faces_ptr, 0.0001)
+            checkpoint.save_checkpoint(self.cc, key, self.path)
+            os.utime(os.path.join(self.path, key + ".brep"), (0, 0))
+            checkpoint.save_attributes(self.cc, key, self.path)
+        finally:
+            checkpoint.maxsize = maxsize
+        # only the most recent file is kept
+        self.assertEqual(os.listdir(self.path), [key + ".json"])
+        self.assertEqual(checkpoint.load_checkpoint(key, self.path), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+
+from topologic import Vertex, Edge
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from topologist.helpers import create_stl_list
+import topologist
+from fixtures import diagonal_cube
+
+
+class Tests(unittest.TestCase):
+    """14 faces and three cells formed by a cube sliced on the diagonal"""
+
+    def setUp(self):
+        self.cc = diagonal_cube()
+        self.cc.Snapshot()
+
+    def tearDown(self):
+        topologist.reset()
+
+    def test_passages(self):
+        # only the vertical diagonal wall can be passed through
+        passages = [face for face in self.cc.FacesList() if face.IsPassage()]
+        self.assertEqual(len(passages), 1)
+        self.assertTrue(passages[0].IsVertical())
+
+    def test_connectivity(self):
+        circulation = self.cc.Circulation()
+        self.assertEqual(len(circulation.cells), 3)
+        # two ground floor rooms connected, upper room isolated
+        components = circulation.components()
+        self.assertEqual(sorted([len(component) for component in components]), [1, 2])
+        self.assertFalse(circulation.is_connected())
+
+        upper = [
+            node for node in range(3) if circulation.cells[node].Elevation() == 10.0
+        ][0]
+        depth = circulation.depth(upper)
+        self.assertEqual(depth[upper], 0)
+        self.assertEqual(depth.count(None), 2)
+
+        lower = components[0][0]
+        if lower == upper:
+            lower = components[1][0]
+        depth = circulation.depth(lower)
+        self.assertEqual(sorted([item for item in depth if item != None]), [0, 1])
+
+        # a stair between the floors connects everything
+        for cell in self.cc.CellsList():
+            cell.Set("usage", "stair")
+        circulation = self.cc.Circulation()
+        self.assertTrue(circulation.is_connected())
+        self.assertEqual(circulation.depth(upper).count(1), 2)
+        version = circulation.version
+        for node in range(3):
+            circulation.remove_passage(upper, node)
+        self.assertTrue(circulation.version > version)
+        self.assertFalse(circulation.is_connected())
+
+    def test_graph(self):
+        """exported Graph is equivalent to Adjacency() followed by Circulation()"""
+        graph = self.cc.Circulation().Graph()
+        vertices = create_stl_list(Vertex)
+        graph.Vertices(vertices)
+        self.assertEqual(len(vertices), 4)
+        edges = create_stl_list(Edge)
+        graph.Edges(edges)
+        self.assertEqual(len(edges), 2)
+        self.assertFalse(graph.IsConnected())
+        for face in graph.Faces(self.cc):
+            self.assertTrue(face.IsPassage())
+            self.assertTrue(face.GraphVertex(graph).Get("class") == "Face")
+        self.assertEqual(len(graph.Cells(self.cc)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,10 +4,11 @@ import os
 import sys
 import unittest
 
-from topologic import Vertex, Face, CellComplex
+from topologic import Vertex, Face, FaceUtility, CellComplex
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from topologist.helpers import create_stl_list
+import topologist.spatial
 
 
 class Tests(unittest.TestCase):
@@ -67,6 +68,20 @@ class Tests(unittest.TestCase):
                 continue
             self.assertEqual(face.Get("stylename"), "orange")
 
+    def test_plane_index(self):
+        index = topologist.spatial.PlaneIndex()
+        for face in self.faces_ptr:
+            index.add(face)
+        faces_all = create_stl_list(Face)
+        self.cellcomplex.Faces(faces_all)
+        for face in faces_all:
+            vertex = FaceUtility.InternalVertex(face)
+            point = [vertex.X(), vertex.Y(), vertex.Z()]
+            # only the source face in the same plane is a candidate
+            candidates = index.candidates(face, point)
+            self.assertEqual(len(candidates), 1)
+            self.assertTrue(FaceUtility.IsInside(candidates[0], vertex, 0.001))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import numpy
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import molior.dxf
+
+
+class Tests(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = molior.dxf.cache_dir
+        molior.dxf.cache_dir = tempfile.mkdtemp()
+        molior.dxf.memory.clear()
+
+    def tearDown(self):
+        shutil.rmtree(molior.dxf.cache_dir)
+        molior.dxf.cache_dir = self.cache_dir
+        molior.dxf.memory.clear()
+
+    def test_meshes(self):
+        asset = molior.dxf.read("molior/style/share/shopfront.dxf")
+        self.assertTrue(len(asset.meshes) > 0)
+        self.assertEqual(len(asset.profiles), 0)
+        vertices, faces = asset.meshes[0]
+        self.assertEqual(vertices.shape[1], 3)
+        self.assertTrue(faces[0].max() < len(vertices))
+        # kept in memory
+        self.assertTrue(asset is molior.dxf.read("molior/style/share/shopfront.dxf"))
+        self.assertEqual(len(os.listdir(molior.dxf.cache_dir)), 1)
+
+        # read from the cache file
+        molior.dxf.memory.clear()
+        cached = molior.dxf.read("molior/style/share/shopfront.dxf")
+        self.assertFalse(asset is cached)
+        self.assertEqual(len(cached.meshes), len(asset.meshes))
+        for mesh, mesh_cached in zip(asset.meshes, cached.meshes):
+            self.assertTrue(numpy.array_equal(mesh[0], mesh_cached[0]))
+            self.assertEqual(
+                [face.tolist() for face in mesh[1]],
+                [face.tolist() for face in mesh_cached[1]],
+            )
+
+    def test_profiles(self):
+        asset = molior.dxf.read("molior/style/share/courtyard/eaves.dxf")
+        self.assertTrue(len(asset.profiles) > 0)
+        for profile in asset.profiles:
+            self.assertEqual(profile.shape[1], 2)
+            self.assertEqual(profile[0].tolist(), profile[-1].tolist())
+
+        molior.dxf.memory.clear()
+        cached = molior.dxf.read("molior/style/share/courtyard/eaves.dxf")
+        for profile, profile_cached in zip(asset.profiles, cached.profiles):
+            self.assertTrue(numpy.array_equal(profile, profile_cached))
+
+    def test_lru(self):
+        maxsize = molior.dxf.maxsize
+        maxfiles = molior.dxf.maxfiles
+        molior.dxf.maxsize = 1
+        molior.dxf.maxfiles = 1
+        molior.dxf.read("molior/style/share/shopfront.dxf")
+        molior.dxf.read("molior/style/share/courtyard/eaves.dxf")
+        self.assertEqual(len(molior.dxf.memory), 1)
+        self.assertEqual(len(os.listdir(molior.dxf.cache_dir)), 1)
+        molior.dxf.maxsize = maxsize
+        molior.dxf.maxfiles = maxfiles
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -54,6 +54,25 @@ class Tests(unittest.TestCase):
         self.assertEqual(len(cycles), 1)
         self.assertEqual(len(cycles[0].nodes()), 4)
 
+    def test_unchanged(self):
+        edges = self.graph.edges()
+        self.assertEqual(len(self.graph.find_paths()), 3)
+        self.assertEqual(self.graph.edges(), edges)
+        self.assertEqual(len(self.graph.find_paths()), 3)
+
+    def test_indexes(self):
+        self.assertEqual(self.graph.in_degree("A"), 0)
+        self.assertEqual(self.graph.in_degree("K"), 1)
+        self.assertEqual(self.graph.predecessors("K"), ["N"])
+        nodes = self.graph.nodes()
+        self.assertTrue(self.graph.nodes() is nodes)
+        self.assertEqual(len(nodes), 14)
+        # indexes follow changes to the graph
+        self.graph.add_edge({"N": ["O", "la"]})
+        self.assertEqual(self.graph.in_degree("K"), 0)
+        self.assertEqual(len(self.graph.nodes()), 15)
+        self.assertEqual(len(self.graph.source_vertices()), 3)
+
     def test_edge_data(self):
         self.assertEqual(self.graph.get_edge_data(["E", "F"]), "fa")
         self.assertEqual(self.graph.get_edge_data(["F", "E"]), "fa")
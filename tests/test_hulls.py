@@ -120,6 +120,7 @@ class Tests(unittest.TestCase):
 
     def test_ifc(self):
         elevations = self.cc.Elevations()
+        self.cc.BadNormals()
         ifc = molior.ifc.init("My House", elevations)
         traces, hulls, normals = self.cc.GetTraces()
         molior_object = Molior(
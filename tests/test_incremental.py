@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from topologist.incremental import TraceCache
+import topologist
+from fixtures import diagonal_cube
+
+
+def summary(traces):
+    """number of chains for each label and elevation"""
+    result = {}
+    for label in traces:
+        for elevation in traces[label]:
+            for height in traces[label][elevation]:
+                for stylename in traces[label][elevation][height]:
+                    result[(label, elevation, height, stylename)] = len(
+                        traces[label][elevation][height][stylename]
+                    )
+    return result
+
+
+class Tests(unittest.TestCase):
+    """14 faces and three cells formed by a cube sliced on the diagonal"""
+
+    def tearDown(self):
+        topologist.reset()
+
+    def cellcomplex(self):
+        """a new CellComplex each time"""
+        cc = diagonal_cube()
+        cc.Snapshot()
+        cc.BadNormals()
+        return cc
+
+    def test_unchanged(self):
+        cache = TraceCache()
+        traces, hulls, normals = self.cellcomplex().GetTraces(cache)
+        self.assertEqual(cache.reused, 0)
+        self.assertEqual(cache.calculated, 14 + 3)
+
+        cc = self.cellcomplex()
+        traces_again, hulls_again, normals_again = cc.GetTraces(cache)
+        self.assertEqual(cache.reused, 14 + 3)
+        self.assertEqual(cache.calculated, 0)
+        self.assertEqual(summary(traces), summary(traces_again))
+        self.assertEqual(normals, normals_again)
+
+        # reused traces refer to entities in the new CellComplex
+        for label in traces_again:
+            for elevation in traces_again[label]:
+                for height in traces_again[label][elevation]:
+                    for stylename in traces_again[label][elevation][height]:
+                        for chain in traces_again[label][elevation][height][stylename]:
+                            for node in chain.graph:
+                                face = chain.graph[node][1][2]
+                                self.assertTrue(
+                                    [f for f in cc.FacesList() if f.IsSame(face)]
+                                )
+
+    def test_changed(self):
+        cache = TraceCache()
+        self.cellcomplex().GetTraces(cache)
+        self.assertEqual(len(cache.cells), 3)
+
+        # change the usage of the top cell
+        cc = self.cellcomplex()
+        for cell in cc.CellsList():
+            if cell.Elevation() == 10.0:
+                cell.Set("usage", "outdoor")
+        cc.GetTraces(cache)
+        self.assertTrue(cache.calculated > 0)
+        self.assertTrue(cache.reused > 0)
+
+        # same result as without a cache
+        traces, hulls, normals = cc.GetTraces()
+        traces_cached, hulls_cached, normals_cached = cc.GetTraces(cache)
+        self.assertEqual(summary(traces), summary(traces_cached))
+        self.assertEqual(normals, normals_cached)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+from topologic import Vertex, Face, CellComplex, Graph
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from topologist.helpers import create_stl_list, TYPE_FACE, TYPE_CELL
+from topologist.snapshot import TopologySnapshot
+import topologist
+from molior import Molior
+import molior.ifc
+import molior.intermediate
+
+
+def summary(traces):
+    """number of edges in each chain for each label and elevation"""
+    result = {}
+    for label in traces:
+        for elevation in traces[label]:
+            for height in traces[label][elevation]:
+                for stylename in traces[label][elevation][height]:
+                    result[(label, elevation, height, stylename)] = [
+                        list(chain.graph)
+                        for chain in traces[label][elevation][height][stylename]
+                    ]
+    return result
+
+
+class Tests(unittest.TestCase):
+    """A house shape"""
+
+    def setUp(self):
+        vertices = [
+            Vertex.ByCoordinates(*point)
+            for point in [
+                [0.0, 0.0, 0.0],
+                [10.0, 2.0, 0.0],
+                [10.0, 12.0, 0.0],
+                [0.0, 10.0, 0.0],
+                [0.0, 0.0, 10.0],
+                [10.0, 2.0, 10.0],
+                [10.0, 12.0, 10.0],
+                [0.0, 10.0, 10.0],
+                [0.0, 5.0, 15.0],
+                [10.0, 7.0, 15.0],
+            ]
+        ]
+        faces_by_vertex_id = [
+            [0, 1, 2, 3],
+            [0, 1, 5, 4],
+            [2, 3, 7, 6],
+            [1, 2, 6, 9, 5],
+            [0, 4, 8, 7, 3],
+            [4, 5, 9, 8],
+            [9, 8, 7, 6],
+        ]
+        faces_ptr = create_stl_list(Face)
+        for face_by_id in faces_by_vertex_id:
+            faces_ptr.push_back(Face.ByVertices([vertices[i] for i in face_by_id]))
+        self.cc = CellComplex.ByFaces(faces_ptr, 0.0001)
+        self.cc.Snapshot()
+        self.cc.BadNormals()
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        topologist.reset()
+        shutil.rmtree(self.path)
+
+    def test_round_trip(self):
+        elevations = self.cc.Elevations()
+        traces, hulls, normals = self.cc.GetTraces()
+        path = os.path.join(self.path, "house.npz")
+        molior.intermediate.write(path, traces, hulls, normals, elevations)
+        result = molior.intermediate.read(path)
+
+        self.assertEqual(summary(result.traces), summary(traces))
+        self.assertEqual(result.elevations, elevations)
+        self.assertEqual(result.normals, normals)
+        self.assertEqual(len(result.hulls["roof"]["default"]), 1)
+        hull = result.hulls["roof"]["default"][0]
+        self.assertEqual(hull.nodes_all(), hulls["roof"]["default"][0].nodes_all())
+        self.assertEqual(hull.faces_all(), hulls["roof"]["default"][0].faces_all())
+
+        chain = result.traces["external"][0.0][10.0]["default"][0]
+        original = traces["external"][0.0][10.0]["default"][0]
+        for start in chain.graph:
+            face = chain.graph[start][1][2]
+            face_original = original.graph[start][1][2]
+            self.assertEqual(face.GetType(), TYPE_FACE)
+            self.assertEqual(face.Get("index"), face_original.Get("index"))
+            self.assertEqual(face.IsExternal(), True)
+            self.assertEqual(
+                len(face.VerticesPerimeterList()),
+                len(face_original.VerticesPerimeterList()),
+            )
+            cell = chain.graph[start][1][3]
+            self.assertEqual(cell.GetType(), TYPE_CELL)
+            self.assertEqual(cell.Usage(), "living")
+            self.assertEqual(len(cell.FacesInclinedList()), 2)
+            vertices, faces = cell.MeshArrays()
+            self.assertEqual(vertices.shape[1], 3)
+            self.assertEqual(chain.graph[start][1][4], None)
+
+    def test_ifc(self):
+        elevations = self.cc.Elevations()
+        traces, hulls, normals = self.cc.GetTraces()
+        path = os.path.join(self.path, "house.npz")
+        molior.intermediate.write(path, traces, hulls, normals, elevations)
+        TopologySnapshot.current = None
+
+        ifc = molior.ifc.init("My House", elevations)
+        molior_object = Molior(
+            file=ifc,
+            intermediate=molior.intermediate.read(path),
+        )
+        molior_object.execute()
+        self.assertTrue(len(ifc.by_type("IfcWall")) > 0)
+
+    def test_structure(self):
+        # structural members are matched to Faces by 'index'
+        Graph.Adjacency(self.cc)
+        elevations = self.cc.Elevations()
+        traces, hulls, normals = self.cc.GetTraces()
+        path = os.path.join(self.path, "house.npz")
+        molior.intermediate.write(
+            path, traces, hulls, normals, elevations, cellcomplex=self.cc
+        )
+        result = molior.intermediate.read(path)
+        self.assertEqual(result.edges, self.cc.StructuralEdges())
+        self.assertEqual(len(result.edges), 15)
+        TopologySnapshot.current = None
+
+        ifc = molior.ifc.init("My House", elevations)
+        molior_object = Molior(file=ifc, intermediate=result)
+        molior_object.execute()
+        # only connections between two or more members are created
+        self.assertTrue(len(ifc.by_type("IfcStructuralCurveConnection")) > 0)
+        for connection in ifc.by_type("IfcStructuralCurveConnection"):
+            self.assertTrue(len(connection.ConnectsStructuralMembers) > 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
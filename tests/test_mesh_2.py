@@ -15,7 +15,7 @@ from topologic import (
 )
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from topologist.helpers import create_stl_list, string_to_coor, string_to_coor_2d
+from topologist.helpers import create_stl_list, coor_to_key, key_to_coor, key_to_coor_2d
 
 
 class Tests(unittest.TestCase):
@@ -193,8 +193,10 @@ class Tests(unittest.TestCase):
         cycle = lower[0]
         self.assertTrue(cycle.is_simple_cycle())
         for node in cycle.nodes():
-            self.assertEqual(string_to_coor(node)[2], 0.0)
-        data = cycle.get_edge_data(["0.0__10.0__0.0", "0.0__0.0__0.0"])
+            self.assertEqual(key_to_coor(node)[2], 0.0)
+        data = cycle.get_edge_data(
+            [coor_to_key([0.0, 10.0, 0.0]), coor_to_key([0.0, 0.0, 0.0])]
+        )
         self.assertEqual(len(data), 5)
         self.assertEqual(data[0].GetType(), 1)  # Vertex == 1
         self.assertEqual(data[1].GetType(), 1)  # Vertex == 1
@@ -214,8 +216,8 @@ class Tests(unittest.TestCase):
 
         nodes = upper[0].nodes()
         for node in nodes:
-            self.assertEqual(string_to_coor(node)[2], 10.0)
-            self.assertEqual(len(string_to_coor_2d(node)), 2)
+            self.assertEqual(key_to_coor(node)[2], 10.0)
+            self.assertEqual(len(key_to_coor_2d(node)), 2)
 
         traces_internal = traces["internal"][0.0][10.0]["default"]
         for graph in traces_internal:
@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+import numpy
+
+from topologic import Vertex, Face, Cell, CellComplex
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from topologist.helpers import (
+    create_stl_list,
+    el,
+    el_array,
+    lowest_z,
+    coor_to_key,
+    key_to_coor,
+)
+
+
+class Tests(unittest.TestCase):
+    """a single 10x10x10 cube"""
+
+    def setUp(self):
+        points = [
+            [0.0, 0.0, 0.0],
+            [10.0, 0.0, 0.0],
+            [10.0, 10.0, 0.0],
+            [0.0, 10.0, 0.0],
+            [0.0, 0.0, 10.0],
+            [10.0, 0.0, 10.0],
+            [10.0, 10.0, 10.0],
+            [0.0, 10.0, 10.0],
+        ]
+        vertices = [Vertex.ByCoordinates(*point) for point in points]
+        faces_by_vertex_id = [
+            [0, 3, 2, 1],
+            [4, 5, 6, 7],
+            [0, 1, 5, 4],
+            [1, 2, 6, 5],
+            [2, 3, 7, 6],
+            [3, 0, 4, 7],
+        ]
+        faces_ptr = create_stl_list(Face)
+        for face_by_id in faces_by_vertex_id:
+            faces_ptr.push_back(Face.ByVertices([vertices[i] for i in face_by_id]))
+        self.cc = CellComplex.ByFaces(faces_ptr, 0.0001)
+        cells = create_stl_list(Cell)
+        self.cc.Cells(cells)
+        self.cell = list(cells)[0]
+
+    def test_arrays(self):
+        vertices, faces = self.cell.MeshArrays()
+        self.assertEqual(vertices.dtype, numpy.float64)
+        self.assertEqual(vertices.shape, (8, 3))
+        self.assertEqual(len(faces), 6)
+        for face in faces:
+            self.assertEqual(face.dtype, numpy.int32)
+            self.assertEqual(len(face), 4)
+            self.assertEqual(len(set(face.tolist())), 4)
+            self.assertTrue(face.max() < 8)
+            # every face is on one side of the cube
+            coordinates = vertices[face]
+            self.assertTrue(
+                any(numpy.ptp(coordinates[:, axis]) == 0.0 for axis in range(3))
+            )
+
+    def test_lists(self):
+        vertices, faces = self.cell.Mesh()
+        vertices_array, faces_array = self.cell.MeshArrays()
+        self.assertEqual(vertices, vertices_array.tolist())
+        self.assertEqual(faces, [face.tolist() for face in faces_array])
+        self.assertEqual(faces[0][0].__class__, int)
+
+    def test_elevations(self):
+        self.assertEqual(self.cc.Elevations(), {0.0: 0, 10.0: 1})
+        # a cube has no faces with bad normals
+        self.assertEqual(self.cc.BadNormals(), [])
+
+    def test_lowest(self):
+        vertices = numpy.array(
+            [[0.0, 0.0, 1.0], [1.0, 0.0, 2.0], [1.0, 1.0, 3.0]], dtype=numpy.float64
+        )
+        faces = [
+            numpy.array([0, 1, 2], dtype=numpy.int32),
+            # a boundary vertex that isn't one of the nodes
+            numpy.array([1, None, 2], dtype=object),
+            numpy.array([2, 1], dtype=numpy.int32),
+        ]
+        lowest = lowest_z(vertices, faces)
+        self.assertEqual(lowest[0], 1.0)
+        self.assertTrue(numpy.isnan(lowest[1]))
+        self.assertEqual(lowest[2], 2.0)
+        self.assertTrue(numpy.isnan(lowest_z(vertices, faces[1:2])).all())
+        self.assertEqual(len(lowest_z(vertices, [])), 0)
+
+    def test_el_array(self):
+        values = [0.0, 0.0005, -0.0005, 1.23449, -1.23451, 2.9999, -7.0004]
+        self.assertEqual(
+            el_array(numpy.array(values)).tolist(), [el(value) for value in values]
+        )
+
+    def test_keys(self):
+        for coor in [[0.0, 10.0, -2.5], [0.1, 0.2, 0.3], [1234.5678, -0.000001, 3.0]]:
+            key = coor_to_key(coor)
+            self.assertEqual(key_to_coor(key), coor)
+            self.assertEqual(coor_to_key(key_to_coor(key)), key)
+        # nearly coincident points share a key
+        self.assertEqual(coor_to_key([0.1 + 0.2, 0.0]), coor_to_key([0.3, 0.0]))
+        vertex = Vertex.ByCoordinates(1.0, 2.0, 3.0)
+        self.assertEqual(vertex.CoorAsKey(), (1000000, 2000000, 3000000))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+
+from topologic import Vertex
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from topologist.helpers import coor_to_key
+import topologist.normals
+
+
+class Tests(unittest.TestCase):
+    def test_normals(self):
+        normals = topologist.normals.Normals()
+        for index in range(100):
+            normals.add_vector(
+                "top", Vertex.ByCoordinates(2.0, 3.0, 10.0), [1.0, 0.0, 0.0]
+            )
+            # nearly the same location
+            normals.add_vector(
+                "top", Vertex.ByCoordinates(2.0, 3.0, 10.0001), [0.0, 1.0, 0.0]
+            )
+        normals.add_vector(
+            "bottom", Vertex.ByCoordinates(0.1 + 0.2, 0.0, 0.0), [0.0, 0.0, 0.0]
+        )
+        normals.process()
+
+        self.assertEqual(len(normals.normals["top"]), 1)
+        vector = normals.normals["top"][coor_to_key([2.0, 3.0, 10.0])]
+        self.assertAlmostEqual(vector[0], 0.5**0.5)
+        self.assertAlmostEqual(vector[1], 0.5**0.5)
+        self.assertEqual(vector[2], 0.0)
+        # zero vectors default to the x axis
+        self.assertEqual(
+            normals.normals["bottom"][coor_to_key([0.3, 0.0, 0.0])], [1.0, 0.0, 0.0]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
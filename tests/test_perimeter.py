@@ -78,6 +78,19 @@ class Tests(unittest.TestCase):
                 for vertex in perimeter.nodes():
                     self.assertEqual(perimeter.graph[vertex][1][0].Z(), 10.0)
 
+    def test_anticlockwise(self):
+        cells = create_stl_list(Cell)
+        self.cc.Cells(cells)
+        for cell in cells:
+            perimeter = cell.Perimeter()
+            self.assertTrue(perimeter.is_simple_cycle())
+            area = 0.0
+            for edge in perimeter.edges():
+                data = perimeter.graph[edge[0]][1]
+                self.assertTrue(data[3].IsSame(cell))
+                area += data[0].X() * data[1].Y() - data[1].X() * data[0].Y()
+            self.assertTrue(area > 0.0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+import ifcopenshell.api
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import molior.ifc
+from molior.ifc import (
+    get_registry,
+    get_material_by_name,
+    assign_representation_fromDXF,
+)
+
+run = ifcopenshell.api.run
+
+
+class Tests(unittest.TestCase):
+    def setUp(self):
+        self.ifc = molior.ifc.init("Building Name", {0.0: 0, 3.0: 1})
+
+    def test_init(self):
+        registry = get_registry(self.ifc)
+        self.assertTrue(registry is get_registry(self.ifc))
+        for item in self.ifc.by_type("IfcGeometricRepresentationSubContext"):
+            self.assertTrue(registry.contexts[item.ContextIdentifier] is item)
+        self.assertEqual(sorted(registry.storeys), ["0", "1"])
+        self.assertEqual(
+            registry.structural_analysis_model,
+            self.ifc.by_type("IfcStructuralAnalysisModel")[0],
+        )
+        self.assertEqual(registry.project, self.ifc.by_type("IfcProject")[0])
+
+    def test_created(self):
+        registry = get_registry(self.ifc)
+        body_context = registry.contexts["Body"]
+        plaster = get_material_by_name(self.ifc, body_context, "Plaster")
+        self.assertTrue(registry.materials["Plaster"] is plaster)
+        self.assertEqual(
+            get_material_by_name(self.ifc, body_context, "Plaster"), plaster
+        )
+        self.assertEqual(len(self.ifc.by_type("IfcMaterial")), 1)
+
+        self.assertEqual(registry.types_by_name("IfcTypeProduct"), {})
+        for count in range(2):
+            element = run(
+                "root.create_entity", self.ifc, ifc_class="IfcBuildingElementProxy"
+            )
+            assign_representation_fromDXF(
+                self.ifc,
+                body_context,
+                element,
+                "default",
+                "molior/style/share/shopfront.dxf",
+            )
+        self.assertEqual(
+            list(registry.types_by_name("IfcTypeProduct")), ["default/shopfront.dxf"]
+        )
+        self.assertEqual(len(self.ifc.by_type("IfcTypeProduct")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
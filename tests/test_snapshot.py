@@ -0,0 +1,153 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+
+from topologic import Vertex, Face, Cell
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from topologist.helpers import create_stl_list
+from topologist.snapshot import TopologySnapshot
+import topologist
+from fixtures import diagonal_cube
+
+
+class Tests(unittest.TestCase):
+    """14 faces and three cells formed by a cube sliced on the diagonal"""
+
+    def setUp(self):
+        self.cc = diagonal_cube()
+
+    def tearDown(self):
+        topologist.reset()
+
+    def test_counts(self):
+        snapshot = self.cc.Snapshot()
+        self.assertEqual(TopologySnapshot.current, snapshot)
+        self.assertEqual(len(snapshot.vertices), 12)
+        self.assertEqual(len(snapshot.faces), 14)
+        self.assertEqual(len(snapshot.cells), 3)
+        self.assertEqual(len(snapshot.face_cells), 14)
+        self.assertEqual(len(snapshot.cell_faces), 3)
+
+    def test_face_cells(self):
+        snapshot = self.cc.Snapshot()
+        # three internal faces are shared by two cells, eleven are on the outside
+        shared = [cells for cells in snapshot.face_cells if len(cells) == 2]
+        world = [cells for cells in snapshot.face_cells if len(cells) == 1]
+        self.assertEqual(len(shared), 3)
+        self.assertEqual(len(world), 11)
+        # two prisms with five faces, a cube with a split floor
+        self.assertEqual(
+            sorted([len(faces) for faces in snapshot.cell_faces]), [5, 5, 7]
+        )
+        # adjacency is symmetric
+        for face_id in range(len(snapshot.faces)):
+            for cell_id in snapshot.face_cells[face_id]:
+                self.assertIn(face_id, snapshot.cell_faces[cell_id])
+
+    def test_lists(self):
+        self.cc.Snapshot()
+        self.assertEqual(len(self.cc.FacesList()), 14)
+        self.assertEqual(len(self.cc.CellsList()), 3)
+        for cell in self.cc.CellsList():
+            for face in cell.FacesList():
+                self.assertEqual(face.__class__, Face)
+                self.assertTrue(
+                    [item for item in face.CellsList() if item.IsSame(cell)]
+                )
+
+    def test_predicates(self):
+        """same answers with and without a snapshot"""
+        faces = create_stl_list(Face)
+        self.cc.Faces(faces)
+        before = [
+            [face.IsWorld(), face.IsInternal(), face.IsExternal(), face.IsOpen()]
+            for face in faces
+        ]
+        self.cc.Snapshot()
+        after = [
+            [face.IsWorld(), face.IsInternal(), face.IsExternal(), face.IsOpen()]
+            for face in faces
+        ]
+        self.assertEqual(before, after)
+
+    def test_fallback(self):
+        """entities not in the snapshot are still answered by Topologic"""
+        self.cc.Snapshot()
+        face = Face.ByVertices(
+            [
+                Vertex.ByCoordinates(0.0, 0.0, 0.0),
+                Vertex.ByCoordinates(1.0, 0.0, 0.0),
+                Vertex.ByCoordinates(1.0, 1.0, 0.0),
+            ]
+        )
+        self.assertEqual(TopologySnapshot.current.index(face), None)
+        self.assertEqual(len(face.CellsList()), 0)
+
+    def test_memoized(self):
+        """geometry is calculated once per entity"""
+        faces = create_stl_list(Face)
+        self.cc.Faces(faces)
+        before = [
+            [face.Elevation(), face.Height(), face.Normal(), face.IsVertical()]
+            for face in faces
+        ]
+        snapshot = self.cc.Snapshot()
+        after = [
+            [face.Elevation(), face.Height(), face.Normal(), face.IsVertical()]
+            for face in faces
+        ]
+        self.assertEqual(before, after)
+        self.assertTrue(len(snapshot.memo) > 0)
+        face = list(faces)[0]
+        self.assertTrue(face.NormalGeometric() is face.NormalGeometric())
+        # attributes are applied after retrieval
+        normal = face.Normal()
+        face.Set("badnormal", True)
+        self.assertEqual(face.Normal(), [-axis for axis in normal])
+
+    def test_session(self):
+        """nothing is kept between models"""
+        with topologist.session():
+            snapshot = self.cc.Snapshot()
+            self.assertTrue(TopologySnapshot.current is snapshot)
+        self.assertEqual(TopologySnapshot.current, None)
+
+    def test_cells_ordered(self):
+        """orientation propagation agrees with point containment"""
+        faces = create_stl_list(Face)
+        self.cc.Faces(faces)
+        before = [face.CellsOrdered() for face in faces]
+        snapshot = self.cc.Snapshot()
+        after = [face.CellsOrdered() for face in faces]
+        # every cell is a closed shell, so no containment fallback
+        for cell_id in range(len(snapshot.cells)):
+            self.assertFalse(snapshot.cell_orientation(cell_id) == None)
+        for cells_before, cells_after in zip(before, after):
+            for cell_before, cell_after in zip(cells_before, cells_after):
+                if cell_before == None:
+                    self.assertEqual(cell_after, None)
+                else:
+                    self.assertTrue(cell_before.IsSame(cell_after))
+
+    def test_classification(self):
+        """one record agrees with the individual predicates"""
+        self.cc.Snapshot()
+        for face in self.cc.FacesList():
+            record = face.Classification()
+            self.assertEqual(record["world"], face.IsWorld())
+            self.assertEqual(record["open"], face.IsOpen())
+            self.assertEqual(record["external"], face.IsExternal())
+            self.assertEqual(record["internal"], face.IsInternal())
+            self.assertEqual(record["upward"], face.IsUpward())
+            self.assertEqual(record["normal"], face.Normal())
+            self.assertEqual(record["elevation"], face.Elevation())
+            self.assertEqual(record["orientation"] == "vertical", face.IsVertical())
+            self.assertEqual(record["orientation"] == "horizontal", face.IsHorizontal())
+            self.assertEqual(record["stylename"], "default")
+
+
+if __name__ == "__main__":
+    unittest.main()
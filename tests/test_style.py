@@ -2,9 +2,12 @@
 
 import os
 import sys
+import shutil
+import tempfile
 import unittest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import molior.style
 from molior.style import Style
 
 
@@ -45,6 +48,70 @@ class Tests(unittest.TestCase):
             mystyle.get_file("default", "shopfront.dxf"),
         )
 
+    def test_shared(self):
+        mystyle = Style()
+        fancy = mystyle.get("fancy")
+        # flattened once, the same view is returned each time
+        self.assertTrue(fancy is mystyle.get("fancy"))
+        self.assertTrue(mystyle.get("nonsuch") is mystyle.get("default"))
+        with self.assertRaises(TypeError):
+            fancy["traces"] = {}
+        with self.assertRaises(TypeError):
+            fancy["traces"]["exterior"]["outer"] = 1.0
+        # ancestors fill in the gaps
+        self.assertEqual(
+            fancy["traces"]["interior"]["condition"],
+            mystyle.get("default")["traces"]["interior"]["condition"],
+        )
+        self.assertTrue(
+            mystyle.get_file("courtyard", "highparapet.dxf")
+            in mystyle.files_all("courtyard").values()
+        )
+
+    def test_cache(self):
+        share_dir = tempfile.mkdtemp()
+        cache_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(share_dir, "rustic"))
+        with open(os.path.join(share_dir, "traces.yml"), "w") as fh:
+            fh.write("exterior:\n  outer: 0.25\n")
+        with open(os.path.join(share_dir, "rustic", "traces.yml"), "w") as fh:
+            fh.write("exterior:\n  outer: 0.3\n")
+        args = {"share_dir": share_dir, "cache_dir": cache_dir}
+
+        mystyle = Style(args)
+        self.assertEqual(mystyle.get("rustic")["traces"]["exterior"]["outer"], 0.3)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        # shared in this process
+        self.assertTrue(Style(args).data is mystyle.data)
+        # read from the cache file
+        molior.style.compiled.clear()
+        mystyle = Style(args)
+        self.assertEqual(mystyle.get("rustic")["traces"]["exterior"]["outer"], 0.3)
+
+        # editing a YAML file invalidates the shared data and the cache
+        with open(os.path.join(share_dir, "rustic", "traces.yml"), "w") as fh:
+            fh.write("exterior:\n  outer: 0.35\n")
+        os.utime(os.path.join(share_dir, "rustic", "traces.yml"), (1, 1))
+        mystyle = Style(args)
+        self.assertEqual(mystyle.get("rustic")["traces"]["exterior"]["outer"], 0.35)
+        # unchanged, so shares the same data
+        self.assertTrue(Style(args).data is mystyle.data)
+        # a new resource file
+        with open(os.path.join(share_dir, "rustic", "door.dxf"), "w") as fh:
+            fh.write("")
+        mystyle = Style(args)
+        self.assertEqual(
+            mystyle.files["rustic"]["door.dxf"],
+            os.path.join(share_dir, "rustic", "door.dxf"),
+        )
+        # a new process finds the change in the cache file
+        molior.style.compiled.clear()
+        self.assertEqual(Style(args).data, mystyle.data)
+
+        molior.style.compiled.clear()
+        shutil.rmtree(share_dir)
+        shutil.rmtree(cache_dir)
+
 
 if __name__ == "__main__":
     unittest.main()
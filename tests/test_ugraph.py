@@ -41,6 +41,13 @@ class Tests(unittest.TestCase):
         self.assertEqual(len(paths), 1)
         self.assertTrue(paths[0].is_simple_cycle())
 
+    def test_sources(self):
+        # indexes are rebuilt when the dictionary is replaced
+        self.assertEqual(self.graph.source_vertices(), [])
+        self.assertEqual(
+            self.graph.in_degree("6.636378288269043__4.081480979919434__0.0"), 1
+        )
+
     def test_starts(self):
         self.assertEqual(len(self.graph.starts()), 5)
         self.assertEqual(len(self.graph.ends()), 5)
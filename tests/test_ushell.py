@@ -46,6 +46,31 @@ class Tests(unittest.TestCase):
 
     def test_segment(self):
         self.shell.segment()
+        self.assertEqual([face[3] for face in self.shell.faces], [0, 0, 1, 1])
+        self.assertEqual(
+            self.shell.faces_all(), [[0, 1, 2], [0, 2, 3], [4, 5, 6], [4, 6, 7]]
+        )
+
+    def test_many(self):
+        """disjoint faces don't exhaust the recursion limit"""
+        many = ushell.shell()
+        for index in range(2000):
+            x = index * 10.0
+            many.add_face(
+                [[x, 0.0, 0.0], [x + 1.0, 0.0, 0.0], [x, 1.0, 0.0]],
+                [0.0, 0.0, 1.0],
+                index,
+            )
+        # a face joining the first and last faces
+        many.add_face(
+            [[0.0, 0.0, 0.0], [19990.0, 0.0, 0.0], [0.0, 5.0, 5.0]],
+            [0.0, 1.0, 0.0],
+            "bridge",
+        )
+        new_shells = many.decompose()
+        self.assertEqual(len(new_shells), 1999)
+        self.assertEqual(len(new_shells[0].faces), 3)
+        self.assertEqual(new_shells[1].faces[0][2], 1)
 
     def test_decompose(self):
         new_shells = self.shell.decompose()
@@ -19,9 +19,9 @@ class Tests(unittest.TestCase):
         vertex_0 = Vertex.ByCoordinates(1.0, 0.0, 3.15)
         vertex_1 = Vertex.ByCoordinates(5.0, 0.0, 3.15)
         vertex_2 = Vertex.ByCoordinates(8.0, 4.0, 3.15)
-        coor_0 = vertex_0.CoorAsString()
-        coor_1 = vertex_1.CoorAsString()
-        coor_2 = vertex_2.CoorAsString()
+        coor_0 = vertex_0.CoorAsKey()
+        coor_1 = vertex_1.CoorAsKey()
+        coor_2 = vertex_2.CoorAsKey()
         vertex_3 = Vertex.ByCoordinates(1.0, 0.0, 5.15)
         vertex_4 = Vertex.ByCoordinates(5.0, 0.0, 6.15)
         vertex_5 = Vertex.ByCoordinates(8.0, 4.0, 6.15)
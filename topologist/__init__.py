@@ -32,6 +32,8 @@ solid to build.
 
 """
 
+import contextlib
+
 import topologist.topology
 import topologist.vertex
 import topologist.edge
@@ -39,5 +41,32 @@ import topologist.face
 import topologist.cell
 import topologist.cellcomplex
 import topologist.graph
+import topologist.snapshot
+import topologist.attributes
 
 topologist.graph.noop = None
+
+
+def reset():
+    """Discard everything kept about previous CellComplexes"""
+    topologist.snapshot.TopologySnapshot.current = None
+    topologist.attributes.clear()
+    topologist.graph.indexes.clear()
+
+
+@contextlib.contextmanager
+def session():
+    """Process one model without state left over from a previous model,
+    and without keeping this one alive afterwards:
+
+        with topologist.session():
+            cc = CellComplex.ByFaces(faces_ptr, 0.0001)
+            cc.Snapshot()
+            ...
+    """
+    reset()
+    try:
+        yield
+        topologist.attributes.flush()
+    finally:
+        reset()
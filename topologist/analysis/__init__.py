@@ -0,0 +1,119 @@
+"""Room metrics for assessing a building with a Pattern Language
+
+Patterns such as 'bedrooms near a toilet' or 'kitchen close to the
+entrance' need shortest path distances between rooms in the circulation
+graph.  Rather than calling Graph.TopologicalDistance() for each pair,
+Metrics finds all distances at once: a breadth-first search from every
+Cell simultaneously, each step is a matrix product of the frontier with
+the adjacency matrix.
+
+Passages depend on Cell usage (a bedroom only opens onto a stair or
+circulation), so the distance matrix is kept until the Circulation
+version or any Cell usage changes, a usage change refreshes the
+Circulation passages first.  The Cells for each usage are also kept
+until any usage changes.  Usage changes are noticed by comparing
+attributes.usage_version, so a cached query doesn't touch the Cells.
+
+"""
+
+import numpy
+
+
+class Metrics:
+    """All-pairs shortest path distances over a Circulation"""
+
+    def __init__(self, circulation):
+        self.circulation = circulation
+        # Circulation version the matrix was calculated for
+        self.version = None
+        self.matrix = None
+        self.usages = None
+        self.nodes = {}
+
+    def distances(self):
+        """[N,N] int32 array of passages between Cells, -1 if unreachable"""
+        # a usage change refreshes the passages, and the version
+        self.circulation.update()
+        if self.version == self.circulation.version:
+            return self.matrix
+        size = len(self.circulation.adjacency)
+        adjacency = numpy.zeros((size, size), dtype=numpy.int32)
+        for node in range(size):
+            for neighbour in self.circulation.adjacency[node]:
+                adjacency[node, neighbour] = 1
+
+        matrix = numpy.full((size, size), -1, dtype=numpy.int32)
+        reached = numpy.eye(size, dtype=bool)
+        matrix[reached] = 0
+        frontier = reached.astype(numpy.int32)
+        depth = 0
+        while frontier.any():
+            depth += 1
+            found = ((frontier @ adjacency) > 0) & ~reached
+            matrix[found] = depth
+            reached |= found
+            frontier = found.astype(numpy.int32)
+
+        self.matrix = matrix
+        self.version = self.circulation.version
+        return matrix
+
+    def depth(self, root):
+        """Passages from one Cell to every Cell, -1 if unreachable"""
+        return self.distances()[root]
+
+    def mean_depth(self):
+        """Average passages from each Cell to the other Cells it can reach"""
+        matrix = self.distances()
+        reachable = matrix > 0
+        count = reachable.sum(axis=1)
+        total = numpy.where(reachable, matrix, 0).sum(axis=1)
+        return numpy.divide(
+            total,
+            count,
+            out=numpy.zeros(len(matrix), dtype=numpy.float64),
+            where=count > 0,
+        )
+
+    def integration(self):
+        """Inverse relative asymmetry of each Cell within its connected
+        group of Cells, NaN where the group has fewer than three Cells"""
+        matrix = self.distances()
+        size = (matrix >= 0).sum(axis=1)
+        relative = numpy.full(len(matrix), numpy.nan)
+        valid = size > 2
+        relative[valid] = 2.0 * (self.mean_depth()[valid] - 1.0) / (size[valid] - 2.0)
+        result = numpy.full(len(matrix), numpy.nan)
+        positive = valid & (relative > 0.0)
+        result[positive] = 1.0 / relative[positive]
+        # every Cell is adjacent to every other Cell
+        result[valid & (relative == 0.0)] = numpy.inf
+        return result
+
+    def usage_nodes(self, usage):
+        """Positions of the Cells with this usage"""
+        self.circulation.update()
+        usages = self.circulation.usages
+        if not usages is self.usages:
+            self.nodes = {}
+            for node in range(len(usages)):
+                self.nodes.setdefault(usages[node], []).append(node)
+            self.usages = usages
+        return self.nodes.get(usage, [])
+
+    def usage_distance(self, usage_a, usage_b):
+        """Fewest passages from any Cell of one usage to any Cell of another,
+        None if there are no such Cells or they are not connected"""
+        nodes_a = self.usage_nodes(usage_a)
+        nodes_b = self.usage_nodes(usage_b)
+        if not nodes_a or not nodes_b:
+            return None
+        block = self.distances()[numpy.ix_(nodes_a, nodes_b)]
+        block = block[block >= 0]
+        if not block.size:
+            return None
+        return int(block.min())
+
+    def usage_distances(self, pairs):
+        """usage_distance() for a list of [usage, usage] pairs"""
+        return [self.usage_distance(pair[0], pair[1]) for pair in pairs]
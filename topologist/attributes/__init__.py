@@ -0,0 +1,87 @@
+"""A python-side cache of Topologic Dictionary attributes
+
+Topology.Set() and Topology.Get() are called constantly with keys such
+as 'index', 'usage', 'stylename', 'badnormal' and 'class', and every
+access to a Topologic Dictionary is several round trips through cppyy.
+
+Attributes are kept here instead, keyed by topology_key() so that all
+the python proxies of the same Vertex, Edge, Face or Cell share them.
+Values are strings, just as if they had been read back from a Topologic
+StringAttribute.  The first access to an entity copies its Topologic
+Dictionary into the cache.
+
+Topologic doesn't see these values until flush() copies them back as
+StringAttributes, this is necessary before anything that reads
+Dictionaries on the C++ side, e.g. Graph.ByTopology().
+
+The cache keeps every entity it has seen alive, so it is cleared on
+entering and leaving a topologist.session(), attributes are flushed to
+Topologic first when the session ends normally.
+
+"""
+
+import cppyy
+from cppyy.gbl.std import string
+from topologic import StringAttribute
+from topologist.helpers import topology_key
+
+# topology_key() -> [topology, {key: value}, {dirty keys}]
+# the topology reference keeps the key from being reused by another entity
+cache = {}
+
+# incremented whenever a 'usage' attribute changes, derived data such as
+# Circulation passages can check this instead of querying every Cell
+usage_version = 0
+
+
+def entry(topology):
+    """Cached attributes for this entity, loaded from Topologic on first access"""
+    key = topology_key(topology)
+    if not key in cache:
+        values = {}
+        dictionary = topology.GetDictionary()
+        for name in dictionary.Keys():
+            value = dictionary.ValueAtKey(name)
+            values[str(name)] = str(cppyy.bind_object(value.Value(), "std::string"))
+        cache[key] = [topology, values, set()]
+    return cache[key]
+
+
+def set_value(topology, key, value):
+    """Set an attribute, Topologic is updated on flush()"""
+    global usage_version
+    item = entry(topology)
+    if str(key) == "usage" and not item[1].get("usage") == str(value):
+        usage_version += 1
+    item[1][str(key)] = str(value)
+    item[2].add(str(key))
+
+
+def get_value(topology, key):
+    """Get an attribute, None if not set"""
+    return entry(topology)[1].get(str(key))
+
+
+def values(topology):
+    """A copy of all attributes for this entity"""
+    return dict(entry(topology)[1])
+
+
+def flush():
+    """Write all modified attributes back to Topologic Dictionaries"""
+    for item in cache.values():
+        if not item[2]:
+            continue
+        topology = item[0]
+        dictionary = topology.GetDictionary()
+        for key in item[2]:
+            if dictionary.ContainsKey(string(key)):
+                dictionary.Remove(string(key))
+            dictionary.Add(string(key), StringAttribute(item[1][key]))
+        topology.SetDictionary(dictionary)
+        item[2].clear()
+
+
+def clear():
+    """Forget everything, unflushed attributes are lost"""
+    cache.clear()
@@ -1,34 +1,35 @@
 """Overloads domain-specific methods onto topologic.Cell"""
 
 import topologic
-from topologic import Vertex, Edge, Face, Cell, FaceUtility
+from topologic import Face, Cell, FaceUtility
 from topologist.helpers import create_stl_list, el
+from topologist.snapshot import memoized
 import topologist.ugraph as ugraph
 
 
 def FacesTop(self, faces_result):
-    elements_ptr = create_stl_list(Face)
-    self.Faces(elements_ptr)
-    for face in elements_ptr:
-        if (
-            face.Elevation() == el(self.Elevation() + self.Height())
-            and face.Height() == 0.0
-        ):
+    level = el(self.Elevation() + self.Height())
+    for face in self.FacesList():
+        if face.Elevation() == level and face.Height() == 0.0:
             faces_result.push_back(face)
 
 
 def FacesBottom(self, faces_result):
-    elements_ptr = create_stl_list(Face)
-    self.Faces(elements_ptr)
-    for face in elements_ptr:
-        if face.Elevation() == self.Elevation() and face.Height() == 0.0:
+    level = self.Elevation()
+    for face in self.FacesList():
+        if face.Elevation() == level and face.Height() == 0.0:
             faces_result.push_back(face)
 
 
+def FacesBottomList(self):
+    """FacesBottom() as a python list"""
+    faces = create_stl_list(Face)
+    self.FacesBottom(faces)
+    return list(faces)
+
+
 def FacesVerticalExternal(self, faces_result):
-    elements_ptr = create_stl_list(Face)
-    self.Faces(elements_ptr)
-    for face in elements_ptr:
+    for face in self.FacesList():
         if face.IsVertical() and face.IsExternal():
             faces_result.push_back(face)
 
@@ -97,75 +98,95 @@ def Crinkliness(self):
     return self.ExternalWallArea() / self.PlanArea()
 
 
+@memoized
+def Signature(self):
+    """A hashable description of the geometry of this cell, the same cell in a
+    rebuilt CellComplex has the same signature"""
+    return tuple(sorted([face.Signature() for face in self.FacesList()]))
+
+
 def Perimeter(self):
     """2D outline of cell floor, closed, anti-clockwise"""
     elevation = self.Elevation()
     faces = create_stl_list(Face)
     self.FacesVertical(faces)
-    edges = create_stl_list(Edge)
-    lookup = {}
+    # edges are in no particular order or direction, [Vertex, Vertex, Face, key, key]
+    edges = []
     for face in faces:
         if face.Elevation() == elevation:
-            edge = face.AxisOuter()
-            if edge:
-                edges.push_back(Edge.ByStartVertexEndVertex(edge[0], edge[1]))
-                # process of creating a wire loses all references to original cellcomplex, stash
-                lookup[edge[0].CoorAsString() + " " + edge[1].CoorAsString()] = [
-                    edge[0],
-                    edge[1],
-                    face,
-                ]
-                lookup[edge[1].CoorAsString() + " " + edge[0].CoorAsString()] = [
-                    edge[1],
-                    edge[0],
-                    face,
-                ]
+            axis = face.AxisOuter()
+            if axis:
+                keys = [axis[0].CoorAsKey(), axis[1].CoorAsKey()]
+                if not keys[0] == keys[1]:
+                    edges.append([axis[0], axis[1], face, keys[0], keys[1]])
 
     graph = ugraph.graph()
-
-    # edges are in no particular order or direction
-    if len(list(edges)) < 3:
-        return graph
-    try:
-        floor = Face.ByEdges(edges)
-    except:
+    if len(edges) < 3:
         return graph
 
-    normal = floor.Normal()
-    vertices = create_stl_list(Vertex)
-    floor.VerticesPerimeter(vertices)
-    vertices_list = list(vertices)
-
-    clockwise = False
-    if normal[2] < 0.0:
-        clockwise = True
-    for i in range(len(vertices_list)):
-        if clockwise:
-            start = vertices_list[i]
-            end = vertices_list[i - 1]
-        else:
-            start = vertices_list[i - 1]
-            end = vertices_list[i]
-        start_coor = start.CoorAsString()
-        end_coor = end.CoorAsString()
-        refs = lookup[start_coor + " " + end_coor]
+    # a closed outline visits every node twice
+    adjacency = {}
+    for index in range(len(edges)):
+        for node in edges[index][3:5]:
+            adjacency.setdefault(node, []).append(index)
+    for node in adjacency:
+        if not len(adjacency[node]) == 2:
+            return graph
+
+    # walk each loop, steps are [start Vertex, end Vertex, Face, key, key]
+    loops = []
+    todo = set(range(len(edges)))
+    while todo:
+        index = min(todo)
+        node = edges[index][3]
+        loop = []
+        while index in todo:
+            todo.remove(index)
+            edge = edges[index]
+            if edge[3] == node:
+                step = edge
+            else:
+                step = [edge[1], edge[0], edge[2], edge[4], edge[3]]
+            loop.append(step)
+            node = step[4]
+            pair = adjacency[node]
+            if pair[0] == index:
+                index = pair[1]
+            else:
+                index = pair[0]
+        loops.append(loop)
+
+    # the outer loop has the largest area, a doughnut shaped room has two loops
+    largest = None
+    for loop in loops:
+        area = 0
+        # shoelace formula, keys are integers so this is exact
+        for step in loop:
+            area += step[3][0] * step[4][1] - step[4][0] * step[3][1]
+        if largest == None or abs(area) > abs(largest[0]):
+            largest = [area, loop]
+    if len(largest[1]) < 3:
+        return graph
+    loop = largest[1]
+    if largest[0] < 0.0:
+        loop = [
+            [step[1], step[0], step[2], step[4], step[3]] for step in reversed(loop)
+        ]
 
+    for step in loop:
         outer_cell = None
-        face = refs[2]
-        cells = create_stl_list(Cell)
-        face.Cells(cells)
-        for cell in cells:
+        for cell in step[2].CellsList():
             if not cell.IsSame(self):
                 outer_cell = cell
         graph.add_edge(
-            {start_coor: [end_coor, [refs[0], refs[1], refs[2], self, outer_cell]]}
+            {step[3]: [step[4], [step[0], step[1], step[2], self, outer_cell]]}
         )
-    # returning the first cycle will do weird things with doughnut shaped rooms
-    return graph.find_paths()[0]
+    return graph
 
 
 setattr(topologic.Cell, "FacesTop", FacesTop)
 setattr(topologic.Cell, "FacesBottom", FacesBottom)
+setattr(topologic.Cell, "FacesBottomList", FacesBottomList)
 setattr(topologic.Cell, "FacesVerticalExternal", FacesVerticalExternal)
 setattr(topologic.Cell, "CellsAbove", CellsAbove)
 setattr(topologic.Cell, "CellsBelow", CellsBelow)
@@ -174,4 +195,5 @@ setattr(topologic.Cell, "IsOutside", IsOutside)
 setattr(topologic.Cell, "PlanArea", PlanArea)
 setattr(topologic.Cell, "ExternalWallArea", ExternalWallArea)
 setattr(topologic.Cell, "Crinkliness", Crinkliness)
+setattr(topologic.Cell, "Signature", Signature)
 setattr(topologic.Cell, "Perimeter", Perimeter)
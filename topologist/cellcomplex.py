@@ -1,139 +1,233 @@
 """Overloads domain-specific methods onto topologic.CellComplex"""
 
+import numpy
 import topologic
-from topologic import Face, Cell, FaceUtility, CellUtility
-from topologist.helpers import create_stl_list, el
+from topologic import Vertex, Edge, Face, Cell, FaceUtility, CellUtility
+from topologist.helpers import create_stl_list, el, el_array, lowest_z
+from topologist.snapshot import TopologySnapshot
 import topologist.traces
 import topologist.hulls
 import topologist.normals
+import topologist.spatial
+import topologist.circulation
 
 
-def AllocateCells(self, widgets):
-    """Set cell types using widgets, or default to 'Outside'"""
-    if len(widgets) == 0:
-        return
-    cells = create_stl_list(Cell)
-    self.Cells(cells)
-    for cell in cells:
-        cell.Set("usage", "outside")
+def Snapshot(self):
+    """Precompute adjacency, subsequent Face and Cell queries use this snapshot"""
+    TopologySnapshot.current = TopologySnapshot(self)
+    return TopologySnapshot.current
+
+
+def Circulation(self):
+    """A python circulation graph of Cells connected by passable Faces"""
+    return topologist.circulation.Circulation(self)
+
+
+def UsageMap(self, widgets):
+    """Cell types allocated using widgets, or default to 'outside', keyed by
+    position in CellsList()"""
+    cells = self.CellsList()
+    usages = {}
+    grid = topologist.spatial.Grid()
+    for index in range(len(cells)):
+        usages[index] = "outside"
         # a usable space has vertical faces on all sides
-        if not cell.Perimeter().is_simple_cycle():
-            cell.Set("usage", "void")
+        if not cells[index].Perimeter().is_simple_cycle():
+            usages[index] = "void"
             continue
-        for widget in widgets:
-            if CellUtility.Contains(cell, widget[1]) == 0:
-                cell.Set("usage", widget[0].lower())
+        grid.add(index, topologist.spatial.bounds(cells[index], 0.0001))
+
+    # widgets are tested only against cells with bounds that contain them
+    allocated = set()
+    for widget in widgets:
+        point = [widget[1].X(), widget[1].Y(), widget[1].Z()]
+        for index in grid.candidates(point):
+            if index in allocated:
+                continue
+            if CellUtility.Contains(cells[index], widget[1]) == 0:
+                usages[index] = widget[0].lower()
+                allocated.add(index)
                 break
+    return usages
+
+
+def AllocateCells(self, widgets):
+    """Set cell types using widgets, or default to 'Outside'"""
+    if len(widgets) == 0:
+        return {}
+    cells = self.CellsList()
+    usages = self.UsageMap(widgets)
+    for index in usages:
+        cells[index].Set("usage", usages[index])
+    return usages
 
 
 # TODO non-horizontal details (gables, arches, ridges and valleys)
 
 
-def GetTraces(self):
-    """Traces are 2D ugraph paths that define walls, extrusions and rooms"""
-    mytraces = topologist.traces.Traces()
-    myhulls = topologist.hulls.Hulls()
-    mynormals = topologist.normals.Normals()
-    faces = create_stl_list(Face)
-    self.Faces(faces)
-
-    for face in faces:
-        stylename = face.Get("stylename")
-        if not stylename:
-            stylename = "default"
-        if face.IsVertical():
-            elevation = face.Elevation()
-            height = face.Height()
-
-            axis = face.AxisOuter()
-            # wall face may be triangular and not have a bottom edge
-            if axis:
-                if face.IsOpen():
-                    mytraces.add_axis("open", elevation, height, stylename, axis, face)
-
-                elif face.IsExternal():
-                    mytraces.add_axis(
-                        "external", elevation, height, stylename, axis, face
-                    )
+def face_operations(face):
+    """Trace, hull and normal operations for a face, Vertices are coordinate keys"""
+    operations = []
+    record = face.Classification()
+    stylename = record["stylename"]
+    if record["orientation"] == "vertical":
+        elevation = record["elevation"]
+        height = record["height"]
 
-                elif face.IsInternal():
-                    mytraces.add_axis_simple(
-                        "internal", elevation, height, stylename, axis, face
-                    )
+        axis = face.AxisOuter()
+        # wall face may be triangular and not have a bottom edge
+        if axis:
+            axis = [axis[0].CoorAsKey(), axis[1].CoorAsKey()]
+            if record["open"]:
+                operations.append(["axis", "open", elevation, height, stylename, axis])
+
+            elif record["external"]:
+                operations.append(
+                    ["axis", "external", elevation, height, stylename, axis]
+                )
+
+            elif record["internal"]:
+                operations.append(
+                    ["axis_simple", "internal", elevation, height, stylename, axis]
+                )
 
-                    # collect foundation strips
-                    if not face.FaceBelow():
-                        mytraces.add_axis_simple(
+                # collect foundation strips
+                if not face.FaceBelow():
+                    operations.append(
+                        [
+                            "axis_simple",
                             "internal-unsupported",
                             elevation,
                             0.0,
                             stylename,
                             axis,
-                            face,
-                        )
-            else:
-                # face has no horizontal bottom edge, add to hull for wall panels
-                myhulls.add_face("panel", stylename, face)
-
-            # TODO open wall top and bottom traces
-            if face.IsExternal():
-                normal = face.Normal()
-                for condition in face.TopLevelConditions():
-                    edge = condition[0]
-                    vertices = [edge.EndVertex(), edge.StartVertex()]
-                    if face.Get("badnormal"):
-                        vertices.reverse()
-                    label = condition[1]
-                    mytraces.add_axis(
-                        label,
-                        el(elevation + height),
-                        0.0,
-                        stylename,
-                        vertices,
-                        face,
-                    )
-                    mynormals.add_vector("top", edge.StartVertex(), normal)
-                    mynormals.add_vector("top", edge.EndVertex(), normal)
-
-                for condition in face.BottomLevelConditions():
-                    edge = condition[0]
-                    vertices = [edge.StartVertex(), edge.EndVertex()]
-                    if face.Get("badnormal"):
-                        vertices.reverse()
-                    label = condition[1]
-                    mytraces.add_axis(
-                        label,
-                        elevation,
-                        0.0,
-                        stylename,
-                        vertices,
-                        face,
+                        ]
                     )
-                    mynormals.add_vector("bottom", edge.StartVertex(), normal)
-                    mynormals.add_vector("bottom", edge.EndVertex(), normal)
+        else:
+            # face has no horizontal bottom edge, add to hull for wall panels
+            operations.append(["hull", "panel", stylename])
+
+        # TODO open wall top and bottom traces
+        if record["external"]:
+            normal = record["normal"]
+            for condition in face.TopLevelConditions():
+                edge = condition[0]
+                vertices = [
+                    edge.EndVertex().CoorAsKey(),
+                    edge.StartVertex().CoorAsKey(),
+                ]
+                if record["badnormal"]:
+                    vertices.reverse()
+                label = condition[1]
+                operations.append(
+                    ["axis", label, el(elevation + height), 0.0, stylename, vertices]
+                )
+                operations.append(["normal", "top", vertices[0], normal])
+                operations.append(["normal", "top", vertices[1], normal])
+
+            for condition in face.BottomLevelConditions():
+                edge = condition[0]
+                vertices = [
+                    edge.StartVertex().CoorAsKey(),
+                    edge.EndVertex().CoorAsKey(),
+                ]
+                if record["badnormal"]:
+                    vertices.reverse()
+                label = condition[1]
+                operations.append(["axis", label, elevation, 0.0, stylename, vertices])
+                operations.append(["normal", "bottom", vertices[0], normal])
+                operations.append(["normal", "bottom", vertices[1], normal])
 
-        elif face.IsHorizontal():
-            # collect flat roof areas (not outdoor spaces)
-            if face.IsUpward() and face.IsWorld():
-                myhulls.add_face("flat", stylename, face)
+    elif record["orientation"] == "horizontal":
+        # collect flat roof areas (not outdoor spaces)
+        if record["upward"] and record["world"]:
+            operations.append(["hull", "flat", stylename])
+    else:
+        # collect roof, soffit, and vaulted ceiling faces as hulls
+        if record["upward"]:
+            operations.append(["hull", "roof", stylename])
         else:
-            # collect roof, soffit, and vaulted ceiling faces as hulls
-            if face.IsUpward():
-                myhulls.add_face("roof", stylename, face)
+            operations.append(["hull", "soffit", stylename])
+    return operations
+
+
+def cell_operations(cell):
+    """Trace operations for a cell, the perimeter refers to Faces and Cells"""
+    perimeter = cell.Perimeter()
+    if not perimeter.is_simple_cycle():
+        return []
+    return [
+        ["trace", cell.Usage(), cell.Elevation(), cell.Height(), "default", perimeter]
+    ]
+
+
+def GetTraces(self, cache=None):
+    """Traces are 2D ugraph paths that define walls, extrusions and rooms, pass
+    the same TraceCache each time to reuse work from the previous CellComplex"""
+    mytraces = topologist.traces.Traces()
+    myhulls = topologist.hulls.Hulls()
+    mynormals = topologist.normals.Normals()
+
+    vertices_stl = create_stl_list(Vertex)
+    self.Vertices(vertices_stl)
+    vertices = {}
+    for vertex in vertices_stl:
+        vertices[vertex.CoorAsKey()] = vertex
+    if cache:
+        # faces and cells in snapshot order, the order of the cache keys
+        snapshot = cache.start(self)
+        faces = snapshot.faces
+        cells = snapshot.cells
+    else:
+        faces = self.FacesList()
+        cells = self.CellsList()
+    faces_operations = {}
+    cells_operations = {}
+
+    for index in range(len(faces)):
+        face = faces[index]
+        operations = None
+        if cache:
+            key = cache.face_keys[index]
+            operations = cache.get(cache.faces, key)
+        if operations == None:
+            operations = face_operations(face)
+        if cache:
+            faces_operations[key] = operations
+
+        for operation in operations:
+            if operation[0] == "axis":
+                mytraces.add_axis(
+                    *operation[1:5], [vertices[node] for node in operation[5]], face
+                )
+            elif operation[0] == "axis_simple":
+                mytraces.add_axis_simple(
+                    *operation[1:5], [vertices[node] for node in operation[5]], face
+                )
+            elif operation[0] == "hull":
+                myhulls.add_face(operation[1], operation[2], face)
+            elif operation[0] == "normal":
+                mynormals.add_vector(operation[1], vertices[operation[2]], operation[3])
+
+    for index in range(len(cells)):
+        cell = cells[index]
+        if cache:
+            key = cache.cell_keys[index]
+            stored = cache.get(cache.cells, key)
+            if stored == None:
+                operations = cell_operations(cell)
+                stored = cache.portable(operations)
             else:
-                myhulls.add_face("soffit", stylename, face)
+                operations = cache.restore(stored, cell, vertices)
+            cells_operations[key] = stored
+        else:
+            operations = cell_operations(cell)
 
-    cells = create_stl_list(Cell)
-    self.Cells(cells)
-    for cell in cells:
-        perimeter = cell.Perimeter()
-        if perimeter.is_simple_cycle():
-            elevation = cell.Elevation()
-            height = cell.Height()
-            stylename = "default"
+        for operation in operations:
+            mytraces.add_trace(*operation[1:6])
 
-            usage = cell.Usage()
-            mytraces.add_trace(usage, elevation, height, stylename, perimeter)
+    if cache:
+        cache.finish(faces_operations, cells_operations)
 
     mytraces.process()
     myhulls.process()
@@ -147,47 +241,93 @@ def GetTraces(self):
 
 def Elevations(self):
     """Identify all unique elevations, allocate level index"""
-    elevations = {}
-
     # FIXME doesn't collect all horizontal top edges
-    faces = create_stl_list(Face)
-    self.Faces(faces)
-    for face in faces:
-        elevation = face.Elevation()
-        elevations[float(elevation)] = 0
-        # labelling "badnormal" faces should be a separate method but here is convenient for now
-        face.BadNormal()
+    vertices, faces = self.MeshArrays()
+    if len(faces) == 0:
+        return {}
+    lowest = lowest_z(vertices, faces)
+    # faces with boundary vertices that aren't nodes are queried individually
+    missing = numpy.nonzero(numpy.isnan(lowest))[0]
+    if len(missing) > 0:
+        faces_list = self.FacesList()
+        for index in missing:
+            lowest[index] = faces_list[index].Elevation()
 
+    elevations = {}
     level = 0
-    keys = list(elevations.keys())
-    keys.sort()
-    for elevation in keys:
-        elevations[elevation] = level
+    for elevation in numpy.unique(el_array(lowest)):
+        elevations[float(elevation)] = level
         level += 1
     return elevations
 
 
+def StructuralEdges(self):
+    """Start and end coordinates of every Edge, with the 'index' of each attached
+    Face, for connecting structural members"""
+    snapshot = TopologySnapshot.current
+    if snapshot and snapshot.is_cellcomplex(self):
+        return [
+            [
+                snapshot.point(snapshot.edge_vertices[edge_id][0]),
+                snapshot.point(snapshot.edge_vertices[edge_id][1]),
+                [
+                    snapshot.faces[face_id].Get("index")
+                    for face_id in snapshot.edge_faces[edge_id]
+                ],
+            ]
+            for edge_id in range(len(snapshot.edges))
+        ]
+    edges = create_stl_list(Edge)
+    self.Edges(edges)
+    result = []
+    for edge in edges:
+        v_start = edge.StartVertex()
+        v_end = edge.EndVertex()
+        result.append(
+            [
+                [v_start.X(), v_start.Y(), v_start.Z()],
+                [v_end.X(), v_end.Y(), v_end.Z()],
+                [face.Get("index") for face in edge.FacesList()],
+            ]
+        )
+    return result
+
+
+def BadNormals(self):
+    """Label 'outside' faces inside the cellcomplex that have the wrong orientation"""
+    faces_result = []
+    for face in self.FacesList():
+        if face.BadNormal():
+            faces_result.append(face)
+    return faces_result
+
+
 def ApplyDictionary(self, source_faces):
     """Copy Dictionary items from a collection of faces"""
-    faces = create_stl_list(Face)
-    self.Faces(faces)
-    for face in faces:
-        # currently only copying material names to/from vertical faces
+    # currently only copying material names to/from vertical faces
+    index = topologist.spatial.PlaneIndex()
+    for source_face in source_faces:
+        if source_face.IsVertical():
+            index.add(source_face)
+    for face in self.FacesList():
         if not face.IsVertical():
             continue
         vertex = FaceUtility.InternalVertex(face)
-        for source_face in source_faces:
-            if not source_face.IsVertical():
-                continue
-            # FIXME calling IsInside() many times slows subsequent code!!
+        point = [vertex.X(), vertex.Y(), vertex.Z()]
+        for source_face in index.candidates(face, point):
             if FaceUtility.IsInside(source_face, vertex, 0.001):
-                dictionary = source_face.GetDictionary()
-                for key in dictionary.Keys():
-                    face.Set(key, source_face.Get(key))
+                dictionary = source_face.DumpDictionary()
+                for key in dictionary:
+                    face.Set(key, dictionary[key])
                 break
 
 
+setattr(topologic.CellComplex, "Snapshot", Snapshot)
+setattr(topologic.CellComplex, "Circulation", Circulation)
+setattr(topologic.CellComplex, "UsageMap", UsageMap)
 setattr(topologic.CellComplex, "AllocateCells", AllocateCells)
 setattr(topologic.CellComplex, "GetTraces", GetTraces)
 setattr(topologic.CellComplex, "Elevations", Elevations)
+setattr(topologic.CellComplex, "StructuralEdges", StructuralEdges)
+setattr(topologic.CellComplex, "BadNormals", BadNormals)
 setattr(topologic.CellComplex, "ApplyDictionary", ApplyDictionary)
@@ -0,0 +1,174 @@
+"""Checkpoints of the topologist stage, to skip CellComplex.ByFaces()
+
+CellComplex.ByFaces() is the slowest step in converting geometry to a
+building, but the result only depends on the input face geometry and the
+tolerance.  save_checkpoint() writes the CellComplex as a BREP string in a
+file named by faces_key(), a hash of the geometry and tolerance, so
+load_checkpoint() finds it whenever the geometry is the same.
+
+Face and Cell attributes ('usage', 'stylename', 'badnormal' etc.) are
+not preserved by BREP, and they also depend on the attributes of the
+input faces and on the widgets used to allocate Cell usages, which can
+change without changing the geometry.  save_attributes() writes them to
+a JSON sidecar named by attributes_key(), a hash of these inputs, and
+load_attributes() applies them to a loaded CellComplex.  After a style
+or widget change the BREP is still reused, only the attributes need to
+be derived again.  Attributes are matched to entities by Signature(),
+if any entity can't be matched the sidecar is ignored.
+
+Checkpoints are kept in a folder under topologist.helpers.cache_root,
+the least recently used are deleted when there are more than 'maxsize'
+files.
+
+"""
+
+import hashlib
+import json
+import os
+from topologic import Topology, CellComplex, Vertex
+from topologist.helpers import (
+    create_stl_list,
+    cache_dir,
+    write_replace,
+    cache_evict,
+)
+
+# increment when the checkpoint format changes
+VERSION = 3
+
+# BREP and sidecar files kept in directory()
+maxsize = 32
+
+
+def directory():
+    """Default location for checkpoint files"""
+    return cache_dir("checkpoints")
+
+
+def faces_key(faces, tolerance):
+    """A hash of Face geometry and tolerance, as used by CellComplex.ByFaces()"""
+    digest = hashlib.sha256()
+    digest.update(("checkpoint " + str(VERSION) + " " + repr(tolerance)).encode())
+    for face in faces:
+        vertices = create_stl_list(Vertex)
+        face.VerticesPerimeter(vertices)
+        digest.update(repr([vertex.CoorAsKey() for vertex in vertices]).encode())
+    return digest.hexdigest()
+
+
+def attributes_key(key, faces, widgets=None):
+    """A hash of everything CellComplex attributes are derived from: the
+    geometry faces_key(), the attributes of the input Faces and the widgets
+    passed to AllocateCells()"""
+    if widgets == None:
+        widgets = []
+    digest = hashlib.sha256(("attributes " + key).encode())
+    for face in faces:
+        digest.update(repr(sorted(face.DumpDictionary().items())).encode())
+    for widget in widgets:
+        digest.update(repr([widget[0], widget[1].CoorAsKey()]).encode())
+    return digest.hexdigest()
+
+
+def tuples(item):
+    """JSON has no tuples, restore the nested tuples of a Signature()"""
+    if item.__class__ == list:
+        return tuple([tuples(value) for value in item])
+    return item
+
+
+def save(path, name, content):
+    """Write a checkpoint file and discard the least recently used"""
+    write_replace(
+        os.path.join(path, name), lambda fh: fh.write(content.encode()), mode="wb"
+    )
+    cache_evict(path, maxsize)
+
+
+def read(path, name):
+    """Contents of a checkpoint file, or None. Marked as recently used"""
+    try:
+        with open(os.path.join(path, name), "rb") as fh:
+            content = fh.read().decode()
+        os.utime(os.path.join(path, name))
+    except OSError:
+        return None
+    return content
+
+
+def save_checkpoint(cellcomplex, key, path=None):
+    """Write the geometry of a CellComplex"""
+    if path == None:
+        path = directory()
+    save(path, key + ".brep", str(cellcomplex.String()))
+
+
+def load_checkpoint(key, path=None):
+    """A CellComplex from a previous save_checkpoint(), without attributes, or
+    None"""
+    if path == None:
+        path = directory()
+    content = read(path, key + ".brep")
+    if content == None:
+        return None
+    topology = Topology.ByString(content)
+
+    cellcomplexes = create_stl_list(CellComplex)
+    topology.CellComplexes(cellcomplexes)
+    if not len(cellcomplexes) == 1:
+        return None
+    return list(cellcomplexes)[0]
+
+
+def save_attributes(cellcomplex, key, path=None):
+    """Write the attributes of a CellComplex and its Faces and Cells"""
+    if path == None:
+        path = directory()
+    sidecar = {
+        "version": VERSION,
+        "cellcomplex": cellcomplex.DumpDictionary(),
+        "faces": [
+            [face.Signature(), face.DumpDictionary()]
+            for face in cellcomplex.FacesList()
+        ],
+        "cells": [
+            [cell.Signature(), cell.DumpDictionary()]
+            for cell in cellcomplex.CellsList()
+        ],
+    }
+    save(path, key + ".json", json.dumps(sidecar))
+
+
+def load_attributes(cellcomplex, key, path=None):
+    """Apply attributes from a previous save_attributes(), False if there are
+    none for this key or they don't match this CellComplex"""
+    if path == None:
+        path = directory()
+    content = read(path, key + ".json")
+    if content == None:
+        return False
+    sidecar = json.loads(content)
+    if not sidecar.get("version") == VERSION:
+        return False
+
+    # match everything before setting anything
+    matched = []
+    for entities, records in [
+        [cellcomplex.FacesList(), sidecar["faces"]],
+        [cellcomplex.CellsList(), sidecar["cells"]],
+    ]:
+        if not len(entities) == len(records):
+            return False
+        lookup = {}
+        for record in records:
+            lookup[tuples(record[0])] = record[1]
+        for entity in entities:
+            values = lookup.get(entity.Signature())
+            if values == None:
+                return False
+            matched.append([entity, values])
+    matched.append([cellcomplex, sidecar["cellcomplex"]])
+    for entity, values in matched:
+        for name in values:
+            entity.Set(name, values[name])
+    return True
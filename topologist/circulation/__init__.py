@@ -0,0 +1,147 @@
+"""A circulation graph of Cells, connected by passable Faces
+
+Graph.Adjacency() followed by Graph.Circulation() builds a Topologic
+Graph of every Cell and internal Face, only to remove the Faces that
+people can't pass through, and every subsequent query goes through
+cppyy.  This is a plain python adjacency dict built directly from
+Face.IsPassage(), nodes are positions in CellComplex.CellsList() and
+queries are breadth-first searches that don't touch Topologic.
+
+Use Graph() to get an equivalent Topologic Graph, with Vertices indexed
+the same way as Graph.Adjacency(), where one is needed.
+
+"""
+
+from topologic import Vertex, Edge, Graph, FaceUtility, CellUtility
+from topologist.helpers import create_stl_list, topology_key
+import topologist.attributes as attributes
+from topologist.graph import allocate
+
+
+class Circulation:
+    """Cells connected by passable Faces"""
+
+    def __init__(self, cellcomplex):
+        self.cellcomplex = cellcomplex
+        self.cells = cellcomplex.CellsList()
+        # node -> {neighbour node: [Face, ...]}
+        self.adjacency = []
+        # incremented whenever the passages change
+        self.version = 0
+        # Cell usages at the time the passages were found, and the
+        # attributes.usage_version when they were last checked
+        self.usages = None
+        self.usage_version = None
+        self.refresh()
+
+    def update(self):
+        """Find the passable Faces again if any Cell usage has changed since they
+        were found, the Cells are only queried if some usage has been set"""
+        if self.usage_version == attributes.usage_version:
+            return
+        self.usage_version = attributes.usage_version
+        if not self.current_usages() == self.usages:
+            self.refresh()
+
+    def refresh(self):
+        """Find the passable Faces again, Face.IsPassage() depends on Cell usage"""
+        self.usage_version = attributes.usage_version
+        self.usages = self.current_usages()
+        self.adjacency = [{} for cell in self.cells]
+        nodes = {}
+        for node in range(len(self.cells)):
+            nodes[topology_key(self.cells[node])] = node
+        for face in self.cellcomplex.FacesList():
+            if not face.IsPassage():
+                continue
+            cells = face.CellsList()
+            self.add_passage(
+                nodes[topology_key(cells[0])], nodes[topology_key(cells[1])], face
+            )
+        self.version += 1
+
+    def current_usages(self):
+        """Usage of each Cell, as a tuple"""
+        return tuple([cell.Usage() for cell in self.cells])
+
+    def add_passage(self, node_a, node_b, face):
+        """Connect two Cells through a Face"""
+        self.adjacency[node_a].setdefault(node_b, []).append(face)
+        if not node_a == node_b:
+            self.adjacency[node_b].setdefault(node_a, []).append(face)
+        self.version += 1
+
+    def remove_passage(self, node_a, node_b):
+        """Disconnect two Cells, through all Faces"""
+        self.adjacency[node_a].pop(node_b, None)
+        self.adjacency[node_b].pop(node_a, None)
+        self.version += 1
+
+    def depth(self, root):
+        """Number of passages from root to each Cell, None if unreachable"""
+        result = [None] * len(self.adjacency)
+        result[root] = 0
+        frontier = [root]
+        while frontier:
+            next_frontier = []
+            for node in frontier:
+                for neighbour in self.adjacency[node]:
+                    if result[neighbour] == None:
+                        result[neighbour] = result[node] + 1
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        return result
+
+    def components(self):
+        """Lists of Cells that are connected to each other"""
+        result = []
+        visited = [False] * len(self.adjacency)
+        for root in range(len(self.adjacency)):
+            if visited[root]:
+                continue
+            visited[root] = True
+            component = [root]
+            stack = [root]
+            while stack:
+                for neighbour in self.adjacency[stack.pop()]:
+                    if not visited[neighbour]:
+                        visited[neighbour] = True
+                        component.append(neighbour)
+                        stack.append(neighbour)
+            result.append(sorted(component))
+        return result
+
+    def is_connected(self):
+        """Can all Cells be reached from all other Cells?"""
+        return len(self.components()) < 2
+
+    def Graph(self):
+        """Equivalent Topologic Graph, with a Vertex for each Cell and passable Face"""
+        allocate(self.cellcomplex)
+        vertices = create_stl_list(Vertex)
+        edges = create_stl_list(Edge)
+        cell_vertices = []
+        for cell in self.cells:
+            vertex = CellUtility.InternalVertex(cell, 0.0001)
+            vertex.Set("class", "Cell")
+            vertex.Set("index", cell.Get("index"))
+            vertices.push_back(vertex)
+            cell_vertices.append(vertex)
+        for node_a in range(len(self.adjacency)):
+            for node_b in self.adjacency[node_a]:
+                if node_b < node_a:
+                    continue
+                for face in self.adjacency[node_a][node_b]:
+                    vertex = FaceUtility.InternalVertex(face, 0.0001)
+                    vertex.Set("class", "Face")
+                    vertex.Set("index", face.Get("index"))
+                    vertices.push_back(vertex)
+                    edges.push_back(
+                        Edge.ByStartVertexEndVertex(cell_vertices[node_a], vertex)
+                    )
+                    edges.push_back(
+                        Edge.ByStartVertexEndVertex(vertex, cell_vertices[node_b])
+                    )
+        # Graph Vertices are looked-up by Dictionary
+        attributes.flush()
+        return Graph.ByVerticesEdges(vertices, edges)
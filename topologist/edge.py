@@ -22,9 +22,7 @@ def IsVertical(self):
 
 def FaceAbove(self):
     """Is there a vertical face attached above?"""
-    faces = create_stl_list(Face)
-    self.Faces(faces)
-    for face in faces:
+    for face in self.FacesList():
         if face.IsVertical() and face.Centroid().Z() > self.Centroid().Z():
             return face
     return None
@@ -32,9 +30,7 @@ def FaceAbove(self):
 
 def FaceBelow(self):
     """Is there a vertical face attached below?"""
-    faces = create_stl_list(Face)
-    self.Faces(faces)
-    for face in faces:
+    for face in self.FacesList():
         if face.IsVertical() and face.Centroid().Z() < self.Centroid().Z():
             return face
     return None
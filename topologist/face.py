@@ -1,8 +1,18 @@
 """Overloads domain-specific methods onto topologic.Face"""
 
 import topologic
-from topologic import Vertex, Edge, Wire, Face, FaceUtility, Cell, CellUtility
-from topologist.helpers import create_stl_list
+from topologic import (
+    Vertex,
+    Edge,
+    Wire,
+    Face,
+    FaceUtility,
+    Cell,
+    CellUtility,
+    VertexUtility,
+)
+from topologist.helpers import create_stl_list, coor_to_key
+from topologist.snapshot import TopologySnapshot, memoized
 import topologist.ugraph as ugraph
 
 
@@ -28,10 +38,18 @@ def ByVertices(vertices):
 setattr(topologic.Face, "ByVertices", ByVertices)
 
 
-def CellsOrdered(self):
-    """Front Cell and back Cell, can be None"""
+@memoized
+def CellsOrderedGeometric(self):
+    """Front Cell and back Cell relative to the Topologic normal, can be None"""
+    normal = self.NormalGeometric()
+    snapshot = TopologySnapshot.current
+    if snapshot:
+        results = snapshot.cells_ordered(self, normal)
+        if results != None:
+            return results
+
+    # not a closed shell, test for containment either side of the face
     centroid = list(self.Centroid().Coordinates())
-    normal = self.Normal()
     vertex_front = Vertex.ByCoordinates(
         centroid[0] + (normal[0] / 10),
         centroid[1] + (normal[1] / 10),
@@ -43,10 +61,8 @@ def CellsOrdered(self):
         centroid[2] - (normal[2] / 10),
     )
 
-    cells = create_stl_list(Cell)
-    self.Cells(cells)
     results = [None, None]
-    for cell in cells:
+    for cell in self.CellsList():
         if CellUtility.Contains(cell, vertex_front) == 0:
             results[0] = cell
         elif CellUtility.Contains(cell, vertex_back) == 0:
@@ -54,6 +70,14 @@ def CellsOrdered(self):
     return results
 
 
+def CellsOrdered(self):
+    """Front Cell and back Cell, can be None"""
+    results = self.CellsOrderedGeometric()
+    if self.Get("badnormal"):
+        return [results[1], results[0]]
+    return [results[0], results[1]]
+
+
 def VerticesPerimeter(self, vertices_result):
     """Vertices, tracing the outer perimeter"""
     wires = create_stl_list(Wire)
@@ -62,6 +86,13 @@ def VerticesPerimeter(self, vertices_result):
     return vertices_result
 
 
+def VerticesPerimeterList(self):
+    """VerticesPerimeter() as a python list"""
+    vertices = create_stl_list(Vertex)
+    self.VerticesPerimeter(vertices)
+    return list(vertices)
+
+
 def BadNormal(self):
     """Faces on outside of cellcomplex are orientated correctly, but 'outside'
     faces inside the cellcomplex have random orientation"""
@@ -76,17 +107,21 @@ def BadNormal(self):
     return False
 
 
-def IsVertical(self):
-
+@memoized
+def NormalGeometric(self):
+    """Normal as calculated by Topologic, ignoring any 'badnormal' attribute"""
     normal_stl = FaceUtility.NormalAtParameters(self, 0.5, 0.5)
-    if abs(normal_stl.Z()) < 0.0001:
+    return [normal_stl.X(), normal_stl.Y(), normal_stl.Z()]
+
+
+def IsVertical(self):
+    if abs(self.NormalGeometric()[2]) < 0.0001:
         return True
     return False
 
 
 def IsHorizontal(self):
-    normal_stl = FaceUtility.NormalAtParameters(self, 0.5, 0.5)
-    if abs(normal_stl.Z()) > 0.9999:
+    if abs(self.NormalGeometric()[2]) > 0.9999:
         return True
     return False
 
@@ -98,56 +133,68 @@ def IsUpward(self):
     return False
 
 
-def AxisOuter(self):
-    """2D bottom edge of a vertical face, for external walls, anti-clockwise in plan"""
-    edges = create_stl_list(Edge)
-    self.EdgesBottom(edges)
+def axis_ends(face, edges):
+    """Start and end Vertices of the first and last edges of a chain"""
     if len(edges) > 0:
         unordered = ugraph.graph()
         for edge in edges:
-            start_coor = edge.StartVertex().CoorAsString()
-            end_coor = edge.EndVertex().CoorAsString()
+            start_coor = edge.StartVertex().CoorAsKey()
+            end_coor = edge.EndVertex().CoorAsKey()
             unordered.add_edge(
-                {start_coor: [end_coor, [edge.StartVertex(), edge.EndVertex(), self]]}
+                {start_coor: [end_coor, [edge.StartVertex(), edge.EndVertex(), face]]}
             )
         ordered = unordered.find_chains()[0]
         ordered_edges = ordered.edges()
         first_edge = ordered_edges[0][0]
         last_edge = ordered_edges[-1][0]
+        return [
+            ordered.graph[first_edge][1][0],
+            ordered.graph[first_edge][1][1],
+            ordered.graph[last_edge][1][0],
+            ordered.graph[last_edge][1][1],
+        ]
+    return None
+
+
+@memoized
+def AxisOuterEnds(self):
+    edges = create_stl_list(Edge)
+    self.EdgesBottom(edges)
+    return axis_ends(self, edges)
+
+
+@memoized
+def AxisOuterTopEnds(self):
+    edges = create_stl_list(Edge)
+    self.EdgesTop(edges)
+    return axis_ends(self, edges)
+
+
+def AxisOuter(self):
+    """2D bottom edge of a vertical face, for external walls, anti-clockwise in plan"""
+    ends = self.AxisOuterEnds()
+    if ends:
         if self.Get("badnormal"):
-            return [ordered.graph[first_edge][1][1], ordered.graph[last_edge][1][0]]
+            return [ends[1], ends[2]]
         else:
-            return [ordered.graph[first_edge][1][0], ordered.graph[last_edge][1][1]]
+            return [ends[0], ends[3]]
 
 
 def AxisOuterTop(self):
     """2D top edge of a vertical face, for external walls, anti-clockwise in plan"""
-    edges = create_stl_list(Edge)
-    self.EdgesTop(edges)
-    if len(edges) > 0:
-        unordered = ugraph.graph()
-        for edge in edges:
-            start_coor = edge.StartVertex().CoorAsString()
-            end_coor = edge.EndVertex().CoorAsString()
-            unordered.add_edge(
-                {start_coor: [end_coor, [edge.StartVertex(), edge.EndVertex(), self]]}
-            )
-        ordered = unordered.find_chains()[0]
-        ordered_edges = ordered.edges()
-        first_edge = ordered_edges[0][0]
-        last_edge = ordered_edges[-1][0]
+    ends = self.AxisOuterTopEnds()
+    if ends:
         if self.Get("badnormal"):
-            return [ordered.graph[last_edge][1][0], ordered.graph[first_edge][1][1]]
+            return [ends[2], ends[1]]
         else:
-            return [ordered.graph[last_edge][1][1], ordered.graph[first_edge][1][0]]
+            return [ends[3], ends[0]]
 
 
 def IsInternal(self):
     """Face between two indoor cells"""
-    cells_ptr = create_stl_list(Cell)
-    self.Cells(cells_ptr)
-    if len(cells_ptr) == 2:
-        for cell in cells_ptr:
+    cells = self.CellsList()
+    if len(cells) == 2:
+        for cell in cells:
             if cell.IsOutside():
                 return False
         return True
@@ -156,11 +203,7 @@ def IsInternal(self):
 
 def IsExternal(self):
     """Face between indoor cell and (outdoor cell or world)"""
-    cells_ptr = create_stl_list(Cell)
-    self.Cells(cells_ptr)
-    cells = []
-    for cell in cells_ptr:
-        cells.append(cell)
+    cells = self.CellsList()
     if len(cells) == 2:
         if cells[0].IsOutside() and not cells[1].IsOutside():
             return True
@@ -174,32 +217,59 @@ def IsExternal(self):
 
 def IsWorld(self):
     """Face on outside of mesh"""
-    cells_ptr = create_stl_list(Cell)
-    self.Cells(cells_ptr)
-    if len(cells_ptr) == 1:
+    if len(self.CellsList()) == 1:
         return True
     return False
 
 
 def IsOpen(self):
     """Face on outdoor cell on outside of mesh"""
-    cells_ptr = create_stl_list(Cell)
-    self.Cells(cells_ptr)
-    if len(cells_ptr) == 1:
-        for cell in cells_ptr:
+    cells = self.CellsList()
+    if len(cells) == 1:
+        for cell in cells:
             if cell.IsOutside():
                 return True
     return False
 
 
+def IsPassage(self):
+    """Can people get from one Cell to the other through this Face?"""
+    cells = self.CellsList()
+    if not len(cells) == 2:
+        return False
+    if self.IsVertical():
+        # wall
+        axis = self.AxisOuter()
+        if not axis or VertexUtility.Distance(axis[0], axis[1]) < 1.0:
+            # is too narrow for a door
+            return False
+        if cells[0].Elevation() != cells[1].Elevation():
+            # floors either side are not at the same level
+            return False
+        usage_a = cells[0].Usage()
+        usage_b = cells[1].Usage()
+        if (usage_a == "bedroom" or usage_a == "toilet") and not (
+            usage_b == "stair" or usage_b == "circulation"
+        ):
+            return False
+        if (usage_b == "bedroom" or usage_b == "toilet") and not (
+            usage_a == "stair" or usage_a == "circulation"
+        ):
+            return False
+        return True
+    elif self.IsHorizontal():
+        # floor, only in a stair flight
+        return cells[0].Usage() == "stair" and cells[1].Usage() == "stair"
+    # neither vertical or horizontal
+    return False
+
+
 def FaceAbove(self):
     """Does vertical face have a vertical face attached to a horizontal top?"""
     edges = create_stl_list(Edge)
     self.EdgesTop(edges)
     for edge in edges:
-        faces = create_stl_list(Face)
-        edge.Faces(faces)
-        for face in faces:
+        for face in edge.FacesList():
             if face.IsVertical() and not face.IsSame(self):
                 return face
     return None
@@ -210,9 +280,7 @@ def FaceBelow(self):
     edges = create_stl_list(Edge)
     self.EdgesBottom(edges)
     for edge in edges:
-        faces = create_stl_list(Face)
-        edge.Faces(faces)
-        for face in faces:
+        for face in edge.FacesList():
             if face.IsVertical() and not face.IsSame(self):
                 return face
     return None
@@ -223,20 +291,67 @@ def HorizontalFacesSideways(self, faces_result):
     edges = create_stl_list(Edge)
     self.EdgesBottom(edges)
     for edge in edges:
-        faces = create_stl_list(Face)
-        edge.Faces(faces)
-        for face in faces:
+        for face in edge.FacesList():
             if face.IsHorizontal() and not face.IsSame(self):
                 faces_result.push_back(face)
     return faces_result
 
 
 def Normal(self):
-    normal_stl = FaceUtility.NormalAtParameters(self, 0.5, 0.5)
+    normal = self.NormalGeometric()
     if self.Get("badnormal"):
-        return [-normal_stl.X(), -normal_stl.Y(), -normal_stl.Z()]
+        return [-normal[0], -normal[1], -normal[2]]
+    else:
+        return [normal[0], normal[1], normal[2]]
+
+
+@memoized
+def Signature(self):
+    """A hashable description of the geometry of this face, the same face in a
+    rebuilt CellComplex has the same signature"""
+    vertices = create_stl_list(Vertex)
+    self.ExternalBoundary().Vertices(vertices)
+    loop = [vertex.CoorAsKey() for vertex in vertices]
+    # start anywhere, but the direction matters
+    first = loop.index(min(loop))
+    return (tuple(loop[first:] + loop[:first]), coor_to_key(self.NormalGeometric()))
+
+
+def Classification(self):
+    """Everything GetTraces() needs to know about a face, in one pass"""
+    normal = self.NormalGeometric()
+    if abs(normal[2]) < 0.0001:
+        orientation = "vertical"
+    elif abs(normal[2]) > 0.9999:
+        orientation = "horizontal"
     else:
-        return [normal_stl.X(), normal_stl.Y(), normal_stl.Z()]
+        orientation = "inclined"
+    badnormal = bool(self.Get("badnormal"))
+    if badnormal:
+        normal = [-normal[0], -normal[1], -normal[2]]
+    cells = self.CellsList()
+    outdoor = len([cell for cell in cells if cell.IsOutside()])
+    indoor = len(cells) - outdoor
+    stylename = self.Get("stylename")
+    if not stylename:
+        stylename = "default"
+    return {
+        "orientation": orientation,
+        "cells": len(cells),
+        "indoor": indoor,
+        "outdoor": outdoor,
+        "badnormal": badnormal,
+        "elevation": self.Elevation(),
+        "height": self.Height(),
+        "normal": normal,
+        "upward": normal[2] > 0.0,
+        "stylename": stylename,
+        # equivalent to IsWorld(), IsOpen(), IsExternal() and IsInternal()
+        "world": len(cells) == 1,
+        "open": len(cells) == 1 and outdoor == 1,
+        "external": indoor == 1 and len(cells) in (1, 2),
+        "internal": len(cells) == 2 and indoor == 2,
+    }
 
 
 def TopLevelConditions(self):
@@ -305,21 +420,29 @@ def BottomLevelConditions(self):
     return result
 
 
+setattr(topologic.Face, "CellsOrderedGeometric", CellsOrderedGeometric)
 setattr(topologic.Face, "CellsOrdered", CellsOrdered)
 setattr(topologic.Face, "VerticesPerimeter", VerticesPerimeter)
+setattr(topologic.Face, "VerticesPerimeterList", VerticesPerimeterList)
 setattr(topologic.Face, "BadNormal", BadNormal)
+setattr(topologic.Face, "NormalGeometric", NormalGeometric)
 setattr(topologic.Face, "IsVertical", IsVertical)
 setattr(topologic.Face, "IsHorizontal", IsHorizontal)
 setattr(topologic.Face, "IsUpward", IsUpward)
+setattr(topologic.Face, "AxisOuterEnds", AxisOuterEnds)
+setattr(topologic.Face, "AxisOuterTopEnds", AxisOuterTopEnds)
 setattr(topologic.Face, "AxisOuter", AxisOuter)
 setattr(topologic.Face, "AxisOuterTop", AxisOuterTop)
 setattr(topologic.Face, "IsInternal", IsInternal)
 setattr(topologic.Face, "IsExternal", IsExternal)
 setattr(topologic.Face, "IsWorld", IsWorld)
 setattr(topologic.Face, "IsOpen", IsOpen)
+setattr(topologic.Face, "IsPassage", IsPassage)
 setattr(topologic.Face, "FaceAbove", FaceAbove)
 setattr(topologic.Face, "FaceBelow", FaceBelow)
 setattr(topologic.Face, "HorizontalFacesSideways", HorizontalFacesSideways)
 setattr(topologic.Face, "Normal", Normal)
+setattr(topologic.Face, "Signature", Signature)
+setattr(topologic.Face, "Classification", Classification)
 setattr(topologic.Face, "TopLevelConditions", TopLevelConditions)
 setattr(topologic.Face, "BottomLevelConditions", BottomLevelConditions)
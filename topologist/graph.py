@@ -1,29 +1,81 @@
 """Overloads domain-specific methods onto topologic.Graph"""
 
+import weakref
+import cppyy
 import topologic
-from topologic import Vertex, Edge, Face, Cell, Graph, VertexUtility
-from topologist.helpers import create_stl_list
-
-
-def Adjacency(cellcomplex):
-    """Index all cells and faces, return a circulation graph with the same indexing"""
-    """Adjacency graph has nodes for cells, and nodes for faces that connect them"""
-    cells = create_stl_list(Cell)
-    cellcomplex.Cells(cells)
+from topologic import Vertex, Edge, Face, Cell, Graph
+from topologist.helpers import create_stl_list, topology_key
+import topologist.attributes as attributes
+
+
+class GraphIndex:
+    """Maps both ways between Graph Vertices and CellComplex entities, keyed by
+    ('Face' or 'Cell', index) as allocated by Graph.Adjacency()"""
+
+    def __init__(self, graph):
+        self.vertices = {}
+        vertices = create_stl_list(Vertex)
+        graph.Vertices(vertices)
+        for vertex in vertices:
+            self.vertices[(vertex.Get("class"), vertex.Get("index"))] = vertex
+        # topology_key(cellcomplex) -> [cellcomplex, {(class, index): entity}]
+        self.entities = {}
+
+    def vertex(self, myclass, index):
+        """Graph Vertex for a Face or Cell index, None if not in the Graph"""
+        return self.vertices.get((myclass, index))
+
+    def entity(self, cellcomplex, myclass, index):
+        """Face or Cell in a CellComplex, None if there is no such index"""
+        key = topology_key(cellcomplex)
+        if not key in self.entities:
+            lookup = {}
+            for face in cellcomplex.FacesList():
+                lookup[("Face", face.Get("index"))] = face
+            for cell in cellcomplex.CellsList():
+                lookup[("Cell", cell.Get("index"))] = cell
+            self.entities[key] = [cellcomplex, lookup]
+        return self.entities[key][1].get((myclass, index))
+
+
+# cppyy.addressof(graph) -> [weak reference to the graph, GraphIndex]
+# entries are dropped when the graph proxy goes away, so an address reused
+# by a later Graph doesn't find a stale index
+indexes = {}
+
+
+def forget(key, reference):
+    """Drop the GraphIndex for a Graph that no longer exists"""
+    item = indexes.get(key)
+    if item and item[0] is reference:
+        del indexes[key]
+
+
+def allocate(cellcomplex):
+    """Index all cells and faces, Graph Vertices refer to these indexes"""
     index = 0
-    for cell in cells:
+    for cell in cellcomplex.CellsList():
         cell.Set("index", str(index))
         cell.Set("class", "Cell")
         index += 1
 
-    faces = create_stl_list(Face)
-    cellcomplex.Faces(faces)
     index = 0
-    for face in faces:
+    for face in cellcomplex.FacesList():
         face.Set("index", str(index))
         face.Set("class", "Face")
         index += 1
+    # entity indexes have been reallocated
+    for item in indexes.values():
+        item[1].entities.pop(topology_key(cellcomplex), None)
+
+
+def Adjacency(cellcomplex):
+    """Index all cells and faces, return a circulation graph with the same indexing"""
+    """Adjacency graph has nodes for cells, and nodes for faces that connect them"""
+    allocate(cellcomplex)
 
+    # Graph.ByTopology() copies Dictionaries, so they need to be current
+    attributes.flush()
     # a graph where each cell and face between them has a vertex
     graph = Graph.ByTopology(
         cellcomplex, False, True, False, False, False, False, 0.0001
@@ -35,105 +87,79 @@ def Circulation(self, cellcomplex):
     """Reduce adjacency graph to a circulation graph"""
     vertices = create_stl_list(Vertex)
     for face in self.Faces(cellcomplex):
-        vertex = face.GraphVertex(self)
-        if face.IsVertical():
-            # wall
-            axis = face.AxisOuter()
-            if VertexUtility.Distance(axis[0], axis[1]) < 1.0:
-                # is too narrow for a door
-                vertices.push_back(vertex)
-            else:
-                cells = create_stl_list(Cell)
-                face.Cells(cells)
-                cells = list(cells)
-                if cells[0].Elevation() != cells[1].Elevation():
-                    # floors either side are not at the same level
-                    vertices.push_back(vertex)
-                else:
-                    usage_a = cells[0].Usage()
-                    usage_b = cells[1].Usage()
-                    if (usage_a == "bedroom" or usage_a == "toilet") and not (
-                        usage_b == "stair" or usage_b == "circulation"
-                    ):
-                        vertices.push_back(vertex)
-                    elif (usage_b == "bedroom" or usage_b == "toilet") and not (
-                        usage_a == "stair" or usage_a == "circulation"
-                    ):
-                        vertices.push_back(vertex)
-
-        elif face.IsHorizontal():
-            # floor
-            cells = create_stl_list(Cell)
-            face.Cells(cells)
-            if (
-                len(cells) == 2
-                and list(cells)[0].Usage() == "stair"
-                and list(cells)[1].Usage() == "stair"
-            ):
-                continue
-            # is not in a stair flight
-            vertices.push_back(vertex)
-        else:
-            # neither vertical or horizontal
-            vertices.push_back(vertex)
+        if not face.IsPassage():
+            vertices.push_back(face.GraphVertex(self))
     self.RemoveVertices(vertices)
+    indexes.pop(cppyy.addressof(self), None)
 
 
 def IsConnected(self):
-    """Checks that all Vertices can be reached from all other Vertices"""
-    connected = True
+    """Checks that all Cell Vertices can be reached from all other Vertices"""
     vertices = create_stl_list(Vertex)
     self.Vertices(vertices)
-    vertex_a = list(vertices)[0]
-    for vertex_b in vertices:
-        if vertex_b.Get("class") == "Face":
-            continue
-        if vertex_a.IsSame(vertex_b):
-            continue
-        distance = self.TopologicalDistance(vertex_a, vertex_b)
-        if distance > 255:
-            connected = False
-    return connected
+    edges = create_stl_list(Edge)
+    self.Edges(edges)
+    # breadth-first search on (class, index) keys instead of TopologicalDistance()
+    adjacency = {}
+    for vertex in vertices:
+        adjacency[(vertex.Get("class"), vertex.Get("index"))] = []
+    for edge in edges:
+        start = edge.StartVertex()
+        end = edge.EndVertex()
+        key_start = (start.Get("class"), start.Get("index"))
+        key_end = (end.Get("class"), end.Get("index"))
+        adjacency[key_start].append(key_end)
+        adjacency[key_end].append(key_start)
+    if not adjacency:
+        return True
+    root = next(iter(adjacency))
+    visited = {root}
+    stack = [root]
+    while stack:
+        for neighbour in adjacency[stack.pop()]:
+            if not neighbour in visited:
+                visited.add(neighbour)
+                stack.append(neighbour)
+    for key in adjacency:
+        if key[0] == "Cell" and not key in visited:
+            return False
+    return True
+
+
+def Index(self):
+    """A GraphIndex for this Graph, built once"""
+    key = cppyy.addressof(self)
+    item = indexes.get(key)
+    if item == None or not item[0]() is self:
+        reference = weakref.ref(self, lambda reference: forget(key, reference))
+        item = [reference, GraphIndex(self)]
+        indexes[key] = item
+    return item[1]
 
 
 def Faces(self, cellcomplex):
     """Return all the Faces from a CellComplex corresponding to this Graph"""
-    vertices = create_stl_list(Vertex)
-    self.Vertices(vertices)
+    index = self.Index()
     faces = create_stl_list(Face)
-    for vertex in vertices:
-        if vertex.Get("class") == "Face":
-            face = self.GetEntity(cellcomplex, vertex)
-            faces.push_back(face)
+    for myclass, myindex in index.vertices:
+        if myclass == "Face":
+            faces.push_back(index.entity(cellcomplex, myclass, myindex))
     return faces
 
 
 def Cells(self, cellcomplex):
     """Return all the Cells from a CellComplex corresponding to this Graph"""
-    vertices = create_stl_list(Vertex)
-    self.Vertices(vertices)
+    index = self.Index()
     cells = create_stl_list(Cell)
-    for vertex in vertices:
-        if vertex.Get("class") == "Cell":
-            cell = self.GetEntity(cellcomplex, vertex)
-            cells.push_back(cell)
+    for myclass, myindex in index.vertices:
+        if myclass == "Cell":
+            cells.push_back(index.entity(cellcomplex, myclass, myindex))
     return cells
 
 
 def GetEntity(self, cellcomplex, vertex):
     """Return the entity from a CellComplex (Face or Cell) corresponding to this Vertex)"""
-    index = vertex.Get("index")
-    if vertex.Get("class") == "Face":
-        entities = create_stl_list(Face)
-        cellcomplex.Faces(entities)
-    elif vertex.Get("class") == "Cell":
-        entities = create_stl_list(Cell)
-        cellcomplex.Cells(entities)
-    else:
-        return None
-    for entity in entities:
-        if entity.Get("index") == index:
-            return entity
+    return self.Index().entity(cellcomplex, vertex.Get("class"), vertex.Get("index"))
 
 
 def Dot(self, cellcomplex):
@@ -162,6 +188,7 @@ def Dot(self, cellcomplex):
 setattr(topologic.Graph, "Adjacency", Adjacency)
 setattr(topologic.Graph, "Circulation", Circulation)
 setattr(topologic.Graph, "IsConnected", IsConnected)
+setattr(topologic.Graph, "Index", Index)
 setattr(topologic.Graph, "Faces", Faces)
 setattr(topologic.Graph, "Cells", Cells)
 setattr(topologic.Graph, "GetEntity", GetEntity)
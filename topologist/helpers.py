@@ -1,19 +1,105 @@
+import os
+import tempfile
 import cppyy
+import numpy
+
+# files cached between runs are kept in a folder for each kind of file under
+# this root, set HOMEMAKER_CACHE to move them all, delete it to clear them all
+cache_root = os.environ.get(
+    "HOMEMAKER_CACHE", os.path.join(tempfile.gettempdir(), "homemaker")
+)
+
+# Topology.GetType() values, as TopologicCore::TopologyType
+TYPE_VERTEX = 1
+TYPE_EDGE = 2
+TYPE_FACE = 8
+TYPE_CELL = 32
+
+
+def cache_dir(name):
+    """The folder under cache_root for one kind of cached file"""
+    return os.path.join(cache_root, name)
+
+
+def write_replace(path, write, mode="wb"):
+    """Create a file with write(filehandle), via a temporary file named with the
+    process id, so an interrupted or concurrent write can't be read half done"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    path_tmp = path + "." + str(os.getpid()) + ".tmp"
+    with open(path_tmp, mode) as fh:
+        write(fh)
+    os.replace(path_tmp, path)
+
+
+def cache_evict(directory, maxsize):
+    """Delete all but the 'maxsize' most recently modified files in a cache
+    folder, touch a file when it is used to keep it"""
+    files = []
+    for name in os.listdir(directory):
+        # another process may be writing this
+        if name.endswith(".tmp"):
+            continue
+        try:
+            files.append([os.path.getmtime(os.path.join(directory, name)), name])
+        except OSError:
+            continue
+    files.sort(reverse=True)
+    for mtime, name in files[maxsize:]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
 
 
 def create_stl_list(cppyy_data_type):
     return cppyy.gbl.std.list[cppyy_data_type.Ptr]()
 
 
+def topology_key(topology):
+    """A hashable identity for a Topologic entity, shared by all python proxies of
+    the same Vertex, Edge, Face or Cell (Topologic creates new proxies each
+    time a CellComplex is queried, so the proxies themselves can't be compared)"""
+    return cppyy.addressof(topology.GetOcctShape().TShape().get())
+
+
 def el(elevation):
     if elevation >= 0.0:
         return int((elevation * 1000) + 0.5) / 1000
     return int((elevation * 1000) - 0.5) / 1000
 
 
-def string_to_coor(string):
-    return [float(num) for num in string.split("__")]
+def el_array(elevations):
+    """el() applied to a numpy array"""
+    return (
+        numpy.sign(elevations) * numpy.floor(numpy.abs(elevations) * 1000 + 0.5) / 1000
+    )
+
+
+def lowest_z(vertices, faces):
+    """Lowest node elevation of each face from Topology.MeshArrays(), in one pass
+    over all face boundaries. NaN for faces with unmatched (None) nodes"""
+    result = numpy.full(len(faces), numpy.nan)
+    complete = [
+        index for index in range(len(faces)) if not faces[index].dtype == object
+    ]
+    if len(complete) == 0:
+        return result
+    sizes = numpy.array([len(faces[index]) for index in complete])
+    starts = numpy.concatenate([[0], numpy.cumsum(sizes)[:-1]])
+    nodes = numpy.concatenate([faces[index] for index in complete])
+    result[complete] = numpy.minimum.reduceat(vertices[nodes, 2], starts)
+    return result
+
+
+def coor_to_key(coor):
+    """A hashable key for a coordinate, quantised to a micron so nearly
+    coincident points share a key"""
+    return tuple([round(value * 1000000) for value in coor])
+
+
+def key_to_coor(key):
+    return [value / 1000000 for value in key]
 
 
-def string_to_coor_2d(string):
-    return string_to_coor(string)[0:2]
+def key_to_coor_2d(key):
+    return key_to_coor(key)[0:2]
@@ -0,0 +1,198 @@
+"""Reuse of trace generation between successive CellComplexes
+
+Editing one wall in Blender rebuilds the whole CellComplex, but most
+faces and cells are unchanged.  A TraceCache passed to
+CellComplex.GetTraces() remembers the trace, hull and normal operations
+generated by each face and cell, keyed by a description of everything
+those operations depend on: geometry, attributes and neighbours.
+
+Each face and cell is described once per run, keys are then assembled
+from these descriptions using the integer adjacency of a
+TopologySnapshot, so building a key costs a few tuple operations
+rather than the Topologic queries it replaces.  The CellComplex itself
+still has to be built, only the trace generation is skipped.
+
+Operations refer to Vertices by coordinate key, and to Faces and Cells
+by Signature(), so they can be replayed against the equivalent entities
+in a new CellComplex.  Only faces and cells with a changed key are
+recalculated, the traces are then reassembled from all the operations.
+
+"""
+
+from topologist.snapshot import TopologySnapshot
+import topologist.ugraph as ugraph
+
+
+class TraceCache:
+    """Trace operations from a previous GetTraces(), by face and cell key"""
+
+    def __init__(self):
+        self.faces = {}
+        self.cells = {}
+        # how many operations were reused or calculated in the last run
+        self.reused = 0
+        self.calculated = 0
+        # descriptions of the current CellComplex, only kept during a run
+        self.snapshot = None
+        self.face_keys = []
+        self.cell_keys = []
+        self.face_signatures = []
+        self.cell_signatures = []
+        self.faces_by_signature = {}
+        self.cells_by_signature = {}
+
+    def start(self, cellcomplex):
+        """Describe every face and cell of a CellComplex and return the snapshot
+        they are indexed by"""
+        self.reused = 0
+        self.calculated = 0
+        snapshot = TopologySnapshot.current
+        if snapshot == None or not snapshot.is_cellcomplex(cellcomplex):
+            snapshot = TopologySnapshot(cellcomplex)
+        self.snapshot = snapshot
+
+        faces = snapshot.faces
+        self.face_signatures = [face.Signature() for face in faces]
+        self.cell_signatures = [
+            tuple(sorted([self.face_signatures[face_id] for face_id in face_ids]))
+            for face_ids in snapshot.cell_faces
+        ]
+        self.faces_by_signature = dict(zip(self.face_signatures, faces))
+        self.cells_by_signature = dict(zip(self.cell_signatures, snapshot.cells))
+        usages = [cell.Usage() for cell in snapshot.cells]
+        outside = [cell.IsOutside() for cell in snapshot.cells]
+        badnormals = [bool(face.Get("badnormal")) for face in faces]
+
+        # what a face contributes to the key of each neighbouring face
+        neighbour_keys = [
+            (
+                self.face_signatures[face_id],
+                badnormals[face_id],
+                tuple(
+                    sorted(
+                        [outside[cell_id] for cell_id in snapshot.face_cells[face_id]]
+                    )
+                ),
+            )
+            for face_id in range(len(faces))
+        ]
+
+        self.face_keys = []
+        for face_id in range(len(faces)):
+            neighbours = []
+            for edge_id in snapshot.face_edges[face_id]:
+                for neighbour_id in snapshot.edge_faces[edge_id]:
+                    if not neighbour_id == face_id:
+                        neighbours.append(neighbour_keys[neighbour_id])
+            self.face_keys.append(
+                (
+                    self.face_signatures[face_id],
+                    faces[face_id].Get("stylename"),
+                    badnormals[face_id],
+                    tuple(
+                        sorted(
+                            [
+                                (self.cell_signatures[cell_id], outside[cell_id])
+                                for cell_id in snapshot.face_cells[face_id]
+                            ]
+                        )
+                    ),
+                    tuple(sorted(neighbours)),
+                )
+            )
+
+        self.cell_keys = []
+        for cell_id in range(len(snapshot.cells)):
+            cell_faces = []
+            for face_id in snapshot.cell_faces[cell_id]:
+                cell_faces.append(
+                    (
+                        self.face_signatures[face_id],
+                        badnormals[face_id],
+                        tuple(
+                            sorted(
+                                [
+                                    self.cell_signatures[other_id]
+                                    for other_id in snapshot.face_cells[face_id]
+                                ]
+                            )
+                        ),
+                    )
+                )
+            self.cell_keys.append(
+                (
+                    self.cell_signatures[cell_id],
+                    usages[cell_id],
+                    tuple(sorted(cell_faces)),
+                )
+            )
+        return snapshot
+
+    def finish(self, faces_operations, cells_operations):
+        """Keep operations for this run, those for faces and cells that no longer
+        exist are forgotten along with the CellComplex"""
+        self.faces = faces_operations
+        self.cells = cells_operations
+        self.snapshot = None
+        self.face_keys = []
+        self.cell_keys = []
+        self.face_signatures = []
+        self.cell_signatures = []
+        self.faces_by_signature = {}
+        self.cells_by_signature = {}
+
+    def get(self, store, key):
+        """Previous operations, or None"""
+        if key in store:
+            self.reused += 1
+            return store[key]
+        self.calculated += 1
+        return None
+
+    def portable(self, operations):
+        """Cell operations with Faces and Cells replaced by Signature()"""
+        results = []
+        for operation in operations:
+            perimeter = operation[5]
+            edges = []
+            for node in perimeter.graph:
+                data = perimeter.graph[node][1]
+                outer_cell = None
+                if data[4]:
+                    outer_cell = self.cell_signatures[self.snapshot.index(data[4])]
+                edges.append(
+                    [
+                        node,
+                        perimeter.graph[node][0],
+                        self.face_signatures[self.snapshot.index(data[2])],
+                        outer_cell,
+                    ]
+                )
+            results.append(operation[0:5] + [edges])
+        return results
+
+    def restore(self, operations, cell, vertices):
+        """Cell operations from portable(), for the entities in this CellComplex"""
+        results = []
+        for operation in operations:
+            perimeter = ugraph.graph()
+            for edge in operation[5]:
+                outer_cell = None
+                if edge[3]:
+                    outer_cell = self.cells_by_signature[edge[3]]
+                perimeter.add_edge(
+                    {
+                        edge[0]: [
+                            edge[1],
+                            [
+                                vertices[edge[0]],
+                                vertices[edge[1]],
+                                self.faces_by_signature[edge[2]],
+                                cell,
+                                outer_cell,
+                            ],
+                        ]
+                    }
+                )
+            results.append(operation[0:5] + [perimeter])
+        return results
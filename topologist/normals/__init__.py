@@ -1,36 +1,67 @@
 """Normals are unit vectors indicating the local vertex orientation.
 Here they are used to tell walls and extrusions how to mitre properly.
 
+Vectors are appended to growable numpy arrays, process() sums them by
+quantised location and normalises them all at once.  The result is a
+dictionary for each label, keyed by coor_to_key() of the location with
+the elevation rounded by el(), so lookups need no string formatting.
+
 """
 
-from molior.geometry import normalise_3d, add_3d
-from topologist.helpers import el
+import numpy
+from topologist.helpers import el_array
 
 
 class Normals:
     def __init__(self):
         self.normals = {"bottom": {}, "top": {}}
+        # label -> [count, [N,3] coordinates, [N,3] vectors]
+        self.arrays = {}
 
     def add_vector(self, label, vertex, vector):
         """Add a 3D vector to the location defined by a Topologic Vertex"""
         if not label in self.normals:
             self.normals[label] = {}
-
-        vertex_str = (
-            str(vertex.X()) + "__" + str(vertex.Y()) + "__" + str(el(vertex.Z()))
-        )
-
-        if vertex_str in self.normals[label]:
-            self.normals[label][vertex_str] = add_3d(
-                self.normals[label][vertex_str], vector
-            )
-        else:
-            self.normals[label][vertex_str] = vector
+        if not label in self.arrays:
+            self.arrays[label] = [
+                0,
+                numpy.empty((64, 3), dtype=numpy.float64),
+                numpy.empty((64, 3), dtype=numpy.float64),
+            ]
+        item = self.arrays[label]
+        if item[0] == len(item[1]):
+            # double the capacity
+            item[1] = numpy.concatenate([item[1], numpy.empty_like(item[1])])
+            item[2] = numpy.concatenate([item[2], numpy.empty_like(item[2])])
+        item[1][item[0]] = [vertex.X(), vertex.Y(), vertex.Z()]
+        item[2][item[0]] = vector[0:3]
+        item[0] += 1
 
     def process(self):
         """add_vector() increments the magnitude, normalise to 1.0"""
-        for label in self.normals:
-            for vertex_str in self.normals[label]:
-                self.normals[label][vertex_str] = normalise_3d(
-                    self.normals[label][vertex_str]
-                )
+        for label in self.arrays:
+            count, coors, vectors = self.arrays[label]
+            if count == 0:
+                continue
+            coors = coors[:count].copy()
+            coors[:, 2] = el_array(coors[:, 2])
+            # same quantisation as coor_to_key()
+            keys = numpy.round(coors * 1000000).astype(numpy.int64)
+            unique, first, inverse = numpy.unique(
+                keys, axis=0, return_index=True, return_inverse=True
+            )
+            sums = numpy.zeros((len(unique), 3), dtype=numpy.float64)
+            numpy.add.at(sums, inverse.reshape(-1), vectors[:count])
+
+            magnitudes = numpy.linalg.norm(sums, axis=1)
+            zero = magnitudes == 0.0
+            sums[zero] = [1.0, 0.0, 0.0]
+            magnitudes[zero] = 1.0
+            sums /= magnitudes[:, None]
+
+            # keep the order in which locations were first added
+            for index in numpy.argsort(first, kind="stable"):
+                self.normals[label][tuple(unique[index].tolist())] = sums[
+                    index
+                ].tolist()
+            self.arrays[label][0] = 0
@@ -0,0 +1,287 @@
+"""A snapshot of CellComplex adjacency, indexed by integers
+
+Topologic answers every 'which Cells are attached to this Face?' query
+by navigating the OCC geometry, and each query is a round trip through
+cppyy.  The predicates used when generating traces (IsInternal,
+IsExternal, IsWorld etc.) ask these questions many times for the same
+entities.
+
+A TopologySnapshot walks a CellComplex once, giving every Vertex, Edge,
+Face and Cell an integer index, and records adjacency as python lists
+of integers: face_cells, cell_faces, edge_faces and vertex_edges (plus
+the face_edges and edge_vertices they are derived from).
+
+Snapshots are opt-in, call CellComplex.Snapshot() once the CellComplex
+exists.  The Topology.CellsList() and Topology.FacesList() overloads
+answer from the current snapshot, anything that isn't part of the
+snapshot falls back to querying Topologic.
+
+The snapshot also memoizes per-entity geometry such as Elevation(),
+Height() and Face normals, see the @memoized decorator.  Topologic
+entities are immutable, so these values only need to be discarded when
+a new snapshot replaces this one, values that depend on attributes
+(e.g. 'badnormal') should be applied after retrieval, not memoized.
+
+The current snapshot holds the CellComplex and its memo is keyed by
+TShape address, so it must not outlive the model: process each model
+inside a topologist.session() block, which discards the snapshot on the
+way in and on the way out.
+
+"""
+
+from topologic import Vertex, Edge, Face, Cell
+from topologist.helpers import create_stl_list, topology_key
+
+
+class TopologySnapshot:
+    """Integer indexed adjacency for a CellComplex"""
+
+    # the snapshot consulted by the Face and Cell overloads, if any
+    current = None
+
+    def __init__(self, cellcomplex):
+        self.cellcomplex = cellcomplex
+        self.key = topology_key(cellcomplex)
+        # entity proxies, position in list is the index
+        self.vertices = self.collect(cellcomplex.Vertices, Vertex)
+        self.edges = self.collect(cellcomplex.Edges, Edge)
+        self.faces = self.collect(cellcomplex.Faces, Face)
+        self.cells = self.collect(cellcomplex.Cells, Cell)
+
+        # topology_key() -> index, keys are unique across all classes
+        self.lookup = {}
+        for entities in [self.vertices, self.edges, self.faces, self.cells]:
+            for index in range(len(entities)):
+                self.lookup[topology_key(entities[index])] = index
+
+        # downward navigation is cheap, upward navigation is derived from it
+        self.edge_vertices = [
+            [
+                self.lookup[topology_key(edge.StartVertex())],
+                self.lookup[topology_key(edge.EndVertex())],
+            ]
+            for edge in self.edges
+        ]
+        self.face_edges = [self.collect_ids(face.Edges, Edge) for face in self.faces]
+        self.cell_faces = [self.collect_ids(cell.Faces, Face) for cell in self.cells]
+
+        self.vertex_edges = self.invert(self.edge_vertices, len(self.vertices))
+        self.edge_faces = self.invert(self.face_edges, len(self.edges))
+        self.face_cells = self.invert(self.cell_faces, len(self.faces))
+
+        # (topology_key(), orientation, method name) -> result
+        self.memo = {}
+        # face index -> outer boundary as vertex indices, calculated when needed
+        self.loops = {}
+        # cell index -> {face index: 1 or -1}, calculated when needed
+        self.orientations = {}
+
+    def collect(self, method, cppyy_data_type):
+        """A python list of entities from a Topologic method such as Faces()"""
+        entities = create_stl_list(cppyy_data_type)
+        method(entities)
+        return list(entities)
+
+    def collect_ids(self, method, cppyy_data_type):
+        """Indices of entities from a Topologic method such as Faces()"""
+        return [
+            self.lookup[topology_key(entity)]
+            for entity in self.collect(method, cppyy_data_type)
+        ]
+
+    def invert(self, adjacency, length):
+        """Given child indices for each parent, return parent indices for each child"""
+        result = [[] for _ in range(length)]
+        for parent in range(len(adjacency)):
+            for child in adjacency[parent]:
+                result[child].append(parent)
+        return result
+
+    def index(self, entity):
+        """Index of a Vertex, Edge, Face or Cell, None if not in this snapshot"""
+        return self.lookup.get(topology_key(entity))
+
+    def is_cellcomplex(self, topology):
+        """Is this the CellComplex this snapshot was taken from?"""
+        return topology_key(topology) == self.key
+
+    def cells_of_face(self, face):
+        """Cells attached to a Face, None if the Face isn't in this snapshot"""
+        index = self.index(face)
+        if index == None:
+            return None
+        return [self.cells[cell_id] for cell_id in self.face_cells[index]]
+
+    def faces_of_cell(self, cell):
+        """Faces bounding a Cell, None if the Cell isn't in this snapshot"""
+        index = self.index(cell)
+        if index == None:
+            return None
+        return [self.faces[face_id] for face_id in self.cell_faces[index]]
+
+    def faces_of_edge(self, edge):
+        """Faces meeting at an Edge, None if the Edge isn't in this snapshot"""
+        index = self.index(edge)
+        if index == None:
+            return None
+        return [self.faces[face_id] for face_id in self.edge_faces[index]]
+
+    def edges_of_vertex(self, vertex):
+        """Edges meeting at a Vertex, None if the Vertex isn't in this snapshot"""
+        index = self.index(vertex)
+        if index == None:
+            return None
+        return [self.edges[edge_id] for edge_id in self.vertex_edges[index]]
+
+    def point(self, vertex_id):
+        vertex = self.vertices[vertex_id]
+        return [vertex.X(), vertex.Y(), vertex.Z()]
+
+    def face_loop(self, face_id):
+        """Vertex indices of the outer boundary of a Face, None if not in this snapshot"""
+        if not face_id in self.loops:
+            vertices = self.collect(
+                self.faces[face_id].ExternalBoundary().Vertices, Vertex
+            )
+            loop = [self.lookup.get(topology_key(vertex)) for vertex in vertices]
+            if None in loop or len(loop) < 3:
+                loop = None
+            self.loops[face_id] = loop
+        return self.loops[face_id]
+
+    def newell(self, loop):
+        """Area weighted normal of a polygon, follows the order of the vertices"""
+        points = [self.point(vertex_id) for vertex_id in loop]
+        normal = [0.0, 0.0, 0.0]
+        for i in range(len(points)):
+            a = points[i - 1]
+            b = points[i]
+            normal[0] += (a[1] - b[1]) * (a[2] + b[2])
+            normal[1] += (a[2] - b[2]) * (a[0] + b[0])
+            normal[2] += (a[0] - b[0]) * (a[1] + b[1])
+        return normal
+
+    def cell_orientation(self, cell_id):
+        """Orientation of each Face boundary relative to the outside of a Cell,
+        found by propagating across shared edges, None if the Cell isn't a
+        closed manifold shell"""
+        if cell_id in self.orientations:
+            return self.orientations[cell_id]
+        self.orientations[cell_id] = None
+        face_ids = self.cell_faces[cell_id]
+
+        # undirected edge -> [[face index, 1 if boundary runs low to high or -1]]
+        uses = {}
+        for face_id in face_ids:
+            loop = self.face_loop(face_id)
+            if loop == None:
+                return None
+            for i in range(len(loop)):
+                a = loop[i - 1]
+                b = loop[i]
+                direction = 1
+                if a > b:
+                    direction = -1
+                uses.setdefault((min(a, b), max(a, b)), []).append([face_id, direction])
+        for edge in uses:
+            if len(uses[edge]) != 2:
+                return None
+
+        # neighbouring faces traverse a shared edge in opposite directions
+        orientation = {face_ids[0]: 1}
+        todo = [face_ids[0]]
+        while todo:
+            face_id = todo.pop()
+            loop = self.face_loop(face_id)
+            for i in range(len(loop)):
+                a = loop[i - 1]
+                b = loop[i]
+                pair = uses[(min(a, b), max(a, b))]
+                if pair[0][0] == face_id:
+                    mine, other = pair
+                else:
+                    other, mine = pair
+                required = -orientation[face_id] * mine[1] * other[1]
+                if not other[0] in orientation:
+                    orientation[other[0]] = required
+                    todo.append(other[0])
+                elif orientation[other[0]] != required:
+                    return None
+        if len(orientation) != len(face_ids):
+            return None
+
+        # a positive signed volume means boundaries run anticlockwise seen from outside
+        volume = 0.0
+        for face_id in face_ids:
+            loop = self.face_loop(face_id)
+            if orientation[face_id] < 0:
+                loop = list(reversed(loop))
+            p0 = self.point(loop[0])
+            for i in range(1, len(loop) - 1):
+                p1 = self.point(loop[i])
+                p2 = self.point(loop[i + 1])
+                volume += (
+                    p0[0] * (p1[1] * p2[2] - p1[2] * p2[1])
+                    + p0[1] * (p1[2] * p2[0] - p1[0] * p2[2])
+                    + p0[2] * (p1[0] * p2[1] - p1[1] * p2[0])
+                )
+        if abs(volume) < 0.000001:
+            return None
+        if volume < 0.0:
+            for face_id in orientation:
+                orientation[face_id] = -orientation[face_id]
+
+        self.orientations[cell_id] = orientation
+        return orientation
+
+    def cells_ordered(self, face, normal):
+        """Cells in front of and behind a Face with this normal, None if this can't
+        be resolved without testing for containment"""
+        face_id = self.index(face)
+        if face_id == None:
+            return None
+        loop = self.face_loop(face_id)
+        if loop == None:
+            return None
+        boundary = self.newell(loop)
+        results = [None, None]
+        for cell_id in self.face_cells[face_id]:
+            orientation = self.cell_orientation(cell_id)
+            if orientation == None:
+                return None
+            outward = [axis * orientation[face_id] for axis in boundary]
+            dot = (
+                outward[0] * normal[0] + outward[1] * normal[1] + outward[2] * normal[2]
+            )
+            # the normal points away from the Cell behind the Face
+            if dot < 0.0:
+                results[0] = self.cells[cell_id]
+            else:
+                results[1] = self.cells[cell_id]
+        return results
+
+    def memoize(self, entity, name, method):
+        """Result of method(entity), calculated once for entities in this snapshot"""
+        key = topology_key(entity)
+        if not key in self.lookup:
+            return method(entity)
+        # the same TShape can be shared by reversed Faces with opposite normals
+        memo_key = (key, entity.GetOcctShape().Orientation(), name)
+        if not memo_key in self.memo:
+            self.memo[memo_key] = method(entity)
+        return self.memo[memo_key]
+
+
+def memoized(method):
+    """Decorator for geometric overloads that take no arguments, results are
+    kept in the current snapshot"""
+
+    def wrapper(self):
+        snapshot = TopologySnapshot.current
+        if snapshot == None:
+            return method(self)
+        return snapshot.memoize(self, method.__name__, method)
+
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
@@ -0,0 +1,110 @@
+"""Spatial indexes for finding candidate Topologic entities
+
+Testing a point against every Face or Cell with FaceUtility.IsInside()
+or CellUtility.Contains() is slow when there are many of them.  These
+indexes are a cheap prefilter, they return a short list of candidates
+that may contain the point, the expensive Topologic test is still
+needed to confirm.
+
+"""
+
+import math
+from topologic import Vertex, FaceUtility
+from topologist.helpers import create_stl_list
+
+
+def bounds(topology, tolerance=0.0):
+    """Axis aligned bounding box [xmin, ymin, zmin, xmax, ymax, zmax]"""
+    vertices = create_stl_list(Vertex)
+    topology.Vertices(vertices)
+    coors = [[vertex.X(), vertex.Y(), vertex.Z()] for vertex in vertices]
+    return [min([coor[axis] for coor in coors]) - tolerance for axis in range(3)] + [
+        max([coor[axis] for coor in coors]) + tolerance for axis in range(3)
+    ]
+
+
+def in_bounds(box, point):
+    """Is this [x, y, z] point within a bounding box?"""
+    for axis in range(3):
+        if point[axis] < box[axis] or point[axis] > box[axis + 3]:
+            return False
+    return True
+
+
+class PlaneIndex:
+    """Faces bucketed by plane equation, then filtered by bounding box"""
+
+    def __init__(self, tolerance=0.001, quantum=0.01):
+        self.tolerance = tolerance
+        self.quantum = quantum
+        # (nx, ny, nz, d) quantised -> [[position, face, bounding box]]
+        self.buckets = {}
+        self.size = 0
+
+    def plane(self, face):
+        """Quantised normal and distance from origin"""
+        normal_stl = FaceUtility.NormalAtParameters(face, 0.5, 0.5)
+        normal = [normal_stl.X(), normal_stl.Y(), normal_stl.Z()]
+        vertex = FaceUtility.InternalVertex(face)
+        distance = (
+            normal[0] * vertex.X() + normal[1] * vertex.Y() + normal[2] * vertex.Z()
+        )
+        return [int(math.floor(value / self.quantum + 0.5)) for value in normal] + [
+            int(math.floor(distance / self.quantum + 0.5))
+        ]
+
+    def add(self, face):
+        """Index a Face, candidates are returned in the order they were added"""
+        key = tuple(self.plane(face))
+        self.buckets.setdefault(key, []).append(
+            [self.size, face, bounds(face, self.tolerance)]
+        )
+        self.size += 1
+
+    def candidates(self, face, point):
+        """Indexed Faces coplanar with a Face, that may contain a point on it"""
+        key = self.plane(face)
+        found = {}
+        # faces may have opposite normals, values may be either side of a boundary
+        for sign in [1, -1]:
+            for offset in range(81):
+                nearby = tuple(
+                    [sign * key[i] + (offset // 3**i) % 3 - 1 for i in range(4)]
+                )
+                for item in self.buckets.get(nearby, []):
+                    if in_bounds(item[2], point):
+                        found[item[0]] = item[1]
+        return [found[position] for position in sorted(found)]
+
+
+class Grid:
+    """Entities indexed by bounding box in a uniform grid"""
+
+    def __init__(self, size=5.0):
+        self.size = size
+        # (i, j, k) -> [[position, entity, bounding box]]
+        self.buckets = {}
+        self.count = 0
+
+    def cell(self, point):
+        return tuple([int(math.floor(point[axis] / self.size)) for axis in range(3)])
+
+    def add(self, entity, box):
+        """Index an entity with a bounding box, candidates are returned in the
+        order they were added"""
+        item = [self.count, entity, box]
+        low = self.cell(box[0:3])
+        high = self.cell(box[3:6])
+        for i in range(low[0], high[0] + 1):
+            for j in range(low[1], high[1] + 1):
+                for k in range(low[2], high[2] + 1):
+                    self.buckets.setdefault((i, j, k), []).append(item)
+        self.count += 1
+
+    def candidates(self, point):
+        """Indexed entities whose bounding box contains an [x, y, z] point"""
+        return [
+            item[1]
+            for item in self.buckets.get(self.cell(point), [])
+            if in_bounds(item[2], point)
+        ]
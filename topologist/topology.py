@@ -1,45 +1,81 @@
 """Overloads domain-specific methods onto topologic.Topology"""
 
-import cppyy
-from cppyy.gbl.std import string
+import numpy
 import topologic
-from topologic import Vertex, Edge, Face, Cell, StringAttribute
-from topologist.helpers import create_stl_list, el
+from topologic import Vertex, Edge, Face, Cell
+from topologist.helpers import create_stl_list, el, topology_key
+from topologist.snapshot import TopologySnapshot, memoized
+import topologist.attributes as attributes
+
+
+def CellsList(self):
+    """Cells attached to a Face, or all Cells of a CellComplex, as a python list.
+    Answered from the current TopologySnapshot if it knows this entity"""
+    snapshot = TopologySnapshot.current
+    if snapshot:
+        if self.__class__ == Face:
+            cells = snapshot.cells_of_face(self)
+            if cells != None:
+                return cells
+        elif snapshot.is_cellcomplex(self):
+            return list(snapshot.cells)
+    cells_ptr = create_stl_list(Cell)
+    self.Cells(cells_ptr)
+    return list(cells_ptr)
+
+
+def FacesList(self):
+    """Faces attached to an Edge, bounding a Cell, or all Faces of a CellComplex, as
+    a python list. Answered from the current TopologySnapshot if it knows this entity"""
+    snapshot = TopologySnapshot.current
+    if snapshot:
+        faces = None
+        if self.__class__ == Edge:
+            faces = snapshot.faces_of_edge(self)
+        elif self.__class__ == Cell:
+            faces = snapshot.faces_of_cell(self)
+        elif snapshot.is_cellcomplex(self):
+            faces = list(snapshot.faces)
+        if faces != None:
+            return faces
+    faces_ptr = create_stl_list(Face)
+    self.Faces(faces_ptr)
+    return list(faces_ptr)
 
 
 def FacesVertical(self, faces_result):
-    elements_ptr = create_stl_list(Face)
-    self.Faces(elements_ptr)
-    for face in elements_ptr:
+    for face in self.FacesList():
         if face.IsVertical():
             faces_result.push_back(face)
 
 
 def FacesHorizontal(self, faces_result):
-    elements_ptr = create_stl_list(Face)
-    self.Faces(elements_ptr)
-    for face in elements_ptr:
+    for face in self.FacesList():
         if face.IsHorizontal():
             faces_result.push_back(face)
 
 
 def FacesInclined(self, faces_result):
-    elements_ptr = create_stl_list(Face)
-    self.Faces(elements_ptr)
-    for face in elements_ptr:
+    for face in self.FacesList():
         if not face.IsHorizontal() and not face.IsVertical():
             faces_result.push_back(face)
 
 
+def FacesInclinedList(self):
+    """Inclined Faces as a python list"""
+    faces = create_stl_list(Face)
+    self.FacesInclined(faces)
+    return list(faces)
+
+
 def FacesExternal(self, faces_result):
-    elements_ptr = create_stl_list(Face)
-    self.Faces(elements_ptr)
-    for face in elements_ptr:
+    for face in self.FacesList():
         if face.IsExternal():
             faces_result.push_back(face)
     return faces_result
 
 
+@memoized
 def Elevation(self):
     lowest = 9999999.9
     vertices = create_stl_list(Vertex)
@@ -50,6 +86,7 @@ def Elevation(self):
     return el(lowest)
 
 
+@memoized
 def Height(self):
     highest = -9999999.9
     vertices = create_stl_list(Vertex)
@@ -60,11 +97,23 @@ def Height(self):
     return el(highest - self.Elevation())
 
 
-def Mesh(self):
-    """A list of node coordinates and a list of faces"""
+def MeshArrays(self):
+    """Node coordinates as a float64 [N, 3] array, and faces as int32 arrays of
+    node indices. A boundary Vertex that isn't one of the nodes is None, as
+    with VertexId(), and that face array has dtype object instead"""
     vertices_stl = create_stl_list(Vertex)
     self.Vertices(vertices_stl)
-    vertices = [vertex.Coordinates() for vertex in vertices_stl]
+    vertices = numpy.zeros((len(vertices_stl), 3), dtype=numpy.float64)
+    # face boundaries are resolved to nodes by identity, or by coordinates
+    lookup = {}
+    lookup_coor = {}
+    index = 0
+    for vertex in vertices_stl:
+        coor = (vertex.X(), vertex.Y(), vertex.Z())
+        vertices[index] = coor
+        lookup[topology_key(vertex)] = index
+        lookup_coor[coor] = index
+        index += 1
 
     faces_stl = create_stl_list(Face)
     self.Faces(faces_stl)
@@ -72,10 +121,25 @@ def Mesh(self):
     for face in faces_stl:
         vertices_wire = create_stl_list(Vertex)
         face.ExternalBoundary().Vertices(vertices_wire)
-        faces.append([self.VertexId(vertex) for vertex in vertices_wire])
+        face_ids = []
+        for vertex in vertices_wire:
+            node_id = lookup.get(topology_key(vertex))
+            if node_id == None:
+                node_id = lookup_coor.get((vertex.X(), vertex.Y(), vertex.Z()))
+            face_ids.append(node_id)
+        if None in face_ids:
+            faces.append(numpy.array(face_ids, dtype=object))
+        else:
+            faces.append(numpy.array(face_ids, dtype=numpy.int32))
     return vertices, faces
 
 
+def Mesh(self):
+    """A list of node coordinates and a list of faces"""
+    vertices, faces = self.MeshArrays()
+    return vertices.tolist(), [face.tolist() for face in faces]
+
+
 def EdgesTop(self, edges_result):
     """A list of horizontal edges at the highest level of this face"""
     edges = create_stl_list(Edge)
@@ -118,46 +182,37 @@ def EdgesCrop(self, edges_result):
         edges_result.push_back(edge)
 
 
+def EdgesCropList(self):
+    """EdgesCrop() as a python list"""
+    edges = create_stl_list(Edge)
+    self.EdgesCrop(edges)
+    return list(edges)
+
+
 def Set(self, key, value):
-    """Simple string value dictionary access"""
-    dictionary = self.GetDictionary()
-    if dictionary.ContainsKey(string(key)):
-        dictionary.Remove(string(key))
-    dictionary.Add(string(str(key)), StringAttribute(str(value)))
-    self.SetDictionary(dictionary)
+    """Simple dictionary access, cached until attributes.flush()"""
+    attributes.set_value(self, key, value)
 
 
 def Get(self, key):
-    """Simple string value dictionary access"""
-    dictionary = self.GetDictionary()
-    if dictionary.ContainsKey(string(key)):
-        value = dictionary.ValueAtKey(str(key))
-        return str(cppyy.bind_object(value.Value(), "std::string"))
-    return None
+    """Simple dictionary access, values are str unless set otherwise"""
+    return attributes.get_value(self, key)
 
 
 def DumpDictionary(self):
-    dictionary = self.GetDictionary()
-    keys = dictionary.Keys()
-    result = {}
-    for key in keys:
-        value = self.Get(str(key))
-        result[str(key)] = value
-    return result
+    return attributes.values(self)
 
 
 def GraphVertex(self, graph):
+    """The Vertex in a Graph that represents this Face or Cell, if any"""
     index = self.Get("index")
+    if index == None:
+        return None
     if self.__class__ == Face:
-        myclass = "Face"
+        return graph.Index().vertex("Face", index)
     if self.__class__ == Cell:
-        myclass = "Cell"
-    if not index == None:
-        vertices = create_stl_list(Vertex)
-        graph.Vertices(vertices)
-        for vertex in vertices:
-            if vertex.Get("index") == index and vertex.Get("class") == myclass:
-                return vertex
+        return graph.Index().vertex("Cell", index)
+    return None
 
 
 def VertexId(self, vertex):
@@ -170,16 +225,21 @@ def VertexId(self, vertex):
         i += 1
 
 
+setattr(topologic.Topology, "CellsList", CellsList)
+setattr(topologic.Topology, "FacesList", FacesList)
 setattr(topologic.Topology, "FacesVertical", FacesVertical)
 setattr(topologic.Topology, "FacesHorizontal", FacesHorizontal)
 setattr(topologic.Topology, "FacesInclined", FacesInclined)
+setattr(topologic.Topology, "FacesInclinedList", FacesInclinedList)
 setattr(topologic.Topology, "FacesExternal", FacesExternal)
 setattr(topologic.Topology, "Elevation", Elevation)
 setattr(topologic.Topology, "Height", Height)
+setattr(topologic.Topology, "MeshArrays", MeshArrays)
 setattr(topologic.Topology, "Mesh", Mesh)
 setattr(topologic.Topology, "EdgesTop", EdgesTop)
 setattr(topologic.Topology, "EdgesBottom", EdgesBottom)
 setattr(topologic.Topology, "EdgesCrop", EdgesCrop)
+setattr(topologic.Topology, "EdgesCropList", EdgesCropList)
 setattr(topologic.Topology, "Set", Set)
 setattr(topologic.Topology, "Get", Get)
 setattr(topologic.Topology, "DumpDictionary", DumpDictionary)
@@ -8,11 +8,33 @@ class graph:
 
     def __init__(self):
         self.graph = {}
+        # end node -> [start nodes], for whichever dict self.graph was indexed
+        self.reverse = {}
+        self.indexed = self.graph
+        # nodes(), starts() and ends(), until the next add_edge()
+        self.cache = {}
+
+    def index(self):
+        """Rebuild the indexes if self.graph has been replaced"""
+        if self.indexed is self.graph:
+            return
+        self.reverse = {}
+        for start in self.graph:
+            self.reverse.setdefault(self.graph[start][0], []).append(start)
+        self.indexed = self.graph
+        self.cache = {}
 
     def add_edge(self, edge):
         """graph.add_edge({'C': ['D', 'do']})"""
+        self.index()
         for key in edge:
+            if key in self.graph:
+                self.reverse[self.graph[key][0]].remove(key)
+                if not self.reverse[self.graph[key][0]]:
+                    del self.reverse[self.graph[key][0]]
             self.graph[key] = edge[key]
+            self.reverse.setdefault(edge[key][0], []).append(key)
+        self.cache = {}
 
     def get_edge_data(self, edge):
         if self.graph[edge[0]] and self.graph[edge[0]][0] == edge[1]:
@@ -22,75 +44,93 @@ class graph:
         return None
 
     def nodes(self):
-        result = {}
-        for vertex in self.graph:
-            result[vertex] = True
-            result[self.graph[vertex][0]] = True
-        return result
+        """All nodes in order of appearance, don't modify the result"""
+        self.index()
+        if not "nodes" in self.cache:
+            result = {}
+            for vertex in self.graph:
+                result[vertex] = True
+                result[self.graph[vertex][0]] = True
+            self.cache["nodes"] = result
+        return self.cache["nodes"]
 
     def edges(self):
         return [[vertex, self.graph[vertex][0]] for vertex in self.graph]
 
     def starts(self):
-        return [vertex_a for vertex_a in self.graph]
+        """don't modify the result"""
+        self.index()
+        if not "starts" in self.cache:
+            self.cache["starts"] = list(self.graph)
+        return self.cache["starts"]
 
     def ends(self):
-        return [self.graph[vertex_a][0] for vertex_a in self.graph]
+        """don't modify the result"""
+        self.index()
+        if not "ends" in self.cache:
+            self.cache["ends"] = [self.graph[vertex_a][0] for vertex_a in self.graph]
+        return self.cache["ends"]
+
+    def in_degree(self, vertex):
+        """number of edges ending at this node"""
+        self.index()
+        return len(self.reverse.get(vertex, []))
+
+    def predecessors(self, vertex):
+        """nodes with an edge ending at this node"""
+        self.index()
+        return list(self.reverse.get(vertex, []))
 
     def is_simple_cycle(self):
         """does the last node connect to the first node?"""
-        if len(self.graph) > 0 and self.starts()[0] == self.ends()[-1]:
-            return True
+        if len(self.graph) > 0:
+            first = next(iter(self.graph))
+            last = next(reversed(self.graph))
+            if first == self.graph[last][0]:
+                return True
         return False
 
     def source_vertices(self):
-        result = []
-        start_list = self.starts()
-        end_list = self.ends()
-        for start in start_list:
-            if not start in end_list:
-                result.append(start)
-        return result
+        self.index()
+        return [start for start in self.graph if not start in self.reverse]
 
     def find_chains(self):
-        """find_chains() and find_cycles() destroy the graph"""
+        """open chains starting at each source node, the graph is unchanged"""
         result = []
-        source_list = self.source_vertices()
-        for vertex in source_list:
+        visited = set()
+        for vertex in self.source_vertices():
             chain = graph()
-            todo = True
-            while todo == True:
+            while True:
                 chain.add_edge({vertex: self.graph[vertex]})
-                if self.graph[vertex][0] in self.graph:
-                    vertex_next = self.graph[vertex][0]
-                    self.graph[vertex] = False
-                    vertex = vertex_next
-                else:
-                    self.graph[vertex] = False
-                    todo = False
+                visited.add(vertex)
+                vertex = self.graph[vertex][0]
+                if not vertex in self.graph or vertex in visited:
+                    break
             result.append(chain)
         return result
 
-    def find_cycles(self):
-        """find_cycles() destroys the graph and needs to be run after find_chains()"""
+    def find_cycles(self, chains=None):
+        """closed loops of nodes not in the find_chains() result, the graph is
+        unchanged"""
+        if chains == None:
+            chains = self.find_chains()
+        visited = set()
+        for chain in chains:
+            visited.update(chain.graph)
         result = []
         for vertex in self.graph:
-            if not self.graph[vertex]:
+            if vertex in visited:
                 continue
             cycle = graph()
-            todo = True
-            while todo == True:
-                if self.graph[vertex] and self.graph[vertex][0] in self.graph:
-                    cycle.add_edge({vertex: self.graph[vertex]})
-                    vertex_next = self.graph[vertex][0]
-                    self.graph[vertex] = False
-                    vertex = vertex_next
-                else:
-                    self.graph[vertex] = False
-                    todo = False
+            while not vertex in visited and self.graph[vertex][0] in self.graph:
+                cycle.add_edge({vertex: self.graph[vertex]})
+                visited.add(vertex)
+                vertex = self.graph[vertex][0]
+            visited.add(vertex)
             result.append(cycle)
         return result
 
     def find_paths(self):
         """return result of find_chains() and find_cycles() as a single list"""
-        return self.find_chains() + self.find_cycles()
+        chains = self.find_chains()
+        return chains + self.find_cycles(chains)
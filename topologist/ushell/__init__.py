@@ -1,4 +1,4 @@
-from topologist.helpers import string_to_coor
+from topologist.helpers import coor_to_key, key_to_coor
 
 
 class shell:
@@ -9,59 +9,64 @@ class shell:
     # objects such as Topologic Cells and Faces in the CellComplex
 
     def __init__(self):
+        # coordinate key -> integer node id, in order of appearance
         self.nodes = {}
         self.faces = []
+        # node ids for each face, in the same order as self.faces
+        self.faces_ids = []
 
     def add_face(self, node_coors, normal, data):
         """add a face to this shell"""
-        nodes_str = [
-            str(node[0]) + "__" + str(node[1]) + "__" + str(node[2])
-            for node in node_coors
-        ]
-        my_face = [nodes_str, normal, data, None]
+        node_keys = [coor_to_key(node) for node in node_coors]
+        my_face = [node_keys, normal, data, None]
         self.faces.append(my_face)
-        for index in range(len(node_coors)):
-            if not nodes_str[index] in self.nodes:
-                self.nodes[nodes_str[index]] = []
-            self.nodes[nodes_str[index]].append(my_face)
+        node_ids = []
+        for node_key in node_keys:
+            if not node_key in self.nodes:
+                self.nodes[node_key] = len(self.nodes)
+            node_ids.append(self.nodes[node_key])
+        self.faces_ids.append(node_ids)
 
     def nodes_all(self):
         """get a list of node coordinates for export"""
-        return [string_to_coor(node) for node in list(self.nodes)]
+        return [key_to_coor(node) for node in self.nodes]
 
     def faces_all(self):
         """get a list of faces as node ids for export"""
-        faces = []
-        nodes = list(self.nodes)
-        for face in self.faces:
-            faces.append([nodes.index(vertex) for vertex in face[0]])
-        return faces
+        return [list(node_ids) for node_ids in self.faces_ids]
 
     def segment(self):
-        """allocate index numbers to faces by contiguous region"""
-        if self.faces[0][3] == None:
-            # put first face in group 0
-            self.faces[0][3] = 0
-        indices_in_use = {}
-        dirty = True
-        while dirty == True:
-            dirty = False
-            for face in self.faces:
-                if face[3] == None:
-                    for node_str in face[0]:
-                        node = self.nodes[node_str]
-                        for face_ref in node:
-                            if not face_ref[3] == None:
-                                face[3] = face_ref[3]
-                                dirty = True
-                                continue
-                else:
-                    indices_in_use[face[3]] = True
-        index = len(list(indices_in_use))
-        for face in self.faces:
-            if face[3] == None:
-                face[3] = index
-                self.segment()
+        """allocate index numbers to faces by contiguous region, numbered in
+        order of appearance"""
+        # union-find of faces that share a node
+        parent = list(range(len(self.faces)))
+
+        def find(index):
+            root = index
+            while not parent[root] == root:
+                root = parent[root]
+            while not parent[index] == root:
+                parent[index], index = root, parent[index]
+            return root
+
+        first_face = {}
+        for index in range(len(self.faces_ids)):
+            for node_id in self.faces_ids[index]:
+                if not node_id in first_face:
+                    first_face[node_id] = index
+                    continue
+                root_a = find(index)
+                root_b = find(first_face[node_id])
+                if not root_a == root_b:
+                    # the earliest face is the root of a group
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        groups = {}
+        for index in range(len(self.faces)):
+            root = find(index)
+            if not root in groups:
+                groups[root] = len(groups)
+            self.faces[index][3] = groups[root]
 
     def decompose(self):
         """identify contiguous regions and return a list of new shells"""
@@ -72,6 +77,6 @@ class shell:
             if not group in results:
                 results[group] = shell()
             results[group].add_face(
-                [string_to_coor(node_str) for node_str in face[0]], face[1], face[2]
+                [key_to_coor(node_key) for node_key in face[0]], face[1], face[2]
             )
         return list(results.values())
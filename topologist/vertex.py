@@ -1,10 +1,11 @@
 """Overloads domain-specific methods onto topologic.Vertex"""
 
 import topologic
+from topologist.helpers import coor_to_key
 
 
-def CoorAsString(self):
-    return str(self.X()) + "__" + str(self.Y()) + "__" + str(self.Z())
+def CoorAsKey(self):
+    return coor_to_key([self.X(), self.Y(), self.Z()])
 
 
-setattr(topologic.Vertex, "CoorAsString", CoorAsString)
+setattr(topologic.Vertex, "CoorAsKey", CoorAsKey)